@@ -0,0 +1,68 @@
+"""Трафик и разбор ответов API: без сжатия, gzip и кэш разбора.
+
+    python benchmarks/bench_bandwidth.py [--homeworks 30] [--polls 500]
+
+Заглушка API отдаёт `--homeworks` работ и меняет статус каждые
+`--change-every` запросов, как редко меняющийся ответ реальной
+подписки. Для каждого режима замеряются байты на опрос в обе стороны
+и время `json()` на опрос.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot import stubs  # noqa: E402
+from homework_bot.bandwidth import (  # noqa: E402
+    BandwidthMeter, CompressedTransport
+)
+from homework_bot.transport import RequestsTransport  # noqa: E402
+
+MODES = {
+    'identity': ('identity', 0),
+    'gzip': ('gzip', 0),
+    'gzip + кэш': ('gzip', 1000),
+}
+
+
+def run(encoding, cache_size, args):
+    """Прогон режима; возвращает строку отчёта."""
+    meter = BandwidthMeter()
+    transport = CompressedTransport(RequestsTransport(), meter, cache_size,
+                                    encoding)
+    headers = {'Authorization': 'OAuth bench'}
+    decode = 0.0
+    with stubs.FakePracticumServer(args.change_every,
+                                   homeworks=args.homeworks,
+                                   compress=True) as server:
+        for _ in range(args.polls):
+            response = transport.get(server.url, headers=headers,
+                                     params={'from_date': 0})
+            started = time.perf_counter()
+            response.json()
+            decode += time.perf_counter() - started
+    stats = meter.stats()
+    traffic, = stats['endpoints'].values()
+    return (f'{traffic["bytes_in_per_request"]:>9} '
+            f'{traffic["bytes_out"] // traffic["requests"]:>9} '
+            f'{decode / args.polls * 1e6:>10.1f} '
+            f'{stats["bodies_unchanged"]:>10}')
+
+
+def main():
+    """Запуск бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--homeworks', type=int, default=30)
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument('--change-every', type=int, default=50)
+    args = parser.parse_args()
+    print(f'{"режим":<12} {"вход, Б":>9} {"выход, Б":>9} '
+          f'{"json, мкс":>10} {"без разбора":>10}')
+    for name, (encoding, cache_size) in MODES.items():
+        print(f'{name:<12} {run(encoding, cache_size, args)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Хвост задержки опросов API с подстраховочными запросами и без.
+
+    python benchmarks/bench_hedge.py [--polls 1500] [--slow 0.03]
+
+Заглушка API отвечает за `--delay`, а доля `--slow` ответов задерживается
+ещё на `--slow-delay` секунд. Опросы идут последовательно; для обоих
+режимов печатаются перцентили задержки, которую видит бот, и доля
+лишних запросов.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot import stubs  # noqa: E402
+from homework_bot.hedge import HedgedTransport  # noqa: E402
+from homework_bot.profiling import percentile  # noqa: E402
+from homework_bot.transport import RequestsTransport  # noqa: E402
+
+
+def run(hedge, args):
+    """Прогон режима; возвращает строку отчёта."""
+    transport = RequestsTransport()
+    if hedge:
+        transport = HedgedTransport(transport, budget=args.budget)
+    headers = {'Authorization': 'OAuth bench'}
+    latencies = []
+    with stubs.FakePracticumServer(delay=args.delay, slow=args.slow,
+                                   slow_delay=args.slow_delay) as server:
+        for _ in range(args.polls):
+            started = time.perf_counter()
+            transport.get(server.url, headers=headers,
+                          params={'from_date': 0}, timeout=10)
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    extra = 0.0
+    if hedge:
+        extra = transport.stats()['hedge_share']
+        transport.close()
+    mode = 'подстраховка' if hedge else 'без'
+    return (f'{mode:<13} '
+            + ' '.join(f'{percentile(latencies, share) * 1000:>8.1f}'
+                       for share in (0.5, 0.95, 0.99))
+            + f' {latencies[-1] * 1000:>8.1f} {extra:>9.1%}')
+
+
+def main():
+    """Запуск бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=1500)
+    parser.add_argument('--delay', type=float, default=0.005)
+    parser.add_argument('--slow', type=float, default=0.03)
+    parser.add_argument('--slow-delay', type=float, default=0.3)
+    parser.add_argument('--budget', type=float, default=0.05)
+    args = parser.parse_args()
+    print(f'{"режим":<13} {"p50 мс":>8} {"p95 мс":>8} {"p99 мс":>8} '
+          f'{"max мс":>8} {"лишних":>9}')
+    for hedge in (False, True):
+        print(run(hedge, args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Память на подписку: словари по образцу прежнего кода против колонок.
+
+    python benchmarks/bench_memory.py --sizes 10000 100000 1000000
+
+Прежняя схема: у подписки свой словарь заголовков с готовой строкой
+`OAuth ...` и своя копия адреса эндпоинта (как после разбора файла),
+статусы, сроки и курсоры — в отдельных словарях. Новая схема:
+`AuthHeaders`, общий интернированный эндпоинт и `PollState`. Токены,
+имена и chat_id нужны в обеих схемах и входят в оба замера.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.settings import DEFAULT_ENDPOINT, Subscription  # noqa: E402
+from homework_bot.state import PollState  # noqa: E402
+
+VERDICTS = ('approved', 'reviewing', 'rejected')
+
+
+def raw_fields(index):
+    """Поля подписки, как после разбора файла: строки у каждой свои."""
+    return (f'student{index}', f'y0_{index:032d}', str(100000 + index),
+            ''.join(DEFAULT_ENDPOINT.partition('api/')))
+
+
+def build_dicts(size):
+    subscriptions = []
+    statuses, next_poll, cursors = {}, {}, {}
+    for index in range(size):
+        name, token, chat_id, endpoint = raw_fields(index)
+        headers = MappingProxyType({'Authorization': f'OAuth {token}'})
+        subscriptions.append(
+            Subscription(name, token, chat_id, endpoint, 600, headers)
+        )
+        statuses[name] = VERDICTS[index % 3]
+        next_poll[name] = 1000.0 + index
+        cursors[name] = 1700000000.0 + index
+    return subscriptions, statuses, next_poll, cursors
+
+
+def build_compact(size):
+    subscriptions = []
+    state = PollState(VERDICTS)
+    for index in range(size):
+        name, token, chat_id, endpoint = raw_fields(index)
+        subscriptions.append(
+            Subscription.create(name, token, chat_id, endpoint, 600)
+        )
+        state.set_status(name, VERDICTS[index % 3])
+        state.set_deadline(name, 1000.0 + index)
+        state.set_cursor(name, 1700000000.0 + index)
+    return subscriptions, state
+
+
+def measure(build, size):
+    """Байт на подписку, удерживаемых результатом `build`."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / size
+
+
+def main():
+    """Запуск замеров."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=(10000, 100000, 1000000))
+    args = parser.parse_args()
+    print(f'{"подписок":>10} {"словари Б":>10} {"колонки Б":>10} '
+          f'{"экономия":>9}')
+    for size in args.sizes:
+        dicts = measure(build_dicts, size)
+        compact = measure(build_compact, size)
+        print(f'{size:>10} {dicts:>10.0f} {compact:>10.0f} '
+              f'{1 - compact / dicts:>9.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Задержка обнаружения смены статуса: фиксированный интервал и прогноз.
+
+    python benchmarks/bench_predictive.py [--students 200] [--days 14]
+
+Симуляция без сети в модельном времени. Студенты сдают работы в любое
+время суток, ревьюеры проверяют их за несколько часов, но только в
+рабочие часы (6–15 UTC); возвращённую работу студент пересдаёт через
+сутки, после принятой следующая приходит через пару дней. Обе политики
+опрашивают одних и тех же студентов; прогноз учится на переходах
+первых `--warmup` суток. Сравниваются число опросов и задержка от смены
+статуса до опроса, который её увидел, за остальные сутки.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.predict import (  # noqa: E402
+    PredictiveSchedule, TurnaroundModel
+)
+from homework_bot.profiling import percentile  # noqa: E402
+from homework_bot.settings import Subscription  # noqa: E402
+from homework_bot.wheel import PollSchedule  # noqa: E402
+
+DAY = 24 * 60 * 60
+HOUR = 60 * 60
+START = 1700000000 - 1700000000 % DAY
+WORK_HOURS = (6, 15)
+
+
+def working_time(moment, rng):
+    """Ближайшее рабочее время ревьюера не раньше `moment`."""
+    hour = time.gmtime(moment).tm_hour
+    if WORK_HOURS[0] <= hour < WORK_HOURS[1]:
+        return moment
+    day = moment - moment % DAY
+    if hour >= WORK_HOURS[1]:
+        day += DAY
+    return day + WORK_HOURS[0] * HOUR + rng.uniform(0, 3 * HOUR)
+
+
+def student_events(rng, end):
+    """Смены статуса одного студента: `(время, статус, номер работы)`."""
+    events = []
+    moment = START + rng.uniform(0, DAY)
+    homework = 0
+    while moment < end:
+        events.append((moment, 'reviewing', homework))
+        moment = working_time(
+            moment + rng.lognormvariate(math.log(4 * HOUR), 0.6), rng
+        )
+        verdict = 'rejected' if rng.random() < 0.6 else 'approved'
+        events.append((moment, verdict, homework))
+        if verdict == 'rejected':
+            moment += rng.lognormvariate(math.log(20 * HOUR), 0.5)
+        else:
+            homework += 1
+            moment += rng.lognormvariate(math.log(2 * DAY), 0.5)
+    return events
+
+
+def run(policy, students, args):
+    """Прогон политики; возвращает число опросов и задержки."""
+    model = TurnaroundModel()
+    subs = [
+        Subscription.create(f's{index}', 't', index, 'https://host/',
+                            args.interval)
+        for index in range(len(students))
+    ]
+    if policy == 'predictive':
+        schedule = PredictiveSchedule(subs, model, START, START,
+                                      min_interval=args.tick)
+    else:
+        schedule = PollSchedule(subs, args.tick, START)
+    seen = [0] * len(students)
+    measured = START + args.warmup * DAY
+    polls, delays = 0, []
+    now = START
+    while now < START + args.days * DAY:
+        for sub in schedule.due(now):
+            index = int(sub.chat_id)
+            events = students[index]
+            position = seen[index]
+            while position < len(events) and events[position][0] <= now:
+                if now >= measured:
+                    delays.append(now - events[position][0])
+                position += 1
+            seen[index] = position
+            if now >= measured:
+                polls += 1
+            if position:
+                moment, status, _ = events[position - 1]
+                model.observe(sub.name, status, moment)
+        now += args.tick
+    return polls, sorted(delays)
+
+
+def main():
+    """Запуск бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--warmup', type=int, default=7)
+    parser.add_argument('--interval', type=int, default=600)
+    parser.add_argument('--tick', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    end = START + args.days * DAY
+    students = [student_events(rng, end) for _ in range(args.students)]
+    print(f'{"политика":<11} {"опросов":>9} {"среднее, мин":>13} '
+          f'{"p50, мин":>9} {"p95, мин":>9}')
+    for policy in ('fixed', 'predictive'):
+        started = time.perf_counter()
+        polls, delays = run(policy, students, args)
+        mean = sum(delays) / len(delays) / 60
+        print(f'{policy:<11} {polls:>9} {mean:>13.1f} '
+              f'{percentile(delays, 0.5) / 60:>9.1f} '
+              f'{percentile(delays, 0.95) / 60:>9.1f}'
+              f'   ({time.perf_counter() - started:.1f} с)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Накладные расходы расписания опросов на большом числе подписок.
+
+    python benchmarks/bench_scheduler.py --sizes 10000 100000 1000000
+
+Сравниваются перебор всех подписок на каждом тике (как в
+`due_subscriptions`), куча `heapq` с ленивой отменой и колесо таймеров.
+Интервалы подписок случайные от 1 до 10 минут, тик — секунда.
+Замеряются перенос срока одной подписки и обработка одного тика.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.wheel import TimingWheel  # noqa: E402
+
+
+class LinearScan:
+
+    def __init__(self):
+        self.deadlines = {}
+
+    def schedule(self, key, deadline):
+        self.deadlines[key] = deadline
+
+    def advance(self, now):
+        return [key for key, deadline in self.deadlines.items()
+                if deadline <= now]
+
+
+class HeapSchedule:
+
+    def __init__(self):
+        self.heap = []
+        self.deadlines = {}
+
+    def schedule(self, key, deadline):
+        self.deadlines[key] = deadline
+        heapq.heappush(self.heap, (deadline, key))
+
+    def advance(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, key = heapq.heappop(self.heap)
+            if self.deadlines.get(key) == deadline:
+                del self.deadlines[key]
+                due.append(key)
+        return due
+
+
+def run(factory, size, ticks, intervals):
+    """Микросекунды на перенос и на тик при `size` подписках."""
+    scheduler = factory()
+    for key in range(size):
+        scheduler.schedule(key, random.uniform(0, intervals[key]))
+    keys = random.sample(range(size), min(size, 100000))
+    started = time.perf_counter()
+    for key in keys:
+        scheduler.schedule(key, random.uniform(0, intervals[key]))
+    per_schedule = (time.perf_counter() - started) / len(keys)
+    fired = 0
+    started = time.perf_counter()
+    for now in range(1, ticks + 1):
+        for key in scheduler.advance(now):
+            scheduler.schedule(key, now + intervals[key])
+            fired += 1
+    per_tick = (time.perf_counter() - started) / ticks
+    return per_schedule * 1e6, per_tick * 1e6, fired / ticks
+
+
+def main():
+    """Запуск замеров."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=(10000, 100000, 1000000))
+    parser.add_argument('--ticks', type=int, default=120)
+    args = parser.parse_args()
+    variants = (
+        ('перебор', LinearScan),
+        ('heapq', HeapSchedule),
+        ('колесо', lambda: TimingWheel(tick=1)),
+    )
+    print(f'{"подписок":>9} {"схема":<8} {"перенос мкс":>12} '
+          f'{"тик мкс":>10} {"срабатываний/тик":>17}')
+    for size in args.sizes:
+        random.seed(size)
+        intervals = [random.randint(60, 600) for _ in range(size)]
+        for name, factory in variants:
+            ticks = args.ticks if name != 'перебор' else max(
+                1, args.ticks * 10000 // size
+            )
+            schedule, tick, fired = run(factory, size, ticks, intervals)
+            print(f'{size:>9} {name:<8} {schedule:>12.2f} {tick:>10.0f} '
+                  f'{fired:>17.0f}')
+
+
+if __name__ == '__main__':
+    main()
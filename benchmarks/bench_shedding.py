@@ -0,0 +1,118 @@
+"""Отставание горячих подписок при перегрузке, со сбросом нагрузки и без.
+
+    python benchmarks/bench_shedding.py [--seconds 20] [--idle 300]
+
+Цикл `main()` в сжатом времени: интервал подписок секунда, заглушка
+API отвечает с задержкой, а загрузчиков мало, так что опросы всех
+подписок в интервал не помещаются. Горячие подписки меняют статус на
+каждом опросе, простаивающие — никогда. Замеряется, насколько позже
+своего интервала опрашиваются горячие подписки после разгона (пока
+простой не набрал `IDLE_AFTER`, все подписки горячие): без сброса
+отстают все, со сбросом простаивающие пропускают опросы, а горячие
+укладываются в срок.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from homework_bot import stubs  # noqa: E402
+from homework_bot.delivery import DeliveryScheduler  # noqa: E402
+from homework_bot.outbox import Outbox  # noqa: E402
+from homework_bot.pipeline import LoadShedder, PollPipeline  # noqa: E402
+from homework_bot.profiling import percentile  # noqa: E402
+from homework_bot.settings import Subscription  # noqa: E402
+from homework_bot.state import HomeworkStatuses  # noqa: E402
+from homework_bot.transport import RequestsTransport  # noqa: E402
+from homework_bot.wheel import PollSchedule  # noqa: E402
+
+INTERVAL = 1
+TICK = 0.05
+IDLE_AFTER = 5
+WARMUP = 8
+
+
+def run(max_lag, args):
+    """Прогон; возвращает строку отчёта."""
+    hot_api = stubs.FakePracticumServer(delay=args.delay).start()
+    idle_api = stubs.FakePracticumServer(
+        change_every=10 ** 9, delay=args.delay
+    ).start()
+    homework.TRANSPORT = RequestsTransport()
+    homework.OUTBOX = Outbox()
+    homework.DELIVERY = DeliveryScheduler(homework.OUTBOX)
+    homework.HOMEWORK_STATUSES = HomeworkStatuses()
+    homework.PIPELINE = PollPipeline(args.workers)
+    homework.SHEDDER = LoadShedder(max_lag, IDLE_AFTER, cooldown=5)
+    subs = [
+        Subscription.create(f'hot{index}', 'token', index, hot_api.url,
+                            INTERVAL)
+        for index in range(args.hot)
+    ] + [
+        Subscription.create(f'idle{index}', 'token', index, idle_api.url,
+                            INTERVAL)
+        for index in range(args.idle)
+    ]
+    polled = {}
+    fetch = homework.fetch_statuses
+
+    def timed_fetch(subscription, cursor=None):
+        polled.setdefault(subscription.name, []).append(time.monotonic())
+        return fetch(subscription, cursor)
+
+    homework.fetch_statuses = timed_fetch
+    bot = stubs.FakeBot()
+    statuses = {}
+    started = time.monotonic()
+    schedule = PollSchedule(subs, TICK, started)
+    try:
+        while time.monotonic() - started < args.seconds:
+            due = schedule.due(time.monotonic())
+            if due:
+                homework.observe_lag(schedule.lag)
+            homework.poll_subscriptions(bot, due, statuses, None)
+            time.sleep(TICK)
+    finally:
+        homework.fetch_statuses = fetch
+        hot_api.stop()
+        idle_api.stop()
+    warmed = started + WARMUP
+    late = sorted(
+        max(0.0, later - earlier - INTERVAL)
+        for name, moments in polled.items() if name.startswith('hot')
+        for earlier, later in zip(moments, moments[1:]) if earlier > warmed
+    )
+    idle_polls = sum(
+        len(moments) for name, moments in polled.items()
+        if name.startswith('idle')
+    )
+    stats = homework.SHEDDER.stats()
+    mode = f'сброс > {max_lag} с' if max_lag else 'без сброса'
+    return (f'{mode:<14} {percentile(late, 0.5) * 1000:>9.0f} '
+            f'{percentile(late, 0.95) * 1000:>9.0f} '
+            f'{idle_polls / args.seconds:>10.0f} '
+            f'{stats["skipped_polls"]:>10}')
+
+
+def main():
+    """Запуск бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--hot', type=int, default=20)
+    parser.add_argument('--idle', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--delay', type=float, default=0.02)
+    parser.add_argument('--max-lag', type=float, default=0.3)
+    args = parser.parse_args()
+    homework.LOGGER.disabled = True
+    print(f'{"режим":<14} {"p50 мс":>9} {"p95 мс":>9} '
+          f'{"idle/с":>10} {"пропущено":>10}')
+    for max_lag in (0, args.max_lag):
+        print(run(max_lag, args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Сравнение `telegram.Bot` и лёгкого клиента на заглушке Bot API.
+
+    python benchmarks/bench_telegram.py --messages 2000
+
+Замеряются время импорта в отдельном процессе, пропускная способность
+отправки и пик памяти на одно сообщение (tracemalloc). Без --delay
+заглушка отвечает сразу, и замер показывает накладные расходы клиента;
+заглушка обрабатывает запросы одного соединения по очереди, поэтому
+выигрыш конвейера от сетевой задержки здесь не виден.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from homework_bot import stubs  # noqa: E402
+
+TOKEN = '1234:bench'
+
+
+def import_time(module):
+    """Время импорта модуля в чистом интерпретаторе, мс."""
+    code = ('import time; started = time.perf_counter(); '
+            f'import {module}; print(time.perf_counter() - started)')
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+    return float(output) * 1000
+
+
+def ptb_sequential(server, messages):
+    import telegram
+    bot = telegram.Bot(token=TOKEN, base_url=server.url)
+    for chat_id, text in messages:
+        bot.send_message(chat_id, text)
+
+
+def ptb_threads(server, messages, workers):
+    import telegram
+    bot = telegram.Bot(token=TOKEN, base_url=server.url)
+    with ThreadPoolExecutor(workers) as executor:
+        list(executor.map(lambda message: bot.send_message(*message),
+                          messages))
+
+
+def lean_sequential(server, messages):
+    from homework_bot.telegram_api import TelegramClient
+    client = TelegramClient(TOKEN, server.base_url)
+    for chat_id, text in messages:
+        client.send_message(chat_id, text)
+    client.close()
+
+
+def lean_pipelined(server, messages, connections):
+    from homework_bot.telegram_api import TelegramClient
+    client = TelegramClient(TOKEN, server.base_url, connections=connections)
+    client.send_many(messages)
+    client.close()
+
+
+def measure(run, server, messages):
+    """Секунды и байты выделений на сообщение."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    run(server, messages)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / len(messages)
+
+
+def main():
+    """Запуск замеров."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='задержка ответа заглушки, с')
+    args = parser.parse_args()
+    print(f'импорт telegram: {import_time("telegram"):.1f} мс, '
+          f'homework_bot.telegram_api: '
+          f'{import_time("homework_bot.telegram_api"):.1f} мс')
+    messages = [(index, f'Сообщение {index}')
+                for index in range(args.messages)]
+    variants = (
+        ('telegram.Bot', ptb_sequential),
+        (f'telegram.Bot x{args.workers}',
+         lambda server, batch: ptb_threads(server, batch, args.workers)),
+        ('lean', lean_sequential),
+        (f'lean send_many x{args.connections}',
+         lambda server, batch: lean_pipelined(server, batch,
+                                              args.connections)),
+    )
+    print(f'{"клиент":<24} {"соед.":>6} {"сообщ/с":>9} {"пик Б/сообщ":>12}')
+    for name, run in variants:
+        with stubs.FakeTelegramServer(delay=args.delay) as server:
+            elapsed, allocated = measure(run, server, messages)
+            print(f'{name:<24} {server.connections:>6} '
+                  f'{len(messages) / elapsed:>9.0f} {allocated:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Сравнение транспортов на локальной заглушке API.
+
+    python benchmarks/bench_transport.py --polls 500 --workers 16
+
+Заглушка отвечает по HTTP/1.1 без TLS, поэтому мультиплексирование
+HTTP/2 здесь не проявляется; выигрыш дают общий пул соединений и кэш DNS.
+Для замера HTTP/2 передайте --url настоящего HTTPS-эндпоинта.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot import stubs  # noqa: E402
+from homework_bot.http2 import DnsCache, Http2Transport  # noqa: E402
+from homework_bot.profiling import percentile  # noqa: E402
+from homework_bot.transport import RequestsTransport  # noqa: E402
+
+
+def run(transport, url, polls, workers, headers):
+    """Опросы в `workers` потоков, возвращает отсортированные задержки."""
+    def poll(_):
+        started = time.perf_counter()
+        response = transport.get(url, headers=headers,
+                                 params={'from_date': 0}, timeout=10)
+        response.json()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(workers) as executor:
+        return sorted(executor.map(poll, range(polls)))
+
+
+def main():
+    """Запуск замеров."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--url', help='внешний эндпоинт вместо заглушки')
+    parser.add_argument('--token', default='bench')
+    args = parser.parse_args()
+    headers = {'Authorization': f'OAuth {args.token}'}
+    server = None if args.url else stubs.FakePracticumServer().start()
+    url = args.url or server.url.replace('127.0.0.1', 'localhost')
+    dns = DnsCache()
+    variants = (
+        ('requests', RequestsTransport, False),
+        ('requests+dns', RequestsTransport, True),
+        ('httpx-http2', Http2Transport, False),
+        ('httpx-http2+dns', Http2Transport, True),
+    )
+    print(f'{"транспорт":<18} {"соед.":>6} {"p50 мс":>8} {"p95 мс":>8} '
+          f'{"p99 мс":>8} {"всего с":>8}')
+    for name, factory, cached in variants:
+        if cached:
+            dns.install()
+        transport = factory()
+        before = server.connections if server else 0
+        started = time.perf_counter()
+        latencies = run(transport, url, args.polls, args.workers, headers)
+        total = time.perf_counter() - started
+        connections = (server.connections - before) if server else '-'
+        print(f'{name:<18} {connections:>6} '
+              f'{percentile(latencies, 0.5) * 1000:>8.2f} '
+              f'{percentile(latencies, 0.95) * 1000:>8.2f} '
+              f'{percentile(latencies, 0.99) * 1000:>8.2f} {total:>8.2f}')
+        if hasattr(transport, 'close'):
+            transport.close()
+        dns.uninstall()
+    if server:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Сценарии со сбоями: пропускная способность и задержка уведомлений.
+
+    python benchmarks/chaos_scenarios.py [--scenario slow-api] [--cycles 30]
+
+Каждый сценарий гоняет `poll_subscriptions` против локальной заглушки
+API с внесёнными сбоями и проверяет бюджет: минимум успешных опросов в
+секунду, p95 задержки смены статуса от записи в outbox до
+подтверждённой отправки и долю доставленных. Код выхода 1, если бюджет нарушен.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from homework_bot import stubs  # noqa: E402
+from homework_bot.chaos import (  # noqa: E402
+    ChaosBot, ChaosTransport, FaultInjector, parse_chaos
+)
+from homework_bot.delivery import DeliveryScheduler  # noqa: E402
+from homework_bot.outbox import Outbox  # noqa: E402
+from homework_bot.pipeline import PollPipeline  # noqa: E402
+from homework_bot.profiling import percentile  # noqa: E402
+from homework_bot.settings import Subscription  # noqa: E402
+from homework_bot.state import HomeworkStatuses  # noqa: E402
+from homework_bot.transport import RequestsTransport  # noqa: E402
+
+
+class Scenario(NamedTuple):
+    """Сбои и бюджет сценария."""
+
+    chaos: str
+    workers: int = 1
+    min_polls_per_second: float = 50
+    max_p95_latency: float = 0.5
+    min_delivered: float = 0.95
+
+
+SCENARIOS = {
+    'baseline': Scenario(''),
+    'api-errors': Scenario(
+        'api.error=0.2,api.corrupt=0.05,api.no_homeworks=0.05',
+        min_polls_per_second=40,
+    ),
+    'slow-api': Scenario(
+        'api.latency=0.3:0.05,api.timeout=0.02:0.2', workers=8,
+        min_polls_per_second=20,
+    ),
+    'slow-telegram': Scenario(
+        'telegram.latency=0.3:0.02,telegram.error=0.05',
+        min_polls_per_second=10, max_p95_latency=1.0, min_delivered=0.85,
+    ),
+}
+
+
+def run(name, scenario, cycles, subscriptions):
+    """Прогон сценария; возвращает строку отчёта и признак успеха."""
+    faults = parse_chaos(scenario.chaos)
+    api = stubs.FakePracticumServer().start()
+    homework.TRANSPORT = ChaosTransport(
+        RequestsTransport(), FaultInjector(faults['api'], seed=1)
+    )
+    homework.OUTBOX = outbox = Outbox()
+    homework.DELIVERY = DeliveryScheduler(outbox)
+    homework.HOMEWORK_STATUSES = HomeworkStatuses()
+    homework.PIPELINE = PollPipeline(scenario.workers)
+    created, acked = {}, {}
+    put, ack = outbox.put, outbox.ack
+
+    def timed_put(chat_id, text, key=None, priority=0):
+        if key is not None:
+            created.setdefault(key, time.monotonic())
+        return put(chat_id, text, key, priority)
+
+    def timed_ack(key):
+        acked.setdefault(key, time.monotonic())
+        return ack(key)
+
+    outbox.put, outbox.ack = timed_put, timed_ack
+    bot = ChaosBot(stubs.FakeBot(),
+                   FaultInjector(faults['telegram'], seed=2))
+    subs = [
+        Subscription.create(f'student{index}', 'token', index, api.url, 1)
+        for index in range(subscriptions)
+    ]
+    statuses = {}
+    started = time.monotonic()
+    for _ in range(cycles):
+        homework.poll_subscriptions(bot, subs, statuses, None)
+    elapsed = time.monotonic() - started
+    api.stop()
+    latencies = sorted(
+        acked[key] - moment for key, moment in created.items()
+        if key in acked
+    )
+    polls = api.requests / elapsed
+    p95 = percentile(latencies, 0.95) if latencies else float('inf')
+    delivered = len(latencies) / max(1, len(created))
+    ok = (polls >= scenario.min_polls_per_second
+          and p95 <= scenario.max_p95_latency
+          and delivered >= scenario.min_delivered)
+    return (f'{name:<14} {polls:>9.0f} {p95 * 1000:>9.1f} '
+            f'{delivered:>10.0%} {"OK" if ok else "НАРУШЕН":>8}'), ok
+
+
+def main():
+    """Запуск сценариев."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS),
+                        action='append')
+    parser.add_argument('--cycles', type=int, default=30)
+    parser.add_argument('--subscriptions', type=int, default=20)
+    args = parser.parse_args()
+    homework.LOGGER.disabled = True
+    print(f'{"сценарий":<14} {"опросов/с":>9} {"p95 мс":>9} '
+          f'{"доставлено":>10} {"бюджет":>8}')
+    passed = True
+    for name in args.scenario or SCENARIOS:
+        line, ok = run(name, SCENARIOS[name], args.cycles,
+                       args.subscriptions)
+        print(line)
+        passed = passed and ok
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
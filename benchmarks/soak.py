@@ -0,0 +1,63 @@
+"""Долгий прогон цикла бота в сжатом времени против базовой линии.
+
+    python benchmarks/soak.py [--days 7] [--subscriptions 20] [--update]
+
+Цикл `main()` опрашивает заглушки API и Telegram, модельные сутки
+проходят за секунды. Замеряются рост памяти (`tracemalloc` и RSS) и
+дескрипторов после разгона, задержка циклов опроса и её дрейф от
+первой половины прогона ко второй. Результат сравнивается с
+`benchmarks/soak_baseline.json`; при регрессии код возврата 1.
+`--update` записывает результат как новую базовую линию.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from homework_bot.soak import (  # noqa: E402
+    DAY, MIN_DAYS, SUBSCRIPTIONS, TOLERANCE, compare, load_baseline,
+    run_soak, save_baseline
+)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'soak_baseline.json')
+
+
+def main():
+    """Запуск прогона."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--subscriptions', type=int, default=SUBSCRIPTIONS)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--update', action='store_true',
+                        help='записать результат как базовую линию')
+    args = parser.parse_args()
+    if args.days < MIN_DAYS:
+        parser.error(f'--days не меньше {MIN_DAYS}: в более коротком '
+                     'прогоне рост памяти — это ещё разгон аллокатора.')
+    homework.LOGGER.disabled = True
+    started = time.perf_counter()
+    result = run_soak(homework, args.days * DAY, args.subscriptions)
+    print(json.dumps(result, indent=2, sort_keys=True))
+    print(f'Прогон занял {time.perf_counter() - started:.1f} с.')
+    if args.update:
+        save_baseline(result, args.baseline)
+        print(f'Базовая линия записана в {args.baseline}.')
+        return 0
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f'Нет базовой линии {args.baseline}, запустите с --update.')
+        return 1
+    regressions = compare(result, baseline, args.tolerance)
+    for regression in regressions:
+        print(regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
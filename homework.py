@@ -1,36 +1,132 @@
+import argparse
 from http import HTTPStatus
 import logging
+import math
 import os
+import sys
 import time
 
-import requests
-import telegram
 from dotenv import load_dotenv
 
+from homework_bot.analytics import ReviewAnalytics, parse_timestamp
+from homework_bot.bandwidth import BandwidthMeter, CompressedTransport
+from homework_bot.chaos import (
+    ChaosBot, ChaosTransport, FaultInjector, parse_chaos
+)
+from homework_bot.delivery import (
+    PRIORITY_ERROR, DeliveryScheduler, status_priority
+)
+from homework_bot.events import EventStream, open_sink
+from homework_bot.health import HEALTH, HealthServer, Watchdog
+from homework_bot.hedge import HedgedTransport
+from homework_bot.lazy import lazy_import
+from homework_bot.notifications import Notification
+from homework_bot.outbox import Outbox, transition_key
+from homework_bot.pipeline import LoadShedder, PollPipeline
+from homework_bot.predict import PredictiveSchedule, TurnaroundModel
+from homework_bot.profiling import PROFILER, run_profile
+from homework_bot.ratelimit import (
+    RateLimited, RateLimitedTransport, RateLimiter
+)
+from homework_bot.settings import (
+    DEFAULT_NAME, SettingsError, Subscription, SubscriptionWatcher,
+    build_settings
+)
+from homework_bot.state import HomeworkStatuses, PollState
+from homework_bot.telegram_api import TelegramApiError, TelegramClient
+from homework_bot.transport import RequestsTransport
+from homework_bot.verdicts import (
+    UNKNOWN_STATUS, Quarantine, VerdictRegistry, VerdictsWatcher
+)
+from homework_bot.wheel import PollSchedule
+
+telegram = lazy_import('telegram')
+archive = lazy_import('homework_bot.archive')
+http2 = lazy_import('homework_bot.http2')
+replay = lazy_import('homework_bot.replay')
+stubs = lazy_import('homework_bot.stubs')
+
 load_dotenv()
 
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE')
 
 RETRY_PERIOD = 60 * 10
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+REQUEST_TIMEOUT = 30
+
+HEALTH_PORT = os.getenv('HEALTH_PORT')
+WATCHDOG_TIMEOUT = int(os.getenv('WATCHDOG_TIMEOUT', 0))
+WATCHDOG_RESTART = os.getenv('WATCHDOG_RESTART') == '1'
 
+RECORD_TRAFFIC = os.getenv('RECORD_TRAFFIC')
+REPLAY_TRAFFIC = os.getenv('REPLAY_TRAFFIC')
+REPLAY_SPEED = float(os.getenv('REPLAY_SPEED', 1))
+OUTBOX_PATH = os.getenv('OUTBOX_PATH', 'outbox.db')
+OUTBOX_RETENTION = float(os.getenv('OUTBOX_RETENTION', 60 * 60 * 24))
+OUTBOX_PURGE_EVERY = 60 * 60
+OUTBOX_PURGED = 0.0
+TELEGRAM_MAX_RPS = float(os.getenv('TELEGRAM_MAX_RPS', 25))
+TELEGRAM_CLIENT = os.getenv('TELEGRAM_CLIENT', 'ptb')
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+OUTBOX = Outbox()
+DELIVERY = DeliveryScheduler(OUTBOX)
 
-HOMEWORK_VERDICTS = {
+ANALYTICS_PATH = os.getenv('ANALYTICS_PATH')
+ANALYTICS = ReviewAnalytics()
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR')
+ARCHIVE = None
+EVENT_STREAM = os.getenv('EVENT_STREAM')
+CHAOS = os.getenv('CHAOS', '')
+CHAOS_SEED = os.getenv('CHAOS_SEED')
+EVENTS = EventStream()
+SINKS = []
+STATE_PATH = os.getenv('STATE_PATH')
+CURSOR_OVERLAP = 60
+ONCE_WORKERS = int(os.getenv('ONCE_WORKERS', 16))
+
+API_MAX_RPS = float(os.getenv('API_MAX_RPS', 0))
+API_TOKEN_MAX_RPS = float(os.getenv('API_TOKEN_MAX_RPS', 0))
+API_TRANSPORT = os.getenv('API_TRANSPORT', 'requests')
+DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', 0))
+API_COMPRESSION = os.getenv('API_COMPRESSION', '1') == '1'
+BODY_CACHE_SIZE = int(os.getenv('BODY_CACHE_SIZE', 10000))
+BANDWIDTH = BandwidthMeter()
+API_HEDGE = os.getenv('API_HEDGE', '0') == '1'
+HEDGE_BUDGET = float(os.getenv('HEDGE_BUDGET', 0.05))
+HEDGE_QUANTILE = float(os.getenv('HEDGE_QUANTILE', 0.95))
+POLL_WORKERS = int(os.getenv('POLL_WORKERS', 1))
+WHEEL_TICK = float(os.getenv('WHEEL_TICK', 1))
+PIPELINE_QUEUE = int(os.getenv('PIPELINE_QUEUE', 64))
+SHED_LAG = float(os.getenv('SHED_LAG', 0))
+SHED_IDLE_AFTER = float(os.getenv('SHED_IDLE_AFTER', 60 * 60 * 24))
+SHED_MERGE_PENDING = int(os.getenv('SHED_MERGE_PENDING', 50))
+POLL_POLICY = os.getenv('POLL_POLICY', 'fixed')
+PREDICT_PATH = os.getenv('PREDICT_PATH')
+PREDICT_MIN_INTERVAL = float(os.getenv('PREDICT_MIN_INTERVAL', 60))
+PREDICT_MAX_FACTOR = float(os.getenv('PREDICT_MAX_FACTOR', 4))
+TURNAROUND = TurnaroundModel()
+PIPELINE = PollPipeline(POLL_WORKERS, PIPELINE_QUEUE)
+SHEDDER = LoadShedder(SHED_LAG, SHED_IDLE_AFTER,
+                      merge_pending=SHED_MERGE_PENDING)
+TRANSPORT = RequestsTransport()
+DNS_CACHE = None
+
+
+HOMEWORK_VERDICTS = VerdictRegistry({
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
-}
+})
+VERDICTS_FILE = os.getenv('VERDICTS_FILE')
+VERDICTS_WATCHER = None
+QUARANTINE = Quarantine()
+HOMEWORK_STATUSES = HomeworkStatuses()
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename='bot.log',
-    filemode='w',
-    format='%(asctime)s - %(levelname)s - %(message)s - %(name)s'
-)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.DEBUG)
 LOGGER.addHandler(
@@ -54,36 +150,116 @@ class ApiAnswerError(Exception):
     """Исключение ответа от API."""
 
 
+MALFORMED = (KeyError, TypeError, AttributeError, HomeworkStatusError)
+
+
+def configure_logging(filemode='w'):
+    """Лог в bot.log; запуск по расписанию дописывает его, а не затирает."""
+    logging.basicConfig(
+        level=logging.DEBUG,
+        filename='bot.log',
+        filemode=filemode,
+        format='%(asctime)s - %(levelname)s - %(message)s - %(name)s'
+    )
+
+
 def check_tokens():
     """Проверка токенов."""
+    if SUBSCRIPTIONS_FILE:
+        return bool(TELEGRAM_TOKEN)
     return all([PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_TOKEN])
 
 
+def load_settings():
+    """Настройки из переменных окружения и файла подписок."""
+    return build_settings(
+        TELEGRAM_TOKEN, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, ENDPOINT,
+        RETRY_PERIOD, SUBSCRIPTIONS_FILE
+    )
+
+
 def send_message(bot, message):
     """Отправка сообщения."""
+    chat_id = getattr(message, 'chat_id', None) or TELEGRAM_CHAT_ID
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        bot.send_message(chat_id, str(message))
+        HEALTH.send_ok()
         LOGGER.debug(f'Сообщение отправлено: {message}.')
-    except telegram.TelegramError as telegram_error:
+        return True
+    except (telegram.TelegramError, TelegramApiError) as telegram_error:
         LOGGER.error(f'Сообщение не отправлено: {telegram_error}.')
+        return False
+
+
+def send_messages(bot, notifications):
+    """Отправка пачки сообщений конвейером лёгкого клиента."""
+    results = bot.send_many(
+        (notification.chat_id or TELEGRAM_CHAT_ID, str(notification))
+        for notification in notifications
+    )
+    delivered = []
+    for notification, result in zip(notifications, results):
+        if isinstance(result, Exception):
+            LOGGER.error(f'Сообщение не отправлено: {result}.')
+            delivered.append(False)
+            continue
+        HEALTH.send_ok()
+        LOGGER.debug(f'Сообщение отправлено: {notification}.')
+        delivered.append(True)
+    return delivered
+
+
+def flush_outbox(bot):
+    """Отправка накопившихся в outbox уведомлений по приоритетам."""
+    def send(item):
+        with PROFILER.stage('send_message'):
+            return send_message(
+                bot, Notification(item.text, item.chat_id, item.key)
+            )
+
+    def send_many(items):
+        with PROFILER.stage('send_message'):
+            return send_messages(bot, [
+                Notification(item.text, item.chat_id, item.key)
+                for item in items
+            ])
+
+    if hasattr(bot, 'send_many'):
+        return DELIVERY.run_many(send_many)
+    return DELIVERY.run(send)
 
 
 def get_api_answer(timestamp):
     """Получаем ответ от API Практикум."""
     timestamp = int(time.time())
+    return request_statuses(
+        Subscription(DEFAULT_NAME, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID,
+                     ENDPOINT, RETRY_PERIOD, HEADERS),
+        timestamp
+    )
+
+
+def request_statuses(subscription, timestamp):
+    """Запрос статусов работ подписки."""
     payload = {'from_date': timestamp}
-    req_params = dict(url=ENDPOINT, headers=HEADERS, params=payload)
+    req_params = dict(url=subscription.endpoint,
+                      headers=subscription.headers, params=payload,
+                      timeout=REQUEST_TIMEOUT)
     try:
-        homework_statuses = requests.get(**req_params)
+        with PROFILER.stage('http'):
+            homework_statuses = TRANSPORT.get(**req_params)
+    except RateLimited:
+        raise
     except Exception as error:
         LOGGER.error(f'Нет ответа от эндпоинта: {error}.')
         raise ApiAnswerError
     if homework_statuses.status_code != HTTPStatus.OK:
-        LOGGER.error(f'Эндпоинт {ENDPOINT} недоступен.'
+        LOGGER.error(f'Эндпоинт {subscription.endpoint} недоступен.'
                      f' Код ответа: {homework_statuses.status_code}.')
         raise ResponseStatusNot200
     try:
-        return homework_statuses.json()
+        with PROFILER.stage('json'):
+            return homework_statuses.json()
     except Exception as error:
         message = f'Ошибка преобразования к формату json: {error}.'
         LOGGER.error(message)
@@ -123,6 +299,411 @@ def check_response(response):
     return homework_list
 
 
+def poll_cycle(bot, subscription, new_status):
+    """Один цикл опроса: запрос, проверка, разбор статуса и отправка."""
+    return process_statuses(subscription, fetch_statuses(subscription),
+                            new_status)
+
+
+def fetch_statuses(subscription, cursor=None):
+    """Стадия загрузки: статусы работ подписки с прошлого опроса `cursor`."""
+    timestamp = int(cursor - CURSOR_OVERLAP) if cursor else int(time.time())
+    with PROFILER.stage('get_api_answer'):
+        return request_statuses(subscription, timestamp)
+
+
+def process_statuses(subscription, response, new_status):
+    """Разбор работ ответа от старых к новым; статус самой свежей работы."""
+    with PROFILER.stage('check_response'):
+        homeworks = check_response(response)
+    HEALTH.poll_ok()
+    for homework in reversed(homeworks):
+        try:
+            with PROFILER.stage('parse_status'):
+                message = parse_status(homework)
+        except MALFORMED as error:
+            quarantine(subscription, homework, error)
+            continue
+        process_homework(subscription, homework, new_status, message)
+    observe_turnaround(subscription)
+    return HOMEWORK_STATUSES.status(subscription.name, new_status)
+
+
+def process_homework(subscription, homework, new_status, message):
+    """Учёт работы и уведомление, если сменился её собственный статус."""
+    record_transition(subscription, homework)
+    previous = HOMEWORK_STATUSES.update(
+        subscription.name, homework,
+        parse_timestamp(homework.get('date_updated'), 0.0)
+    )
+    if previous is None:
+        previous = new_status
+    if previous == homework['status']:
+        LOGGER.info('Изменений нет.')
+        return
+    with PROFILER.stage('outbox'):
+        OUTBOX.put(subscription.chat_id, message,
+                   transition_key(subscription.chat_id, homework),
+                   status_priority(homework['status']))
+    publish_transition(subscription, homework, previous, message)
+
+
+def quarantine(subscription, homework, error):
+    """Работа, которую не удалось разобрать, — в карантин QUARANTINE."""
+    if isinstance(error, HomeworkStatusError):
+        reason = UNKNOWN_STATUS
+    elif isinstance(error, KeyError):
+        reason = 'missing_key'
+    else:
+        reason = 'malformed'
+    QUARANTINE.add(subscription.name, homework, reason)
+    LOGGER.warning(f'Работа подписки {subscription.name} в карантине '
+                   f'({reason}): {str(homework)[:200]}')
+
+
+def configure_verdicts(path):
+    """Файл дополнительных вердиктов и счётчики карантина."""
+    global VERDICTS_WATCHER
+    HEALTH.register('quarantine', QUARANTINE.stats)
+    if not path:
+        return
+    VERDICTS_WATCHER = VerdictsWatcher(HOMEWORK_VERDICTS, path)
+    refresh_verdicts(())
+
+
+def refresh_verdicts(subscriptions, statuses=None):
+    """Подхватывает новые вердикты и разбирает дождавшиеся их работы."""
+    if VERDICTS_WATCHER is not None:
+        try:
+            added = VERDICTS_WATCHER.refresh()
+        except SettingsError as error:
+            LOGGER.error(f'Файл вердиктов не применён: {error}')
+            added = ()
+        if added:
+            LOGGER.info(f'Добавлены вердикты статусов: {", ".join(added)}.')
+    if not QUARANTINE.items or statuses is None:
+        return
+    by_name = {subscription.name: subscription
+               for subscription in subscriptions}
+    for name, homework in QUARANTINE.release(HOMEWORK_VERDICTS):
+        subscription = by_name.get(name)
+        if subscription is None:
+            continue
+        try:
+            message = parse_status(homework)
+        except MALFORMED as error:
+            quarantine(subscription, homework, error)
+            continue
+        status = statuses.get(name, '')
+        process_homework(subscription, homework, status, message)
+        observe_turnaround(subscription)
+        statuses[name] = HOMEWORK_STATUSES.status(name, status)
+
+
+def publish_transition(subscription, homework, previous, message):
+    """Событие смены статуса в локальный поток для других сервисов."""
+    EVENTS.publish({
+        'type': 'status_changed',
+        'subscription': subscription.name,
+        'chat_id': subscription.chat_id,
+        'homework_id': homework.get('id'),
+        'homework_name': homework.get('homework_name'),
+        'status': homework.get('status'),
+        'previous_status': previous or None,
+        'date_updated': homework.get('date_updated'),
+        'observed': time.time(),
+        'message': message,
+    })
+
+
+def record_transition(subscription, homework):
+    """Учёт статуса работы в статистике и архиве."""
+    updated = parse_timestamp(homework.get('date_updated'), time.time())
+    changed = ANALYTICS.observe(
+        f'{subscription.name}:{homework.get("id")}',
+        homework.get('status'), updated
+    )
+    if changed and ARCHIVE is not None:
+        ARCHIVE.append(subscription.name, homework.get('id'),
+                       homework.get('status'), updated)
+
+
+def observe_turnaround(subscription):
+    """Модель проверок учится на самой свежей работе подписки."""
+    latest = HOMEWORK_STATUSES.latest(subscription.name)
+    if latest is not None:
+        TURNAROUND.observe(subscription.name, *latest)
+
+
+def save_history():
+    """Сохранение статистики, модели проверок и архива событий на диск."""
+    try:
+        if ANALYTICS_PATH and ANALYTICS.dirty:
+            ANALYTICS.save(ANALYTICS_PATH)
+        if PREDICT_PATH and TURNAROUND.dirty:
+            TURNAROUND.save(PREDICT_PATH)
+        if ARCHIVE is not None:
+            ARCHIVE.flush()
+    except OSError as error:
+        LOGGER.error(f'История статусов не сохранена: {error}')
+
+
+def due_subscriptions(subscriptions, next_poll, now):
+    """Подписки, чей срок опроса подошёл; им сразу назначается следующий."""
+    due = []
+    for subscription in subscriptions:
+        if next_poll.get(subscription.name, 0) > now:
+            continue
+        next_poll[subscription.name] = now + subscription.interval
+        due.append(subscription)
+    return due
+
+
+def poll_subscriptions(bot, subscriptions, statuses, next_poll,
+                       cursors=None):
+    """Опрос подписок через конвейер; сбой одной не мешает остальным."""
+    due = subscriptions
+    if next_poll is not None:
+        due = due_subscriptions(subscriptions, next_poll, time.monotonic())
+    due = SHEDDER.admit(due, time.monotonic())
+
+    def fetch(subscription):
+        cursor = None if cursors is None else cursors.get(subscription.name)
+        return time.time(), fetch_statuses(subscription, cursor)
+
+    def process(subscription, fetched):
+        started, response = fetched
+        previous = statuses.get(subscription.name, '')
+        status = process_statuses(subscription, response, previous)
+        statuses[subscription.name] = status
+        if status != previous:
+            SHEDDER.touch(subscription.name, time.monotonic())
+        if cursors is not None:
+            cursors[subscription.name] = started
+
+    def failed(subscription, error):
+        if isinstance(error, RateLimited):
+            LOGGER.warning(f'Опрос {subscription.name} отложен: {error}')
+            return
+        message = f'Сбой в работе программы: {error}'
+        LOGGER.error(message)
+        OUTBOX.put(subscription.chat_id, message, priority=PRIORITY_ERROR)
+
+    PIPELINE.run(due, fetch, process, failed)
+    merge_outbox()
+    flush_outbox(bot)
+    purge_outbox()
+    save_history()
+
+
+def poll_scheduled(bot, schedule, state):
+    """Опрос подписок, чей срок настал по расписанию, с учётом отставания."""
+    due = schedule.due(time.monotonic())
+    if due:
+        observe_lag(schedule.lag)
+    poll_subscriptions(bot, due, state.statuses, None, state.cursors)
+
+
+def idle_time(schedule):
+    """Пауза до ближайшего срока опроса, не дольше RETRY_PERIOD."""
+    wait = schedule.wait(time.monotonic())
+    if wait is None:
+        return RETRY_PERIOD
+    ticks = max(1, math.ceil(wait / WHEEL_TICK))
+    return min(ticks * WHEEL_TICK, RETRY_PERIOD)
+
+
+def observe_lag(lag):
+    """Учёт отставания опросов; пишет в лог включение и выключение сброса."""
+    level = SHEDDER.level
+    SHEDDER.observe(lag, time.monotonic())
+    if SHEDDER.level > level:
+        LOGGER.warning(f'Опросы отстают на {SHEDDER.lag:.1f} с, уровень '
+                       f'сброса нагрузки {SHEDDER.level}.')
+    elif SHEDDER.level < level:
+        LOGGER.info(f'Отставание опросов {SHEDDER.lag:.1f} с, уровень '
+                    f'сброса нагрузки {SHEDDER.level}.')
+
+
+def merge_outbox():
+    """При сбросе нагрузки склеивает накопившиеся уведомления по чатам."""
+    if not SHEDDER.shedding:
+        return
+    if not SHEDDER.should_merge(OUTBOX.stats()['pending']):
+        return
+    saved = OUTBOX.merge()
+    SHEDDER.merged += saved
+    if saved:
+        LOGGER.warning(f'Очередь отправки отстаёт: склеено сообщений '
+                       f'{saved}.')
+
+
+def purge_outbox():
+    """Раз в час удаляет из outbox доставленное старше OUTBOX_RETENTION."""
+    global OUTBOX_PURGED
+    now = time.monotonic()
+    if now - OUTBOX_PURGED < OUTBOX_PURGE_EVERY:
+        return
+    OUTBOX_PURGED = now
+    OUTBOX.purge(OUTBOX_RETENTION)
+
+
+def refresh_subscriptions(watcher, statuses, next_poll):
+    """Подхватывает изменения файла подписок; True, если они были."""
+    try:
+        added, removed, changed = watcher.refresh()
+    except SettingsError as error:
+        LOGGER.error(f'Файл подписок не применён: {error}')
+        return False
+    for name in removed:
+        statuses.pop(name, None)
+        HOMEWORK_STATUSES.forget(name)
+        next_poll.pop(name, None)
+        SHEDDER.forget(name)
+        TURNAROUND.forget(name)
+    if added or removed or changed:
+        BANDWIDTH.label(watcher.settings.subscriptions)
+        LOGGER.info(
+            f'Подписки обновлены: добавлено {len(added)}, удалено '
+            f'{len(removed)}, изменено {len(changed)}.'
+        )
+        return True
+    return False
+
+
+def configure_transport(record_path=None, replay_path=None, speed=1.0):
+    """Сборка транспорта: сеть или запись, журнал, ограничение частоты."""
+    global TRANSPORT, DNS_CACHE
+    if DNS_CACHE_TTL and DNS_CACHE is None:
+        DNS_CACHE = http2.DnsCache(DNS_CACHE_TTL).install()
+        HEALTH.register('dns_cache', DNS_CACHE.stats)
+    if API_TRANSPORT == 'http2':
+        transport = http2.Http2Transport()
+    else:
+        transport = RequestsTransport()
+    limiter = RateLimiter(API_MAX_RPS or None, API_TOKEN_MAX_RPS or None)
+    if API_HEDGE and not replay_path:
+        transport = HedgedTransport(
+            transport, HEDGE_QUANTILE, HEDGE_BUDGET,
+            workers=2 * max(POLL_WORKERS, ONCE_WORKERS), limiter=limiter
+        )
+        HEALTH.register('hedge', transport.stats)
+    if API_COMPRESSION:
+        transport = CompressedTransport(transport, BANDWIDTH,
+                                        BODY_CACHE_SIZE)
+        HEALTH.register('bandwidth', BANDWIDTH.stats)
+    if replay_path:
+        transport = replay.ReplayTransport(replay_path, speed=speed)
+        LOGGER.info(f'Воспроизведение трафика из {replay_path}.')
+    if record_path:
+        transport = replay.RecordingTransport(transport, record_path)
+        LOGGER.info(f'Запись трафика в {record_path}.')
+    injector = chaos_injector('api')
+    if injector is not None:
+        transport = ChaosTransport(transport, injector)
+    HEALTH.register('rate_limit', limiter.stats)
+    TRANSPORT = RateLimitedTransport(transport, limiter)
+
+
+def chaos_injector(target):
+    """Источник сбоев для `api` или `telegram` из переменной CHAOS."""
+    try:
+        faults = parse_chaos(CHAOS)[target]
+    except ValueError as error:
+        LOGGER.error(f'CHAOS не применён: {error}')
+        return None
+    if not faults:
+        return None
+    injector = FaultInjector(faults, CHAOS_SEED)
+    HEALTH.register(f'chaos_{target}', injector.stats)
+    LOGGER.warning(f'Включено внесение сбоев ({target}): {faults}.')
+    return injector
+
+
+def configure_outbox(path):
+    """Открытие outbox; неотправленное после падения уйдёт в первом цикле."""
+    global OUTBOX, DELIVERY
+    OUTBOX = Outbox(path, clock=time.time)
+    DELIVERY = DeliveryScheduler(OUTBOX, TELEGRAM_MAX_RPS or None)
+    HEALTH.register('outbox', OUTBOX.stats)
+    HEALTH.register('delivery', DELIVERY.stats)
+    pending = OUTBOX.stats()['pending']
+    if pending:
+        LOGGER.info(f'В outbox ждут отправки уведомлений: {pending}.')
+
+
+def configure_analytics(path, archive_dir=None):
+    """Загрузка агрегатов статистики и открытие архива событий."""
+    global ANALYTICS, ARCHIVE
+    if archive_dir:
+        ARCHIVE = archive.EventArchive(archive_dir)
+    if not path:
+        return
+    try:
+        ANALYTICS = ReviewAnalytics.load(path)
+    except (OSError, ValueError, KeyError) as error:
+        LOGGER.error(f'Статистика {path} не прочитана, начата заново: '
+                     f'{error}')
+
+
+def configure_events(specs):
+    """Приёмники потока событий: через запятую `unix:/путь`, `jsonl:/путь`."""
+    if not specs:
+        return
+    for spec in specs.split(','):
+        try:
+            SINKS.append(open_sink(EVENTS, spec.strip()))
+        except (OSError, ValueError) as error:
+            LOGGER.error(f'Поток событий {spec} не открыт: {error}')
+            continue
+        LOGGER.info(f'Поток событий: {spec}.')
+    HEALTH.register('events', EVENTS.stats)
+
+
+def configure_pipeline():
+    """Метрики конвейера опроса и сброса нагрузки в эндпоинте здоровья."""
+    HEALTH.register('pipeline', PIPELINE.stats)
+    HEALTH.register('shedding', SHEDDER.stats)
+    if SHED_LAG:
+        LOGGER.info(f'Сброс нагрузки при отставании опросов больше '
+                    f'{SHED_LAG} с.')
+
+
+def configure_schedule(subscriptions, state):
+    """Расписание опросов по POLL_POLICY: `fixed` или `predictive`."""
+    global TURNAROUND
+    if PREDICT_PATH:
+        try:
+            TURNAROUND = TurnaroundModel.load(PREDICT_PATH)
+        except (OSError, ValueError, KeyError) as error:
+            LOGGER.error(f'Модель проверок {PREDICT_PATH} не прочитана, '
+                         f'начата заново: {error}')
+    if POLL_POLICY != 'predictive':
+        if POLL_POLICY != 'fixed':
+            LOGGER.error(f'Неизвестная политика опроса {POLL_POLICY}, '
+                         'опросы по фиксированному интервалу.')
+        return PollSchedule(subscriptions, WHEEL_TICK, time.monotonic(),
+                            state.deadlines)
+    schedule = PredictiveSchedule(
+        subscriptions, TURNAROUND, time.monotonic(),
+        min_interval=PREDICT_MIN_INTERVAL, max_factor=PREDICT_MAX_FACTOR
+    )
+    HEALTH.register('schedule', schedule.stats)
+    LOGGER.info(f'Опросы по прогнозу: {schedule.stats()["polls_per_hour"]} '
+                'в час на все подписки.')
+    return schedule
+
+
+def start_monitoring():
+    """Запуск эндпоинта здоровья и сторожевого потока, если заданы."""
+    HEALTH.interval = RETRY_PERIOD
+    if HEALTH_PORT:
+        server = HealthServer(HEALTH, int(HEALTH_PORT)).start()
+        LOGGER.info(f'Эндпоинт здоровья слушает порт {server.port}.')
+    if WATCHDOG_TIMEOUT:
+        Watchdog(HEALTH, WATCHDOG_TIMEOUT, restart=WATCHDOG_RESTART).start()
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
@@ -131,27 +712,212 @@ def main():
             'Работа программы завершена.'
         )
         exit()
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    new_status = ''
+    try:
+        watcher = SubscriptionWatcher(load_settings())
+        configure_transport(RECORD_TRAFFIC, REPLAY_TRAFFIC, REPLAY_SPEED)
+    except (SettingsError, RuntimeError) as error:
+        LOGGER.critical(f'Некорректные настройки: {error} '
+                        'Работа программы завершена.')
+        exit()
+    BANDWIDTH.label(watcher.settings.subscriptions)
+    configure_outbox(OUTBOX_PATH)
+    configure_analytics(ANALYTICS_PATH, ARCHIVE_DIR)
+    configure_events(EVENT_STREAM)
+    configure_pipeline()
+    configure_verdicts(VERDICTS_FILE)
+    start_monitoring()
+    if TELEGRAM_CLIENT == 'lean':
+        bot = TelegramClient(TELEGRAM_TOKEN, TELEGRAM_API_URL)
+        HEALTH.register('telegram', bot.stats)
+    else:
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    injector = chaos_injector('telegram')
+    if injector is not None:
+        bot = ChaosBot(bot, injector)
+    state = use_state(PollState(HOMEWORK_VERDICTS))
+    schedule = configure_schedule(watcher.settings.subscriptions, state)
     while True:
         try:
-            response = get_api_answer(timestamp)
-            homework = check_response(response)
-            if len(homework) != 0:
-                if new_status != homework[0]['status']:
-                    message = parse_status(homework[0])
-                    send_message(bot, message)
-                    new_status = homework[0]['status']
-                else:
-                    LOGGER.info('Изменений нет.')
+            HEALTH.cycle_started()
+            if refresh_subscriptions(watcher, state.statuses,
+                                     state.deadlines):
+                schedule.sync(watcher.settings.subscriptions,
+                              time.monotonic())
+            refresh_verdicts(watcher.settings.subscriptions, state.statuses)
+            with PROFILER.stage('cycle'):
+                poll_scheduled(bot, schedule, state)
         except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            LOGGER.error(message)
-            send_message(bot, message)
+            LOGGER.error(f'Сбой в работе программы: {error}')
         finally:
-            time.sleep(RETRY_PERIOD)
+            HEALTH.cycle_finished()
+            pause = idle_time(schedule)
+            time.sleep(pause)
+
+
+def load_state(path):
+    """Статусы и курсоры прошлого запуска; пустые, если их нет."""
+    if not path:
+        return PollState(HOMEWORK_VERDICTS)
+    try:
+        return PollState.load(path, HOMEWORK_VERDICTS)
+    except (OSError, ValueError, TypeError) as error:
+        LOGGER.error(f'Состояние {path} не прочитано, начато заново: '
+                     f'{error}')
+        return PollState(HOMEWORK_VERDICTS)
+
+
+def use_state(state):
+    """Статусы работ сравниваются с сохранёнными в состоянии `state`."""
+    global HOMEWORK_STATUSES
+    HOMEWORK_STATUSES = state.homeworks
+    return state
+
+
+def save_state(state, path):
+    """Сохранение статусов и курсоров для следующего запуска."""
+    if not path:
+        return
+    try:
+        state.save(path)
+    except OSError as error:
+        LOGGER.error(f'Состояние {path} не сохранено: {error}')
+
+
+def close_sinks():
+    """Дописывает и закрывает приёмники потока событий."""
+    while SINKS:
+        sink = SINKS.pop()
+        stop = getattr(sink, 'close', None) or sink.stop
+        stop()
+
+
+def run_once():
+    """Один цикл опроса всех подписок для cron; код возврата процесса."""
+    global PIPELINE
+    if not check_tokens():
+        LOGGER.critical('Отсутствуют необходимые переменные окружения.')
+        return 1
+    try:
+        subscriptions = load_settings().subscriptions
+        configure_transport(RECORD_TRAFFIC, REPLAY_TRAFFIC, REPLAY_SPEED)
+    except (SettingsError, RuntimeError) as error:
+        LOGGER.critical(f'Некорректные настройки: {error}')
+        return 1
+    BANDWIDTH.label(subscriptions)
+    configure_outbox(OUTBOX_PATH)
+    configure_analytics(ANALYTICS_PATH, ARCHIVE_DIR)
+    configure_events(EVENT_STREAM)
+    configure_verdicts(VERDICTS_FILE)
+    PIPELINE = PollPipeline(max(1, min(ONCE_WORKERS, len(subscriptions))),
+                            PIPELINE_QUEUE)
+    if TELEGRAM_CLIENT == 'lean':
+        bot = TelegramClient(TELEGRAM_TOKEN, TELEGRAM_API_URL)
+    else:
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    state = use_state(load_state(STATE_PATH))
+    try:
+        poll_subscriptions(bot, subscriptions, state.statuses, None,
+                           state.cursors)
+        pending = OUTBOX.stats()['pending']
+        if pending:
+            LOGGER.warning(f'Не отправлено уведомлений: {pending}, они уйдут '
+                           'при следующем запуске.')
+        held = QUARANTINE.stats()['held']
+        if held:
+            LOGGER.warning(f'Работ в карантине: {held}.')
+    finally:
+        save_state(state, STATE_PATH)
+        close_sinks()
+        if ARCHIVE is not None:
+            ARCHIVE.close()
+        OUTBOX.close()
+        if isinstance(bot, TelegramClient):
+            bot.close()
+    return 0
+
+
+def profile(args):
+    """Прогон циклов опроса с разбивкой времени по стадиям."""
+    server = None
+    configure_transport(args.record, args.replay, args.speed)
+    if args.fake or args.replay:
+        endpoint = ENDPOINT
+        if not args.replay:
+            server = stubs.FakePracticumServer().start()
+            endpoint = server.url
+        subscriptions = (
+            Subscription.create(DEFAULT_NAME, 'stub-token', 0, endpoint),
+        )
+        bot = stubs.FakeBot()
+    else:
+        try:
+            subscriptions = load_settings().subscriptions
+        except SettingsError as error:
+            LOGGER.critical(f'Некорректные настройки: {error}')
+            exit()
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    statuses = {}
+
+    def cycle():
+        with PROFILER.stage('cycle'):
+            poll_subscriptions(bot, subscriptions, statuses, {})
+
+    try:
+        print(run_profile(
+            cycle, args.profile, cprofile_path=args.cprofile,
+            collapsed_path=args.collapsed
+        ))
+    finally:
+        if server:
+            server.stop()
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Бот-ассистент проверки домашних работ.'
+    )
+    parser.add_argument(
+        '--profile', type=int, metavar='N',
+        help='прогнать N циклов опроса и вывести время по стадиям'
+    )
+    parser.add_argument(
+        '--fake', action='store_true',
+        help='в режиме --profile опрашивать локальную заглушку API'
+    )
+    parser.add_argument(
+        '--cprofile', metavar='PATH',
+        help='сохранить статистику cProfile (pstats) в файл'
+    )
+    parser.add_argument(
+        '--collapsed', metavar='PATH',
+        help='сохранить стадии в формате collapsed stacks для flamegraph'
+    )
+    parser.add_argument(
+        '--record', metavar='PATH',
+        help='записывать ответы API в файл (.jsonl или .jsonl.gz)'
+    )
+    parser.add_argument(
+        '--replay', metavar='PATH',
+        help='отвечать на запросы из записанного файла вместо сети'
+    )
+    parser.add_argument(
+        '--speed', type=float, default=1.0,
+        help='ускорение задержек при --replay, 0 — без задержек'
+    )
+    parser.add_argument(
+        '--once', action='store_true',
+        help='один цикл опроса всех подписок и выход (для cron)'
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    configure_logging('a' if args.once else 'w')
+    if args.once:
+        sys.exit(run_once())
+    if args.profile:
+        profile(args)
+    else:
+        main()
@@ -0,0 +1 @@
+"""Вспомогательные подсистемы бота-ассистента."""
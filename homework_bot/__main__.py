@@ -0,0 +1,239 @@
+"""Служебные команды: python -m homework_bot <команда>."""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from homework_bot.analytics import ReviewAnalytics
+from homework_bot.archive import EventArchive
+from homework_bot.settings import (
+    DEFAULT_ENDPOINT, DEFAULT_INTERVAL, SettingsError, Subscription
+)
+from homework_bot.store import (
+    BATCH_SIZE, VALIDATE_WORKERS, SubscriptionStore, check_token,
+    export_rows, import_rows, read_rows
+)
+from homework_bot.transport import RequestsTransport
+
+
+def analytics_report(args):
+    """Отчёт по сохранённым агрегатам без перебора истории."""
+    if not os.path.exists(args.path):
+        print(f'Файл агрегатов {args.path} не найден.', file=sys.stderr)
+        return 1
+    print(ReviewAnalytics.load(args.path).report())
+    return 0
+
+
+def parse_moment(value):
+    """Момент времени из ISO 8601 или unix-времени."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def archive_export(args):
+    """Потоковая выгрузка архива событий за период."""
+    archive = EventArchive(args.dir, readonly=True)
+    if args.format == 'parquet':
+        if args.output == '-':
+            print('Для Parquet укажите файл --output.', file=sys.stderr)
+            return 1
+        written = archive.export(args.output, 'parquet', args.start, args.end)
+    elif args.output == '-':
+        written = archive.export(sys.stdout, args.format, args.start,
+                                 args.end)
+    else:
+        with open(args.output, 'w', newline='', encoding='utf-8') as file:
+            written = archive.export(file, args.format, args.start, args.end)
+    print(f'Выгружено событий: {written}.', file=sys.stderr)
+    return 0
+
+
+def subs_import(args):
+    """Потоковый импорт подписок из CSV или JSONL."""
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip('.').lower()
+    if fmt not in ('csv', 'jsonl'):
+        print('Укажите --format csv или jsonl.', file=sys.stderr)
+        return 1
+
+    def report(number, error):
+        print(f'Строка {number} пропущена: {error}', file=sys.stderr)
+
+    store = SubscriptionStore(args.db)
+    transport = RequestsTransport() if args.validate else None
+    source = sys.stdin if args.file == '-' else open(
+        args.file, newline='', encoding='utf-8'
+    )
+    try:
+        stats = import_rows(
+            store, read_rows(source, fmt), args.batch, transport,
+            args.workers, report, endpoint=args.endpoint,
+            interval=args.interval
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        store.close()
+    print(f'Импортировано: {stats.imported}, отклонено строк: '
+          f'{stats.rejected}, отвергнуто токенов: {stats.invalid_tokens}.',
+          file=sys.stderr)
+    return 0 if not (stats.rejected or stats.invalid_tokens) else 2
+
+
+def subs_export(args):
+    """Выгрузка подписок в CSV или JSONL."""
+    store = SubscriptionStore(args.db)
+    try:
+        if args.output == '-':
+            written = export_rows(store, sys.stdout, args.format)
+        else:
+            with open(args.output, 'w', newline='',
+                      encoding='utf-8') as file:
+                written = export_rows(store, file, args.format)
+    finally:
+        store.close()
+    print(f'Выгружено подписок: {written}.', file=sys.stderr)
+    return 0
+
+
+def subs_add(args):
+    """Добавление или замена одной подписки."""
+    try:
+        subscription = Subscription.create(
+            args.name, args.token, args.chat_id, args.endpoint, args.interval
+        )
+    except SettingsError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if args.validate and check_token(RequestsTransport(),
+                                     subscription) is False:
+        print(f'Токен подписки {args.name} отклонён API.', file=sys.stderr)
+        return 1
+    store = SubscriptionStore(args.db)
+    try:
+        store.upsert((subscription,))
+    finally:
+        store.close()
+    return 0
+
+
+def subs_remove(args):
+    """Удаление подписок по именам."""
+    store = SubscriptionStore(args.db)
+    try:
+        removed = store.remove(args.names)
+    finally:
+        store.close()
+    print(f'Удалено подписок: {removed}.', file=sys.stderr)
+    return 0 if removed == len(set(args.names)) else 1
+
+
+def subs_list(args):
+    """Список подписок без токенов."""
+    store = SubscriptionStore(args.db)
+    try:
+        for sub in store:
+            print(f'{sub.name}\t{sub.chat_id}\t{sub.interval}\t'
+                  f'{sub.endpoint}')
+    finally:
+        store.close()
+    return 0
+
+
+def add_subs_parser(commands):
+    """Команды `subs` управления базой подписок."""
+    subs = commands.add_parser('subs', help='подписки в базе SQLite')
+    subs.add_argument(
+        '--db', default=os.getenv('SUBSCRIPTIONS_FILE', 'subscriptions.db'),
+        help='база подписок (по умолчанию $SUBSCRIPTIONS_FILE)'
+    )
+    subs_commands = subs.add_subparsers(dest='action', required=True)
+
+    imports = subs_commands.add_parser('import', help='импорт из файла')
+    imports.add_argument('file', help='CSV или JSONL, `-` — stdin')
+    imports.add_argument('--format', choices=('csv', 'jsonl'))
+    imports.add_argument('--batch', type=int, default=BATCH_SIZE,
+                         help='строк в одной транзакции')
+    imports.add_argument('--validate', action='store_true',
+                         help='проверить токены запросом к API')
+    imports.add_argument('--workers', type=int, default=VALIDATE_WORKERS,
+                         help='параллельных проверок токенов')
+    imports.add_argument('--endpoint', default=DEFAULT_ENDPOINT,
+                         help='эндпоинт для строк без своего')
+    imports.add_argument('--interval', type=int, default=DEFAULT_INTERVAL,
+                         help='интервал для строк без своего')
+    imports.set_defaults(handler=subs_import)
+
+    export = subs_commands.add_parser('export', help='выгрузка в файл')
+    export.add_argument('--format', choices=('csv', 'jsonl'),
+                        default='jsonl')
+    export.add_argument('--output', default='-',
+                        help='файл выгрузки, `-` — stdout')
+    export.set_defaults(handler=subs_export)
+
+    add = subs_commands.add_parser('add', help='добавить подписку')
+    add.add_argument('name')
+    add.add_argument('token')
+    add.add_argument('chat_id')
+    add.add_argument('--endpoint', default=DEFAULT_ENDPOINT)
+    add.add_argument('--interval', type=int, default=DEFAULT_INTERVAL)
+    add.add_argument('--validate', action='store_true',
+                     help='проверить токен запросом к API')
+    add.set_defaults(handler=subs_add)
+
+    remove = subs_commands.add_parser('remove', help='удалить подписки')
+    remove.add_argument('names', nargs='+')
+    remove.set_defaults(handler=subs_remove)
+
+    listing = subs_commands.add_parser('list', help='список подписок')
+    listing.set_defaults(handler=subs_list)
+
+
+def build_parser():
+    """Парсер служебных команд."""
+    parser = argparse.ArgumentParser(prog='homework_bot')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analytics = commands.add_parser(
+        'analytics', help='статистика времени проверки'
+    )
+    analytics_commands = analytics.add_subparsers(dest='action',
+                                                  required=True)
+    report = analytics_commands.add_parser('report', help='вывести отчёт')
+    report.add_argument(
+        '--path', default=os.getenv('ANALYTICS_PATH', 'analytics.json'),
+        help='файл агрегатов (по умолчанию $ANALYTICS_PATH)'
+    )
+    report.set_defaults(handler=analytics_report)
+
+    archive = commands.add_parser('archive', help='архив событий')
+    archive_commands = archive.add_subparsers(dest='action', required=True)
+    export = archive_commands.add_parser('export', help='выгрузить события')
+    export.add_argument(
+        '--dir', default=os.getenv('ARCHIVE_DIR', 'archive'),
+        help='каталог архива (по умолчанию $ARCHIVE_DIR)'
+    )
+    export.add_argument('--format', choices=('csv', 'jsonl', 'parquet'),
+                        default='jsonl')
+    export.add_argument('--from', dest='start', type=parse_moment,
+                        help='начало периода, ISO 8601 или unix-время')
+    export.add_argument('--to', dest='end', type=parse_moment,
+                        help='конец периода (не включая)')
+    export.add_argument('--output', default='-',
+                        help='файл выгрузки, `-` — stdout')
+    export.set_defaults(handler=archive_export)
+
+    add_subs_parser(commands)
+    return parser
+
+
+def run(argv=None):
+    """Разбор аргументов и запуск команды."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -0,0 +1,222 @@
+"""Потоковая статистика времени проверки по переходам статусов."""
+import json
+import math
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+RELATIVE_ACCURACY = 0.01
+
+
+class LogSketch:
+    """Сливаемый скетч квантилей с логарифмическими корзинами (DDSketch).
+
+    Вставка O(1), относительная ошибка квантиля не больше `accuracy`,
+    память растёт с логарифмом разброса значений, а не с их числом.
+    """
+
+    def __init__(self, accuracy=RELATIVE_ACCURACY):
+        """Пустой скетч с относительной точностью `accuracy`."""
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        """Добавляет неотрицательное значение."""
+        self.count += 1
+        self.total += value
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def quantile(self, share):
+        """Оценка квантиля `share` из [0, 1]; None для пустого скетча."""
+        if not self.count:
+            return None
+        rank = share * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def merge(self, other):
+        """Вливает другой скетч с той же точностью."""
+        if other.accuracy != self.accuracy:
+            raise ValueError('Скетчи с разной точностью не сливаются.')
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+
+    def to_dict(self):
+        """Сериализация в словарь."""
+        return {
+            'accuracy': self.accuracy,
+            'buckets': {
+                str(key): value for key, value in self.buckets.items()
+            },
+            'zeros': self.zeros,
+            'count': self.count,
+            'total': self.total,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстановление из словаря."""
+        sketch = cls(data['accuracy'])
+        sketch.buckets = {
+            int(key): value for key, value in data['buckets'].items()
+        }
+        sketch.zeros = data['zeros']
+        sketch.count = data['count']
+        sketch.total = data['total']
+        return sketch
+
+
+def parse_timestamp(value, default):
+    """Время из поля `date_updated` API или `default`."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return default
+
+
+class ReviewAnalytics:
+    """Инкрементальные агрегаты по переходам статусов работ.
+
+    На каждое событие — O(1): обновляется последний статус работы, время
+    в статусе, скетч длительности статуса и счётчики переходов. Отчёт
+    строится только из агрегатов, сырая история не хранится.
+    """
+
+    def __init__(self):
+        """Пустая статистика без незавершённых проверок."""
+        self.last = {}
+        self.time_in_status = {}
+        self.durations = {}
+        self.transitions = {}
+        self.verdicts = {'approved': 0, 'rejected': 0}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def observe(self, key, status, timestamp):
+        """Учитывает, что работа `key` в момент `timestamp` в `status`.
+
+        Возвращает True, если статус работы изменился или встречен впервые.
+        """
+        with self._lock:
+            previous = self.last.get(key)
+            if previous is not None and previous[0] == status:
+                return False
+            self.last[key] = (status, timestamp)
+            self.dirty = True
+            if status in self.verdicts:
+                self.verdicts[status] += 1
+            if previous is None:
+                return True
+            old_status, since = previous
+            duration = max(0.0, timestamp - since)
+            spent = self.time_in_status.setdefault(key, {})
+            spent[old_status] = spent.get(old_status, 0.0) + duration
+            sketch = self.durations.get(old_status)
+            if sketch is None:
+                sketch = self.durations[old_status] = LogSketch()
+            sketch.add(duration)
+            transition = f'{old_status}->{status}'
+            self.transitions[transition] = (
+                self.transitions.get(transition, 0) + 1
+            )
+            return True
+
+    def rejection_rate(self):
+        """Доля `rejected` среди итоговых вердиктов."""
+        total = sum(self.verdicts.values())
+        return self.verdicts['rejected'] / total if total else None
+
+    def to_dict(self):
+        """Сериализация агрегатов."""
+        with self._lock:
+            return {
+                'last': self.last,
+                'time_in_status': self.time_in_status,
+                'durations': {
+                    status: sketch.to_dict()
+                    for status, sketch in self.durations.items()
+                },
+                'transitions': self.transitions,
+                'verdicts': self.verdicts,
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстановление агрегатов."""
+        analytics = cls()
+        analytics.last = {
+            key: tuple(value) for key, value in data['last'].items()
+        }
+        analytics.time_in_status = data['time_in_status']
+        analytics.durations = {
+            status: LogSketch.from_dict(sketch)
+            for status, sketch in data['durations'].items()
+        }
+        analytics.transitions = data['transitions']
+        analytics.verdicts = data['verdicts']
+        return analytics
+
+    def save(self, path):
+        """Атомарно сохраняет агрегаты в JSON."""
+        data = self.to_dict()
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            'w', dir=directory, delete=False, suffix='.tmp'
+        ) as file:
+            json.dump(data, file)
+        os.replace(file.name, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """Загружает агрегаты; пустые, если файла нет."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+    def report(self):
+        """Текстовый отчёт по агрегатам."""
+        lines = [f'Работ под наблюдением: {len(self.last)}.']
+        rate = self.rejection_rate()
+        if rate is not None:
+            lines.append(f'Доля возвратов на доработку: {rate:.1%} '
+                         f'из {sum(self.verdicts.values())} вердиктов.')
+        for status, sketch in sorted(self.durations.items()):
+            quantiles = ', '.join(
+                f'p{round(share * 100)}='
+                f'{format_duration(sketch.quantile(share))}'
+                for share in (0.5, 0.9, 0.99)
+            )
+            lines.append(f'В статусе {status}: {sketch.count} раз, '
+                         f'{quantiles}.')
+        for transition, count in sorted(self.transitions.items()):
+            lines.append(f'{transition}: {count}')
+        return '\n'.join(lines)
+
+
+def format_duration(seconds):
+    """Длительность в часах и минутах."""
+    minutes = round(seconds / 60)
+    return f'{minutes // 60}ч{minutes % 60:02d}м'
@@ -0,0 +1,245 @@
+"""Архив событий смены статусов: только дозапись, поиск по времени."""
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import NamedTuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+RECORD = struct.Struct('<ddIII')
+EVENTS_FILE = 'events.bin'
+STRINGS_FILE = 'strings.jsonl'
+EXPORT_BATCH = 65536
+FIELDS = ('observed', 'updated', 'subscription', 'homework', 'status')
+
+
+class Event(NamedTuple):
+    """Событие архива."""
+
+    observed: float
+    updated: float
+    subscription: str
+    homework: str
+    status: str
+
+
+class _RecordView:
+    """Последовательность времён наблюдения поверх mmap для bisect."""
+
+    def __init__(self, buffer, count):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return RECORD.unpack_from(self.buffer, index * RECORD.size)[0]
+
+
+class EventArchive:
+    """Архив в каталоге: `events.bin` и таблица строк `strings.jsonl`.
+
+    Записи фиксированной длины (28 байт) хранят время наблюдения, время
+    смены статуса из API и номера строк подписки, работы и статуса. Время
+    наблюдения не убывает, поэтому сам файл служит индексом: диапазон
+    ищется двоичным поиском по mmap, а чтение идёт потоком без загрузки
+    архива в память.
+
+    С `readonly=True` архив только читается, например для выгрузки, пока
+    бот дописывает его: каталог не создаётся, недописанные хвосты файлов
+    не обрезаются, а пропускаются.
+    """
+
+    def __init__(self, directory, readonly=False):
+        """Открывает архив в каталоге `directory` на дозапись или чтение."""
+        self.directory = directory
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self.events_path = os.path.join(directory, EVENTS_FILE)
+        self.strings_path = os.path.join(directory, STRINGS_FILE)
+        self._load_strings()
+        self._strings_file = self._events_file = None
+        if not readonly:
+            self._strings_file = open(self.strings_path, 'a',
+                                      encoding='utf-8')
+        size = 0
+        if os.path.exists(self.events_path):
+            size = os.path.getsize(self.events_path)
+            if size % RECORD.size:
+                size -= size % RECORD.size
+                if not readonly:
+                    os.truncate(self.events_path, size)
+        if not readonly:
+            self._events_file = open(self.events_path, 'ab')
+        self.last_observed = 0.0
+        if size:
+            with open(self.events_path, 'rb') as file:
+                file.seek(size - RECORD.size)
+                self.last_observed = RECORD.unpack(file.read(RECORD.size))[0]
+        self._lock = threading.Lock()
+
+    def _load_strings(self):
+        """Читает таблицу строк, обрезая недописанную при падении строку.
+
+        Только для чтения недописанная строка пропускается без обрезки.
+        """
+        self.strings = []
+        self.string_ids = {}
+        if not os.path.exists(self.strings_path):
+            return
+        valid = 0
+        with open(self.strings_path, 'rb') as file:
+            for line in file:
+                try:
+                    value = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                self._remember(value)
+                valid += len(line)
+        if not self.readonly and valid != os.path.getsize(self.strings_path):
+            os.truncate(self.strings_path, valid)
+
+    def _remember(self, value):
+        self.string_ids[value] = len(self.strings)
+        self.strings.append(value)
+
+    def _intern(self, value):
+        value = str(value)
+        number = self.string_ids.get(value)
+        if number is None:
+            number = len(self.strings)
+            self._remember(value)
+            self._strings_file.write(
+                json.dumps(value, ensure_ascii=False) + '\n'
+            )
+            # Строка должна попасть в файл раньше событий с её номером.
+            self._strings_file.flush()
+        return number
+
+    def append(self, subscription, homework, status, updated=None,
+               observed=None):
+        """Дописывает событие; время наблюдения не уходит назад."""
+        if self.readonly:
+            raise ValueError('Архив открыт только для чтения.')
+        with self._lock:
+            observed = max(self.last_observed, observed or time.time())
+            self.last_observed = observed
+            self._events_file.write(RECORD.pack(
+                observed, updated or observed, self._intern(subscription),
+                self._intern(homework), self._intern(status)
+            ))
+
+    def flush(self):
+        """Сбрасывает буферы на диск; таблица строк пишется первой."""
+        if self.readonly:
+            return
+        with self._lock:
+            self._strings_file.flush()
+            self._events_file.flush()
+
+    def close(self):
+        """Закрывает файлы архива."""
+        if self.readonly:
+            return
+        self.flush()
+        self._strings_file.close()
+        self._events_file.close()
+
+    def __len__(self):
+        """Число целых событий в архиве."""
+        try:
+            return os.path.getsize(self.events_path) // RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def scan(self, start=None, end=None):
+        """События с `start <= observed < end` в порядке записи."""
+        self.flush()
+        count = len(self)
+        if not count:
+            return
+        if self.readonly:
+            # Бот мог дописать строки после открытия; они на диске раньше
+            # событий, так что таблица после замера покрывает все `count`.
+            self._load_strings()
+        with open(self.events_path, 'rb') as file, mmap.mmap(
+            file.fileno(), count * RECORD.size, access=mmap.ACCESS_READ
+        ) as buffer:
+            view = _RecordView(buffer, count)
+            first = 0 if start is None else bisect.bisect_left(view, start)
+            last = count if end is None else bisect.bisect_left(view, end)
+            strings = self.strings
+            for offset in range(first * RECORD.size, last * RECORD.size,
+                                RECORD.size):
+                observed, updated, sub, homework, status = (
+                    RECORD.unpack_from(buffer, offset)
+                )
+                yield Event(observed, updated, strings[sub],
+                            strings[homework], strings[status])
+
+    def export(self, output, fmt='jsonl', start=None, end=None):
+        """Потоковая выгрузка в CSV, JSONL или Parquet; возвращает число."""
+        events = self.scan(start, end)
+        if fmt == 'parquet':
+            return export_parquet(events, output)
+        written = 0
+        if fmt == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(FIELDS)
+            for event in events:
+                writer.writerow(event)
+                written += 1
+        elif fmt == 'jsonl':
+            for event in events:
+                output.write(json.dumps(
+                    event._asdict(), ensure_ascii=False
+                ) + '\n')
+                written += 1
+        else:
+            raise ValueError(f'Неизвестный формат выгрузки: {fmt}.')
+        return written
+
+
+def export_parquet(events, path):
+    """Выгрузка в Parquet пачками, без накопления всего архива."""
+    if pyarrow is None:
+        raise RuntimeError('Для Parquet установите пакет pyarrow.')
+    schema = pyarrow.schema([
+        ('observed', pyarrow.float64()), ('updated', pyarrow.float64()),
+        ('subscription', pyarrow.string()), ('homework', pyarrow.string()),
+        ('status', pyarrow.string()),
+    ])
+    written = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) == EXPORT_BATCH:
+                writer.write_table(_parquet_table(batch, schema))
+                written += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(_parquet_table(batch, schema))
+            written += len(batch)
+    return written
+
+
+def _parquet_table(batch, schema):
+    columns = list(zip(*batch))
+    return pyarrow.table(
+        {name: list(column) for name, column in zip(FIELDS, columns)},
+        schema=schema
+    )
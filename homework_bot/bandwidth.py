@@ -0,0 +1,253 @@
+"""Сжатие ответов API, разбор только изменившихся тел и учёт трафика."""
+import hashlib
+import heapq
+import json
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from urllib.parse import urlencode, urlsplit
+
+from homework_bot.transport import token_key
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+CACHE_SIZE = 10000
+TOP = 20
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(-?\d+)')
+
+
+def accept_encoding():
+    """Кодировки ответа, которые умеет распаковать `requests`/`httpx`."""
+    return 'br, gzip' if brotli is not None else 'gzip'
+
+
+def received_bytes(response):
+    """Байты ответа на проводе: заголовки и тело до распаковки.
+
+    `requests` отдаёт прочитанное из сокета через `raw.tell()`, `httpx` —
+    через `num_bytes_downloaded`; у прочих ответов берётся длина тела.
+    Заголовки считаются в записи HTTP/1.1, для HTTP/2 это оценка сверху.
+    """
+    raw = getattr(response, 'raw', None)
+    if raw is not None and hasattr(raw, 'tell'):
+        body = raw.tell()
+    elif hasattr(response, 'num_bytes_downloaded'):
+        body = response.num_bytes_downloaded
+    else:
+        content = getattr(response, 'content', b'')
+        body = len(content) if isinstance(content, bytes) else 0
+    headers = getattr(response, 'headers', None) or {}
+    status = f'HTTP/1.1 {response.status_code} '
+    status += getattr(response, 'reason', None) or getattr(
+        response, 'reason_phrase', ''
+    )
+    return body + len(status) + 2 + _headers_size(headers.items()) + 2
+
+
+def sent_bytes(response, url, headers=None, params=None):
+    """Байты запроса: строка запроса и заголовки (тела у GET нет).
+
+    Берётся запрос, который ушёл на самом деле, со всеми заголовками
+    клиента; если ответ его не хранит — переданные аргументы.
+    """
+    request = getattr(response, 'request', None)
+    if request is not None and getattr(request, 'headers', None):
+        url = str(request.url)
+        headers = request.headers
+    elif params:
+        url = f'{url}?{urlencode(params)}'
+    parts = urlsplit(url)
+    target = parts.path or '/'
+    if parts.query:
+        target += f'?{parts.query}'
+    line = f'GET {target} HTTP/1.1\r\n'
+    host = f'Host: {parts.netloc}\r\n'
+    return len(line) + len(host) + _headers_size(
+        (headers or {}).items()
+    ) + 2
+
+
+def _headers_size(items):
+    return sum(len(str(name)) + len(str(value)) + 4 for name, value in items)
+
+
+class BandwidthMeter:
+    """Счётчики трафика опроса по эндпоинтам и подпискам.
+
+    Подписки различаются по обезличенному ключу токена; `label`
+    сопоставляет ключам имена подписок для отчёта. Счётчики подписок —
+    запросы, байты наружу и внутрь — лежат тройками в одной колонке
+    `array`, как состояние опроса. В `stats` попадают все эндпоинты и
+    `top` подписок с наибольшим входящим трафиком.
+    """
+
+    def __init__(self, top=TOP):
+        """Пустой счётчик; в отчёте `top` самых тяжёлых подписок."""
+        self.top = top
+        self.endpoints = {}
+        self.index = {}
+        self.column = array('Q')
+        self.encodings = {}
+        self.labels = {}
+        self.decoded = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def label(self, subscriptions):
+        """Имена подписок для ключей их токенов."""
+        self.labels = {
+            token_key(sub.headers): sub.name for sub in subscriptions
+        }
+
+    def record(self, endpoint, key, sent, received, encoding):
+        """Учитывает один запрос."""
+        with self._lock:
+            counters = self.endpoints.get(endpoint)
+            if counters is None:
+                counters = self.endpoints[endpoint] = [0, 0, 0]
+            counters[0] += 1
+            counters[1] += sent
+            counters[2] += received
+            slot = self.index.get(key)
+            if slot is None:
+                slot = self.index[key] = len(self.column)
+                self.column.extend((0, 0, 0))
+            self.column[slot] += 1
+            self.column[slot + 1] += sent
+            self.column[slot + 2] += received
+            self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+
+    def stats(self):
+        """Трафик по эндпоинтам, самые дорогие подписки и разбор тел."""
+        with self._lock:
+            endpoints = {
+                name: _traffic(counters)
+                for name, counters in self.endpoints.items()
+            }
+            column = self.column
+            top = heapq.nlargest(self.top, self.index.items(),
+                                 key=lambda item: column[item[1] + 2])
+            top = {
+                self.labels.get(key, key): _traffic(
+                    column[slot:slot + 3]
+                )
+                for key, slot in top
+            }
+            encodings = dict(self.encodings)
+        return {
+            'endpoints': endpoints,
+            'top_subscriptions': top,
+            'encodings': encodings,
+            'bodies_decoded': self.decoded,
+            'bodies_unchanged': self.reused,
+        }
+
+
+def _traffic(counters):
+    requests, sent, received = counters
+    return {
+        'requests': requests,
+        'bytes_out': sent,
+        'bytes_in': received,
+        'bytes_in_per_request': round(received / requests),
+    }
+
+
+class CompressedTransport:
+    """Транспорт со сжатием ответов, учётом трафика и кэшем разбора.
+
+    Запрашивает gzip (и brotli, если установлен пакет `brotli`), считает
+    байты в `meter` и отдаёт ответ, чей `json()` не разбирает тело, если
+    оно совпало с прошлым ответом того же эндпоинта и токена. Поле
+    `current_date` меняется каждую секунду, поэтому в хэш оно не входит,
+    а в результат подставляется свежее. Разобранные тела общие для
+    повторов и не должны изменяться. Кэш хранит `cache_size` последних
+    тел.
+    """
+
+    def __init__(self, inner, meter, cache_size=CACHE_SIZE,
+                 encoding=None):
+        """Обёртка над `inner` со счётчиком `meter`."""
+        self.inner = inner
+        self.meter = meter
+        self.cache_size = cache_size
+        self.encoding = encoding or accept_encoding()
+        self.cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос со сжатием и учётом трафика."""
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', self.encoding)
+        response = self.inner.get(url, headers=headers, params=params,
+                                  timeout=timeout)
+        key = token_key(headers)
+        response_headers = getattr(response, 'headers', None) or {}
+        self.meter.record(
+            url, key, sent_bytes(response, url, headers, params),
+            received_bytes(response),
+            response_headers.get('Content-Encoding', 'identity')
+        )
+        return CachedBodyResponse(response, self, (url, key))
+
+    def parse(self, cache_key, content):
+        """Разбор тела или прошлый результат, если тело не изменилось."""
+        match = CURRENT_DATE.search(content)
+        masked = content
+        if match is not None:
+            masked = content[:match.start(1)] + content[match.end(1):]
+        digest = hashlib.blake2b(masked, digest_size=16).digest()
+        with self._lock:
+            cached = self.cache.get(cache_key)
+            if cached is not None and cached[0] == digest:
+                self.cache.move_to_end(cache_key)
+                self.meter.reused += 1
+                data = cached[1]
+                if match is not None:
+                    data = dict(data, current_date=int(match.group(1)))
+                return data
+        data = json.loads(content)
+        with self._lock:
+            self.meter.decoded += 1
+            if isinstance(data, dict):
+                self.cache[cache_key] = (digest, data)
+                self.cache.move_to_end(cache_key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return data
+
+    def close(self):
+        """Закрывает внутренний транспорт."""
+        close = getattr(self.inner, 'close', None)
+        if close is not None:
+            close()
+
+
+class CachedBodyResponse:
+    """Ответ внутреннего транспорта с `json()` через кэш разбора."""
+
+    def __init__(self, response, transport, cache_key):
+        """Ответ `response` с разбором через кэш тел `transport`."""
+        self._response = response
+        self._transport = transport
+        self._cache_key = cache_key
+
+    def __getattr__(self, name):
+        """Остальные атрибуты — как у исходного ответа."""
+        return getattr(self._response, name)
+
+    def json(self):
+        """Разбор тела; неизменившееся тело не разбирается заново."""
+        content = getattr(self._response, 'content', None)
+        if self._response.status_code != 200 or not isinstance(
+            content, bytes
+        ):
+            return self._response.json()
+        return self._transport.parse(self._cache_key, content)
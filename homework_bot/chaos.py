@@ -0,0 +1,165 @@
+"""Внесение сбоев на границах HTTP и Telegram для проверки живучести."""
+import json
+import random
+import threading
+import time
+from typing import NamedTuple
+
+from homework_bot.telegram_api import TelegramApiError
+
+TARGETS = ('api', 'telegram')
+FAULTS = {
+    'api': ('latency', 'timeout', 'error', 'corrupt', 'no_homeworks'),
+    'telegram': ('latency', 'timeout', 'error'),
+}
+
+
+class Fault(NamedTuple):
+    """Вероятность сбоя и его длительность в секундах."""
+
+    probability: float
+    seconds: float = 0.0
+
+
+def parse_chaos(spec):
+    """Разбор строки вида `api.error=0.05,telegram.latency=0.1:2`.
+
+    Возвращает словарь `{цель: {сбой: Fault}}`.
+    """
+    faults = {target: {} for target in TARGETS}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, value = item.partition('=')
+        target, _, kind = name.strip().partition('.')
+        if kind not in FAULTS.get(target, ()):
+            raise ValueError(f'Неизвестный сбой: {name!r}.')
+        probability, _, seconds = value.partition(':')
+        fault = Fault(float(probability), float(seconds or 0))
+        if not 0 <= fault.probability <= 1 or fault.seconds < 0:
+            raise ValueError(f'Некорректные параметры сбоя: {item!r}.')
+        faults[target][kind] = fault
+    return faults
+
+
+class FaultInjector:
+    """Бросает кости по настроенным вероятностям и считает сбои."""
+
+    def __init__(self, faults, seed=None, sleep=time.sleep):
+        """Источник сбоев `faults` с генератором от `seed`."""
+        self.faults = faults
+        self.random = random.Random(seed)
+        self.sleep = sleep
+        self.injected = dict.fromkeys(faults, 0)
+        self._lock = threading.Lock()
+
+    def roll(self, kind):
+        """True, если сбой `kind` срабатывает на этом вызове."""
+        fault = self.faults.get(kind)
+        if fault is None:
+            return False
+        with self._lock:
+            hit = self.random.random() < fault.probability
+            if hit:
+                self.injected[kind] += 1
+        return hit
+
+    def delay(self, kind):
+        """Пауза на длительность сбоя, если он сработал."""
+        if self.roll(kind):
+            self.sleep(self.faults[kind].seconds)
+            return True
+        return False
+
+    def stats(self):
+        """Сработавшие сбои по видам."""
+        return dict(self.injected)
+
+
+class ChaosResponse:
+    """Подменный ответ API."""
+
+    def __init__(self, status_code, text):
+        """Поддельный ответ с кодом `status_code` и телом `text`."""
+        self.status_code = status_code
+        self.text = text
+        self.headers = {'Content-Type': 'application/json'}
+
+    def json(self):
+        """Разбор тела; у испорченного ответа — ValueError."""
+        return json.loads(self.text)
+
+
+class ChaosTransport:
+    """Транспорт, вносящий задержки, таймауты, 500 и битые ответы.
+
+    Пути ошибок бота: 500 — `ResponseStatusNot200`, таймаут и битый JSON —
+    `ApiAnswerError`, ответ без `homeworks` — `ResponseNoHomeworksKey`.
+    """
+
+    def __init__(self, inner, injector):
+        """Транспорт `inner` со сбоями от `injector`."""
+        self.inner = inner
+        self.injector = injector
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос со сбоями."""
+        self.injector.delay('latency')
+        if self.injector.delay('timeout'):
+            raise TimeoutError('Внесённый таймаут запроса.')
+        if self.injector.roll('error'):
+            return ChaosResponse(500, '{"error": "chaos"}')
+        response = self.inner.get(url, headers=headers, params=params,
+                                  timeout=timeout)
+        if response.status_code != 200:
+            return response
+        if self.injector.roll('corrupt'):
+            return ChaosResponse(200, response.text[:len(response.text) // 2])
+        if self.injector.roll('no_homeworks'):
+            return ChaosResponse(200, '{"current_date": 0}')
+        return response
+
+
+class ChaosBot:
+    """Обёртка бота: медленный и отказывающий Telegram."""
+
+    def __init__(self, inner, injector):
+        """Бот `inner` со сбоями от `injector`."""
+        self.inner = inner
+        self.injector = injector
+
+    def _fault(self):
+        self.injector.delay('latency')
+        if self.injector.delay('timeout'):
+            return TelegramApiError('Внесённый таймаут Telegram.')
+        if self.injector.roll('error'):
+            return TelegramApiError('Внесённая ошибка Telegram.', 500)
+        return None
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Отправка со сбоями."""
+        error = self._fault()
+        if error is not None:
+            raise error
+        return self.inner.send_message(chat_id, text, **kwargs)
+
+    def send_many(self, messages):
+        """Пачка со сбоями: у каждого сообщения свой бросок."""
+        messages = list(messages)
+        results = [self._fault() for _ in messages]
+        passed = [
+            message for message, error in zip(messages, results)
+            if error is None
+        ]
+        if hasattr(self.inner, 'send_many'):
+            sent = iter(self.inner.send_many(passed))
+        else:
+            sent = iter([self._send(*message) for message in passed])
+        return [
+            next(sent) if error is None else error for error in results
+        ]
+
+    def _send(self, chat_id, text):
+        try:
+            self.inner.send_message(chat_id, text)
+        except Exception as error:
+            return error
+        return True
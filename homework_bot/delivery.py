@@ -0,0 +1,99 @@
+"""Полосы приоритета и планировщик доставки уведомлений."""
+import logging
+import time
+
+from homework_bot.outbox import AGING, BATCH_SIZE
+from homework_bot.ratelimit import TokenBucket
+
+LOGGER = logging.getLogger(__name__)
+
+PRIORITY_VERDICT = 0
+PRIORITY_REVIEW = 1
+PRIORITY_ERROR = 2
+
+FINAL_STATUSES = ('approved', 'rejected')
+MAX_WAIT = 5.0
+
+
+def status_priority(status):
+    """Полоса для смены статуса: итоговый вердикт важнее взятия в работу."""
+    if status in FINAL_STATUSES:
+        return PRIORITY_VERDICT
+    return PRIORITY_REVIEW
+
+
+class DeliveryScheduler:
+    """Отправляет уведомления из outbox по полосам приоритета.
+
+    `rate` ограничивает отправку в Telegram (сообщений в секунду). Когда
+    лимит исчерпан, вызов ждёт пополнения, но не дольше `max_wait`
+    секунд за вызов; остаток уходит при следующем. Первыми уходят
+    вердикты; старение в `Outbox.due` не даёт нижним полосам голодать.
+    """
+
+    def __init__(self, outbox, rate=None, aging=AGING,
+                 batch_size=BATCH_SIZE, max_wait=MAX_WAIT,
+                 clock=time.monotonic, sleep=time.sleep):
+        """Планировщик доставки из `outbox`."""
+        self.outbox = outbox
+        self.bucket = TokenBucket(rate, clock=clock) if rate else None
+        self.aging = aging
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.sleep = sleep
+        self.sent = {}
+        self.failed = 0
+
+    def run(self, send):
+        """Отправляет пачку через `send(item)`; возвращает число отправленных.
+
+        `send` возвращает True, если Telegram принял сообщение.
+        """
+        return self.run_many(lambda items: [send(item) for item in items])
+
+    def run_many(self, send_many):
+        """Отправляет пачки, каждую одним вызовом `send_many(items)`.
+
+        `send_many` возвращает список успехов в порядке `items`, что
+        позволяет клиенту отправлять сообщения конвейером. Упёршись в
+        лимит, ждёт полного ведра, чтобы следующая пачка была целой.
+        """
+        delivered, waited = 0, 0.0
+        while True:
+            items, limited = self._take()
+            if items:
+                delivered += self._deliver(items, send_many)
+            if not limited:
+                return delivered
+            wait = self.bucket.wait_time(self.bucket.capacity)
+            if waited + wait > self.max_wait:
+                return delivered
+            self.sleep(wait)
+            waited += wait
+
+    def _take(self):
+        """Пачка к отправке и признак, что её урезал лимит частоты."""
+        items = []
+        for item in self.outbox.due(self.batch_size, self.aging):
+            if self.bucket is not None and not self.bucket.try_acquire():
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _deliver(self, items, send_many):
+        delivered = 0
+        for item, ok in zip(items, send_many(items)):
+            if ok:
+                self.outbox.ack(item.key)
+                self.sent[item.priority] = self.sent.get(item.priority, 0) + 1
+                delivered += 1
+                continue
+            self.failed += 1
+            if not self.outbox.fail(item.key):
+                LOGGER.error(f'Уведомление {item.key} не доставлено, '
+                             'попытки исчерпаны.')
+        return delivered
+
+    def stats(self):
+        """Отправлено по полосам и неудачные попытки."""
+        return {'sent_by_priority': dict(self.sent), 'failed': self.failed}
@@ -0,0 +1,226 @@
+"""Локальный поток событий смены статусов для внешних потребителей."""
+import collections
+import json
+import logging
+import os
+import socketserver
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 100
+BATCH_WAIT = 0.2
+
+
+class EventSubscriber:
+    """Очередь событий одного потребителя.
+
+    Очередь ограничена: когда потребитель не успевает, вытесняются самые
+    старые события и растёт счётчик `dropped`, а публикующий поток
+    никогда не ждёт.
+    """
+
+    def __init__(self, stream, queue_size=QUEUE_SIZE):
+        """Подписчик `stream` с очередью не длиннее `queue_size`."""
+        self.stream = stream
+        self.events = collections.deque(maxlen=queue_size)
+        self.dropped = 0
+        self.closed = False
+        self._ready = threading.Condition()
+
+    def offer(self, event):
+        """Кладёт событие в очередь, не блокируясь."""
+        with self._ready:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(event)
+            self._ready.notify()
+
+    def get_batch(self, limit=BATCH_SIZE, timeout=None):
+        """До `limit` событий; ждёт первое не дольше `timeout` секунд."""
+        with self._ready:
+            if not self.events and not self.closed:
+                self._ready.wait(timeout)
+            count = min(limit, len(self.events))
+            return [self.events.popleft() for _ in range(count)]
+
+    def close(self):
+        """Отписывается от потока и будит ждущего потребителя."""
+        self.stream.unsubscribe(self)
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+
+class EventStream:
+    """Встроенный pub/sub: публикация раздаёт событие всем подписчикам.
+
+    `publish` вызывается из цикла опроса и только кладёт событие в
+    очереди подписчиков; запись в сокеты и файлы идёт в их потоках
+    пачками.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        """Поток без подписчиков."""
+        self.queue_size = queue_size
+        self.published = 0
+        self._subscribers = ()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Новый подписчик."""
+        subscriber = EventSubscriber(self, self.queue_size)
+        with self._lock:
+            self._subscribers += (subscriber,)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Убирает подписчика."""
+        with self._lock:
+            self._subscribers = tuple(
+                item for item in self._subscribers if item is not subscriber
+            )
+
+    def publish(self, event):
+        """Раздаёт событие подписчикам, не блокируясь."""
+        self.published += 1
+        for subscriber in self._subscribers:
+            subscriber.offer(event)
+
+    def stats(self):
+        """Опубликовано событий, подписчиков и потерь у медленных."""
+        subscribers = self._subscribers
+        return {
+            'published': self.published,
+            'subscribers': len(subscribers),
+            'dropped': sum(item.dropped for item in subscribers),
+        }
+
+
+def encode_batch(events):
+    """Пачка событий в строки JSONL одним блоком байтов."""
+    return ''.join(
+        json.dumps(event, ensure_ascii=False) + '\n' for event in events
+    ).encode()
+
+
+class JsonlSink:
+    """Пишет поток событий в файл или именованный канал в формате JSONL.
+
+    Открытие FIFO ждёт читателя, а запись — пока читатель заберёт
+    данные; всё это происходит в собственном потоке. Если читатель
+    ушёл, канал открывается заново.
+    """
+
+    def __init__(self, stream, path, batch_size=BATCH_SIZE):
+        """Приёмник, дописывающий события `stream` в файл `path`."""
+        self.path = path
+        self.batch_size = batch_size
+        self.subscriber = stream.subscribe()
+        self.written = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Запускает поток записи."""
+        self._thread.start()
+        return self
+
+    def _run(self):
+        file = None
+        while True:
+            batch = self.subscriber.get_batch(self.batch_size, BATCH_WAIT)
+            if batch:
+                file = self._write(file, batch)
+            elif self.subscriber.closed:
+                break
+        if file is not None:
+            file.close()
+
+    def _write(self, file, batch):
+        """Дописывает пачку; возвращает открытый файл или None при сбое."""
+        try:
+            if file is None:
+                file = open(self.path, 'ab')
+            file.write(encode_batch(batch))
+            file.flush()
+            self.written += len(batch)
+            return file
+        except OSError as error:
+            LOGGER.warning(f'Поток событий в {self.path} прерван: {error}')
+        if file is not None:
+            try:
+                file.close()
+            except OSError:
+                pass
+        return None
+
+    def close(self):
+        """Дописывает очередь и останавливает запись."""
+        self.subscriber.close()
+        self._thread.join()
+
+
+class UnixSocketServer:
+    """Раздаёт поток событий клиентам Unix-сокета в формате JSONL.
+
+    Каждый клиент получает своего подписчика с ограниченной очередью:
+    медленный клиент теряет старые события, но не тормозит остальных.
+    """
+
+    def __init__(self, stream, path, batch_size=BATCH_SIZE):
+        """Сервер, раздающий события `stream` через сокет `path`."""
+        self.stream = stream
+        self.path = path
+        self.batch_size = batch_size
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socketserver.ThreadingUnixStreamServer(
+            path, self._make_handler()
+        )
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    def start(self):
+        """Запускает приём клиентов."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер и удаляет сокет."""
+        self._server.shutdown()
+        self._server.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+
+            def handle(self):
+                subscriber = server.stream.subscribe()
+                try:
+                    while True:
+                        batch = subscriber.get_batch(server.batch_size,
+                                                     BATCH_WAIT)
+                        if batch:
+                            self.request.sendall(encode_batch(batch))
+                except OSError:
+                    pass
+                finally:
+                    subscriber.close()
+
+        return Handler
+
+
+def open_sink(stream, spec):
+    """Приёмник по строке `unix:/путь` или `jsonl:/путь`."""
+    kind, _, path = spec.partition(':')
+    if kind == 'unix' and path:
+        return UnixSocketServer(stream, path).start()
+    if kind == 'jsonl' and path:
+        return JsonlSink(stream, path).start()
+    raise ValueError(f'Некорректный поток событий: {spec!r}.')
@@ -0,0 +1,191 @@
+"""HTTP-эндпоинт здоровья и сторожевой поток цикла опроса."""
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HealthState:
+    """Отметки прогресса цикла опроса и сводка для эндпоинта здоровья."""
+
+    def __init__(self, interval=0):
+        """Состояние до первого цикла; `interval` — период цикла."""
+        self.interval = interval
+        self.started = time.time()
+        self.cycle_started_at = None
+        self.cycle_finished_at = None
+        self.last_poll_ok = None
+        self.last_send_ok = None
+        self.stalled = False
+        self.providers = {}
+        self._lock = threading.Lock()
+
+    def cycle_started(self):
+        """Отмечает начало цикла."""
+        with self._lock:
+            self.cycle_started_at = time.time()
+            self.cycle_finished_at = None
+
+    def cycle_finished(self):
+        """Отмечает конец цикла."""
+        with self._lock:
+            self.cycle_finished_at = time.time()
+            self.stalled = False
+
+    def poll_ok(self):
+        """Отмечает успешный опрос API."""
+        self.last_poll_ok = time.time()
+
+    def send_ok(self):
+        """Отмечает успешную отправку сообщения."""
+        self.last_send_ok = time.time()
+
+    def register(self, name, provider):
+        """Добавляет в сводку раздел, `provider` возвращает словарь."""
+        self.providers[name] = provider
+
+    def running_for(self, now=None):
+        """Сколько секунд длится незавершённый цикл, иначе None."""
+        with self._lock:
+            if self.cycle_started_at is None or self.cycle_finished_at:
+                return None
+            return (now or time.time()) - self.cycle_started_at
+
+    def lag(self, now=None):
+        """Отставание от расписания опроса в секундах."""
+        now = now or time.time()
+        last = self.cycle_finished_at or self.cycle_started_at
+        if last is None:
+            return now - self.started
+        return max(0.0, now - last - self.interval)
+
+    def is_live(self):
+        """Цикл не завис."""
+        return not self.stalled
+
+    def is_ready(self):
+        """Был хотя бы один успешный опрос не позже двух интервалов назад."""
+        if self.last_poll_ok is None:
+            return False
+        return time.time() - self.last_poll_ok <= 2 * self.interval + 60
+
+    def snapshot(self):
+        """Состояние для отдачи в JSON."""
+        now = time.time()
+        data = {
+            'live': self.is_live(),
+            'ready': self.is_ready(),
+            'uptime': now - self.started,
+            'last_poll_ok': self.last_poll_ok,
+            'last_send_ok': self.last_send_ok,
+            'cycle_running_for': self.running_for(now),
+            'lag': self.lag(now),
+        }
+        for name, provider in self.providers.items():
+            try:
+                data[name] = provider()
+            except Exception as error:
+                data[name] = {'error': str(error)}
+        return data
+
+
+class HealthServer:
+    """Встроенный HTTP-сервер: `/health` (liveness) и `/ready`."""
+
+    def __init__(self, state, port, host='0.0.0.0'):
+        """Сервер эндпоинта здоровья для `state` на `host:port`."""
+        self.state = state
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def port(self):
+        """Порт, на котором слушает сервер."""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        threading.Thread(
+            target=self._server.serve_forever, name='health', daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        state = self.state
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                checks = {'/health': state.is_live, '/ready': state.is_ready}
+                check = checks.get(self.path.split('?')[0])
+                if check is None:
+                    self.send_error(404)
+                    return
+                body = json.dumps(state.snapshot(), default=str).encode()
+                self.send_response(200 if check() else 503)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class Watchdog:
+    """Сторожевой поток: помечает зависший цикл и при желании рестартует.
+
+    Рестарт делается выходом процесса с ненулевым кодом, поднять его
+    заново должен оркестратор (Heroku, systemd).
+    """
+
+    def __init__(self, state, stall_after, restart=False, check_every=None):
+        """Сторож `state`, срабатывающий после `stall_after` секунд."""
+        self.state = state
+        self.stall_after = stall_after
+        self.restart = restart
+        self.check_every = check_every or max(1.0, stall_after / 4)
+        self._stop = threading.Event()
+
+    def check(self):
+        """Одна проверка; возвращает True, если цикл завис."""
+        running = self.state.running_for()
+        if running is None or running < self.stall_after:
+            return False
+        if not self.state.stalled:
+            LOGGER.critical(
+                f'Цикл опроса не завершается уже {running:.0f} с.'
+            )
+        self.state.stalled = True
+        if self.restart:
+            LOGGER.critical('Перезапуск процесса сторожевым потоком.')
+            logging.shutdown()
+            os._exit(1)
+        return True
+
+    def start(self):
+        """Запускает проверки в фоновом потоке."""
+        threading.Thread(target=self._run, name='watchdog',
+                         daemon=True).start()
+        return self
+
+    def stop(self):
+        """Останавливает проверки."""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.check_every):
+            self.check()
+
+
+HEALTH = HealthState()
@@ -0,0 +1,169 @@
+"""Подстраховочные запросы к API против медленного хвоста ответов."""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from homework_bot.analytics import LogSketch
+from homework_bot.transport import token_key
+
+QUANTILE = 0.95
+BUDGET = 0.05
+BURST = 10
+MIN_SAMPLES = 50
+WINDOW = 1000
+RECOMPUTE = 16
+WORKERS = 8
+
+
+class HedgedTransport:
+    """Транспорт, повторяющий запрос, если ответ задержался дольше p95.
+
+    Если за `quantile` наблюдённых задержек ответ не пришёл, отправляется
+    второй такой же запрос, и вызывающий получает тот, что ответит
+    первым; второй досчитывается в пуле и отбрасывается. Задержки
+    копятся в скетче `LogSketch` по двум последним окнам по `window`
+    запросов, так что порог следует за сменой задержек API. Пока
+    замеров меньше `min_samples`, запросы не дублируются.
+
+    Бюджет ограничивает лишний трафик: каждый запрос прибавляет `budget`
+    подстраховки, накапливается не больше `burst`, и без кредита
+    запрос просто ждёт. С ограничителем частоты `limiter` подстраховка
+    тратит его разрешение без ожидания; если лимит исчерпан, её нет.
+    GET к API идемпотентен, так что ответ любого из двух запросов годится.
+    """
+
+    def __init__(self, inner, quantile=QUANTILE, budget=BUDGET,
+                 burst=BURST, min_samples=MIN_SAMPLES, window=WINDOW,
+                 workers=WORKERS, limiter=None):
+        """Обёртка над `inner`; порог и бюджет — из параметров."""
+        self.inner = inner
+        self.limiter = limiter
+        self.quantile = quantile
+        self.budget = budget
+        self.burst = burst
+        self.min_samples = min_samples
+        self.window = window
+        self.credit = float(burst)
+        self.current = LogSketch()
+        self.previous = LogSketch()
+        self.served = LogSketch()
+        self.raw = LogSketch()
+        self.threshold = None
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self.denied = 0
+        self._stale = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers,
+                                        thread_name_prefix='hedge')
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос с подстраховкой после порога задержки."""
+        started = time.monotonic()
+        delay = self._admit()
+        primary = self._submit(started, url, headers, params, timeout)
+        done, _ = wait((primary,), timeout=delay)
+        if not done and self._spend(headers):
+            backup = self._submit(time.monotonic(), url, headers, params,
+                                  timeout)
+            response = self._first((primary, backup))
+        else:
+            response = primary.result()
+        with self._lock:
+            self.served.add(time.monotonic() - started)
+        return response
+
+    def _admit(self):
+        """Порог подстраховки для нового запроса; None — не страховать."""
+        with self._lock:
+            self.requests += 1
+            self.credit = min(self.burst, self.credit + self.budget)
+            if self._stale >= RECOMPUTE or self.threshold is None:
+                self._stale = 0
+                if self.current.count + self.previous.count >= (
+                    self.min_samples
+                ):
+                    sketch = LogSketch(self.current.accuracy)
+                    sketch.merge(self.previous)
+                    sketch.merge(self.current)
+                    self.threshold = sketch.quantile(self.quantile)
+            return self.threshold
+
+    def _spend(self, headers):
+        with self._lock:
+            if self.credit < 1 or self.limiter is not None and not (
+                self.limiter.try_acquire(token_key(headers))
+            ):
+                self.denied += 1
+                return False
+            self.credit -= 1
+            self.hedged += 1
+            return True
+
+    def _submit(self, started, url, headers, params, timeout):
+        future = self._pool.submit(self.inner.get, url, headers=headers,
+                                   params=params, timeout=timeout)
+        future.add_done_callback(
+            lambda done: self._observe(time.monotonic() - started, done)
+        )
+        return future
+
+    def _observe(self, elapsed, future):
+        if future.exception() is not None:
+            return
+        with self._lock:
+            self.raw.add(elapsed)
+            self.current.add(elapsed)
+            self._stale += 1
+            if self.current.count >= self.window:
+                self.previous, self.current = self.current, LogSketch(
+                    self.current.accuracy
+                )
+
+    def _first(self, futures):
+        """Первый успешный ответ; ошибка первого запроса, если упали оба."""
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future in done and future.exception() is None:
+                    if future is futures[1]:
+                        with self._lock:
+                            self.won += 1
+                    return future.result()
+        return futures[0].result()
+
+    def stats(self):
+        """Порог, доля подстраховок и хвост задержки до и после них."""
+        with self._lock:
+            return {
+                'threshold': (
+                    None if self.threshold is None
+                    else round(self.threshold, 4)
+                ),
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'hedge_won': self.won,
+                'hedge_denied': self.denied,
+                'hedge_share': round(
+                    self.hedged / self.requests if self.requests else 0.0, 4
+                ),
+                'attempt_latency': _tail(self.raw),
+                'served_latency': _tail(self.served),
+            }
+
+    def close(self):
+        """Останавливает пул и закрывает внутренний транспорт."""
+        self._pool.shutdown(wait=False)
+        close = getattr(self.inner, 'close', None)
+        if close is not None:
+            close()
+
+
+def _tail(sketch):
+    tail = {}
+    for name, share in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        value = sketch.quantile(share)
+        tail[name] = None if value is None else round(value, 4)
+    return tail
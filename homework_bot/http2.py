@@ -0,0 +1,108 @@
+"""HTTP/2-транспорт с общим пулом соединений и кэш DNS."""
+import socket
+import threading
+import time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DNS_TTL = 300
+MAX_KEEPALIVE = 32
+
+
+class DnsCache:
+    """Кэш `socket.getaddrinfo` с временем жизни записей.
+
+    Подключается на весь процесс, поэтому работает и для `requests`, и
+    для `httpx`. Если DNS недоступен, отдаётся устаревшая запись.
+    """
+
+    def __init__(self, ttl=DNS_TTL, resolver=None, clock=time.monotonic):
+        """Кэш ответов `resolver` на `ttl` секунд."""
+        self.ttl = ttl
+        self.resolver = resolver or socket.getaddrinfo
+        self.clock = clock
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._original = None
+
+    def getaddrinfo(self, *args, **kwargs):
+        """Замена `socket.getaddrinfo` с кэшированием."""
+        key = (args, tuple(sorted(kwargs.items())))
+        now = self.clock()
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        try:
+            result = self.resolver(*args, **kwargs)
+        except OSError:
+            if entry is not None:
+                return entry[1]
+            raise
+        with self._lock:
+            self.entries[key] = (now + self.ttl, result)
+        return result
+
+    def install(self):
+        """Подменяет `socket.getaddrinfo` в процессе."""
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            self.resolver = self._original
+            socket.getaddrinfo = self.getaddrinfo
+        return self
+
+    def uninstall(self):
+        """Возвращает исходный `socket.getaddrinfo`."""
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def stats(self):
+        """Попадания и промахи кэша."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(self.entries)}
+
+
+class Http2Transport:
+    """Транспорт на `httpx.Client` с HTTP/2.
+
+    Один клиент на процесс: параллельные опросы из разных потоков идут
+    потоками HTTP/2 поверх нескольких соединений вместо отдельного
+    TCP+TLS соединения на каждый запрос. Если сервер не умеет HTTP/2,
+    клиент работает по HTTP/1.1 с keep-alive.
+
+    Общее число соединений не ограничивается: при жёстком лимите ниже
+    числа потоков синхронный пул httpcore теряет соединения. Держится
+    не больше `max_keepalive` открытых соединений.
+    """
+
+    def __init__(self, max_keepalive=MAX_KEEPALIVE, http2=True):
+        """Клиент httpx с пулом до `max_keepalive` соединений."""
+        if httpx is None:
+            raise RuntimeError('Для HTTP/2 установите пакет httpx[http2].')
+        try:
+            self.client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(max_connections=None,
+                                    max_keepalive_connections=max_keepalive),
+            )
+        except ImportError as error:
+            raise RuntimeError(
+                'Для HTTP/2 установите пакет httpx[http2].'
+            ) from error
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос, ответ совместим по интерфейсу с `requests`."""
+        return self.client.get(url, headers=dict(headers or {}),
+                               params=params, timeout=timeout)
+
+    def close(self):
+        """Закрывает соединения."""
+        self.client.close()
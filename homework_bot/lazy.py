@@ -0,0 +1,24 @@
+"""Отложенный импорт модулей, нужных не каждому запуску."""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Модуль `name`, который загрузится при первом обращении к атрибуту.
+
+    Уже загруженный модуль возвращается как есть. Ошибка импорта
+    отсутствующего пакета возникает сразу: проверяется только наличие
+    модуля, а его код выполняется позже.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,15 @@
+"""Исходящие уведомления."""
+
+
+class Notification(str):
+    """Текст сообщения вместе с чатом-адресатом и ключом идемпотентности.
+
+    Остаётся строкой, поэтому годится везде, где ожидается текст.
+    """
+
+    def __new__(cls, text, chat_id=None, key=None):
+        """Создаёт уведомление для чата `chat_id`."""
+        notification = super().__new__(cls, text)
+        notification.chat_id = chat_id
+        notification.key = key
+        return notification
@@ -0,0 +1,212 @@
+"""Журнал исходящих уведомлений с идемпотентной доставкой."""
+import sqlite3
+import threading
+import time
+import uuid
+from typing import NamedTuple
+
+MAX_ATTEMPTS = 20
+BACKOFF_BASE = 5
+BACKOFF_MAX = 60 * 30
+BATCH_SIZE = 100
+AGING = 60 * 5
+MAX_TEXT = 4096
+MERGE_SEPARATOR = '\n\n'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_lane
+    ON outbox (state, priority, created);
+'''
+
+
+def transition_key(chat_id, homework):
+    """Ключ идемпотентности смены статуса: чат, работа, статус, дата."""
+    return ':'.join(str(part) for part in (
+        chat_id, homework.get('id'), homework.get('status'),
+        homework.get('date_updated'),
+    ))
+
+
+class OutboxItem(NamedTuple):
+    """Уведомление, ожидающее доставки."""
+
+    key: str
+    chat_id: str
+    text: str
+    priority: int
+    created: float
+    attempts: int
+
+
+class Outbox:
+    """Очередь уведомлений в SQLite.
+
+    Смена статуса сначала записывается под ключом идемпотентности и лишь
+    потом отправляется; после подтверждения запись помечается
+    доставленной. Повторная запись с тем же ключом игнорируется, поэтому
+    повторно увиденный переход не дублирует сообщение, а неотправленные
+    после падения процесса уйдут при следующем запуске. Очередь живёт
+    на диске, в памяти держится только текущая пачка.
+    """
+
+    def __init__(self, path=':memory:', max_attempts=MAX_ATTEMPTS,
+                 clock=time.time):
+        """Открывает outbox в SQLite-файле `path`."""
+        self.path = path
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._db = sqlite3.connect(path, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def put(self, chat_id, text, key=None, priority=0):
+        """Добавляет уведомление; False, если ключ уже встречался."""
+        now = self.clock()
+        with self._lock:
+            cursor = self._db.execute(
+                'INSERT OR IGNORE INTO outbox (key, chat_id, text, priority,'
+                ' created, next_attempt) VALUES (?, ?, ?, ?, ?, ?)',
+                (key or uuid.uuid4().hex, str(chat_id), str(text), priority,
+                 now, now)
+            )
+        return cursor.rowcount == 1
+
+    def due(self, limit=BATCH_SIZE, aging=AGING):
+        """Уведомления, которые пора отправить, в порядке очерёдности.
+
+        Меньший `priority` уходит раньше, но каждые `aging` секунд
+        ожидания поднимают уведомление на одну полосу, чтобы нижние
+        полосы не голодали при постоянном потоке верхних.
+        """
+        now = self.clock()
+        with self._lock:
+            lanes = [row[0] for row in self._db.execute(
+                'SELECT DISTINCT priority FROM outbox WHERE state = ?',
+                ('pending',)
+            )]
+            rows = []
+            for lane in lanes:
+                rows.extend(self._db.execute(
+                    'SELECT key, chat_id, text, priority, created, attempts '
+                    'FROM outbox WHERE state = ? AND priority = ? '
+                    'AND next_attempt <= ? ORDER BY created LIMIT ?',
+                    ('pending', lane, now, limit)
+                ).fetchall())
+        items = [OutboxItem(*row) for row in rows]
+        items.sort(key=lambda item: (
+            item.priority - (now - item.created) / aging, item.created
+        ))
+        return items[:limit]
+
+    def ack(self, key):
+        """Помечает уведомление доставленным."""
+        with self._lock:
+            self._db.execute(
+                'UPDATE outbox SET state = ?, last_error = NULL '
+                'WHERE key = ?', ('done', key)
+            )
+
+    def fail(self, key, error=None):
+        """Откладывает повтор с экспоненциальной паузой.
+
+        После `max_attempts` попыток уведомление помечается `dead`.
+        Возвращает True, если повтор ещё будет.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT attempts FROM outbox WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts = row[0] + 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+            state = 'pending' if attempts < self.max_attempts else 'dead'
+            self._db.execute(
+                'UPDATE outbox SET attempts = ?, next_attempt = ?, '
+                'state = ?, last_error = ? WHERE key = ?',
+                (attempts, self.clock() + delay, state,
+                 None if error is None else str(error), key)
+            )
+        return state == 'pending'
+
+    def merge(self, max_length=MAX_TEXT):
+        """Склеивает ожидающие уведомления каждого чата в одно сообщение.
+
+        Склеенное сообщение не длиннее `max_length`, получает высший из
+        приоритетов и самое раннее время создания; исходные записи
+        остаются в состоянии `merged` и по-прежнему защищают свои ключи
+        от повторов. Возвращает, на сколько сообщений стало меньше.
+        """
+        now = self.clock()
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT key, chat_id, text, priority, created FROM outbox '
+                'WHERE state = ? ORDER BY chat_id, created', ('pending',)
+            ).fetchall()
+            groups = []
+            for row in rows:
+                group = groups[-1] if groups else None
+                if (
+                    group is None or group[0][1] != row[1]
+                    or sum(len(item[2]) for item in group)
+                    + len(MERGE_SEPARATOR) * len(group) + len(row[2])
+                    > max_length
+                ):
+                    groups.append([row])
+                else:
+                    group.append(row)
+            saved = 0
+            self._db.execute('BEGIN IMMEDIATE')
+            for group in groups:
+                if len(group) < 2:
+                    continue
+                self._db.execute(
+                    'INSERT INTO outbox (key, chat_id, text, priority, '
+                    'created, next_attempt) VALUES (?, ?, ?, ?, ?, ?)',
+                    (f'merged:{uuid.uuid4().hex}', group[0][1],
+                     MERGE_SEPARATOR.join(item[2] for item in group),
+                     min(item[3] for item in group), group[0][4], now)
+                )
+                self._db.executemany(
+                    'UPDATE outbox SET state = ? WHERE key = ?',
+                    (('merged', item[0]) for item in group)
+                )
+                saved += len(group) - 1
+            self._db.execute('COMMIT')
+        return saved
+
+    def purge(self, older_than):
+        """Удаляет доставленные и склеенные записи старше `older_than`."""
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM outbox WHERE state IN (?, ?) AND created < ?',
+                ('done', 'merged', self.clock() - older_than)
+            )
+
+    def stats(self):
+        """Количество записей по состояниям."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT state, COUNT(*) FROM outbox GROUP BY state'
+            ).fetchall()
+        counts = {'pending': 0, 'done': 0, 'dead': 0}
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        """Закрывает базу."""
+        self._db.close()
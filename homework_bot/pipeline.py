@@ -0,0 +1,221 @@
+"""Конвейер опроса с ограниченными очередями и сбросом нагрузки."""
+import queue
+import threading
+import time
+import zlib
+
+from homework_bot.analytics import LogSketch
+
+QUEUE_SIZE = 64
+IDLE_AFTER = 60 * 60 * 24
+MAX_SKIPS = 3
+MERGE_PENDING = 50
+COOLDOWN = 60
+SMOOTHING = 0.3
+
+_DONE = object()
+
+
+class PollPipeline:
+    """Загрузка → проверка и разбор → доставка.
+
+    Загрузку ведут `workers` потоков, результаты идут в очередь не
+    длиннее `queue_size`; проверку ответа и разбор статуса делает
+    вызывающий поток. Когда он не успевает, загрузчики ждут места в
+    очереди, а не копят ответы в памяти. Очередь к доставке — outbox.
+    Время ожидания в очереди и число упоров в её предел видны в `stats`.
+    """
+
+    def __init__(self, workers=1, queue_size=QUEUE_SIZE,
+                 clock=time.monotonic):
+        """Конвейер с `workers` загрузчиками."""
+        self.workers = workers
+        self.queue_size = queue_size
+        self.clock = clock
+        self.wait = LogSketch()
+        self.processed = 0
+        self.blocked = 0
+        self.max_depth = 0
+
+    def run(self, items, fetch, process, failed):
+        """Прогоняет `items` через конвейер.
+
+        `fetch(item)` выполняется в потоках загрузки, `process(item,
+        результат)` — в вызывающем потоке; исключение любой стадии
+        уходит в `failed(item, error)` и не останавливает остальные.
+        """
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            for item in items:
+                self._handle(item, process, failed, *self._fetch(item, fetch))
+            return
+        results = queue.Queue(self.queue_size)
+        source = iter(items)
+        lock = threading.Lock()
+
+        def load():
+            while True:
+                with lock:
+                    item = next(source, _DONE)
+                if item is _DONE:
+                    break
+                self._offer(results, (item, self.clock(),
+                                      *self._fetch(item, fetch)))
+            results.put(_DONE)
+
+        threads = [
+            threading.Thread(target=load, daemon=True)
+            for _ in range(min(self.workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        running = len(threads)
+        while running:
+            entry = results.get()
+            if entry is _DONE:
+                running -= 1
+                continue
+            item, queued, value, error = entry
+            self.wait.add(self.clock() - queued)
+            self._handle(item, process, failed, value, error)
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def _fetch(item, fetch):
+        try:
+            return fetch(item), None
+        except Exception as error:
+            return None, error
+
+    def _handle(self, item, process, failed, value, error):
+        self.processed += 1
+        if error is None:
+            try:
+                process(item, value)
+                return
+            except Exception as process_error:
+                error = process_error
+        failed(item, error)
+
+    def _offer(self, results, entry):
+        try:
+            results.put_nowait(entry)
+        except queue.Full:
+            self.blocked += 1
+            results.put(entry)
+        self.max_depth = max(self.max_depth, results.qsize())
+
+    def stats(self):
+        """Обработано, упоры в предел очереди и ожидание в ней."""
+        wait_p95 = self.wait.quantile(0.95)
+        return {
+            'processed': self.processed,
+            'queue_size': self.queue_size,
+            'max_depth': self.max_depth,
+            'blocked': self.blocked,
+            'wait_p95': None if wait_p95 is None else round(wait_p95, 4),
+        }
+
+
+class LoadShedder:
+    """Сброс нагрузки, когда опросы начинаются с опозданием.
+
+    Отставание — насколько позже срока начался опрос — сглаживается
+    экспоненциально. Пока оно выше `max_lag` секунд, уровень сброса
+    растёт до `max_skips`: на уровне `n` подписка без смены статуса
+    дольше `idle_after` опрашивается на одном сроке из `n + 1`, а
+    накопившиеся уведомления одного чата склеиваются. Когда отставание
+    падает ниже половины порога, уровень снижается, но не чаще раза в
+    `cooldown` секунд: без запаса по мощности снятый сброс сразу вернул
+    бы отставание. `max_lag=0` — сброс выключен, отставание только
+    измеряется.
+    """
+
+    def __init__(self, max_lag=0, idle_after=IDLE_AFTER, max_skips=MAX_SKIPS,
+                 merge_pending=MERGE_PENDING, cooldown=COOLDOWN,
+                 smoothing=SMOOTHING):
+        """Сброс нагрузки при отставании больше `max_lag` секунд."""
+        self.max_lag = max_lag
+        self.idle_after = idle_after
+        self.max_skips = max_skips
+        self.merge_pending = merge_pending
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.level = 0
+        self.changed = {}
+        self.turns = {}
+        self.skipped = 0
+        self.merged = 0
+        self._lowered = None
+
+    @property
+    def shedding(self):
+        """Идёт ли сброс нагрузки."""
+        return self.level > 0
+
+    def observe(self, lag, now):
+        """Учитывает отставание очередного опроса; True, если идёт сброс."""
+        self.lag += self.smoothing * (max(0.0, lag) - self.lag)
+        if not self.max_lag:
+            return False
+        if self.lag > self.max_lag:
+            self.level = min(self.max_skips, self.level + 1)
+            self._lowered = now
+        elif self.level and self.lag < self.max_lag / 2 and (
+            now - self._lowered >= self.cooldown
+        ):
+            self.level -= 1
+            self._lowered = now
+        return self.shedding
+
+    def touch(self, name, now):
+        """Отмечает смену статуса подписки."""
+        self.changed[name] = now
+
+    def forget(self, name):
+        """Забывает удалённую подписку."""
+        self.changed.pop(name, None)
+        self.turns.pop(name, None)
+
+    def admit(self, subscriptions, now):
+        """Подписки, которые опрашиваются в этом цикле.
+
+        При сбросе подписки со свежими сменами статуса идут первыми,
+        чтобы не ждать в очереди за простаивающими. Номер срока
+        простаивающей подписки начинается со смещения по имени, чтобы
+        пропущенные опросы не возвращались все в одном цикле.
+        """
+        if not self.shedding:
+            for subscription in subscriptions:
+                self.changed.setdefault(subscription.name, now)
+            return list(subscriptions)
+        hot, idle = [], []
+        for subscription in subscriptions:
+            name = subscription.name
+            if now - self.changed.setdefault(name, now) < self.idle_after:
+                hot.append(subscription)
+                continue
+            turn = self.turns.get(name)
+            if turn is None:
+                turn = zlib.crc32(name.encode())
+            self.turns[name] = turn + 1
+            if turn % (self.level + 1):
+                self.skipped += 1
+                continue
+            idle.append(subscription)
+        return hot + idle
+
+    def should_merge(self, pending):
+        """Пора ли склеивать уведомления в outbox."""
+        return self.shedding and pending > self.merge_pending
+
+    def stats(self):
+        """Отставание, уровень сброса и сброшенная работа."""
+        return {
+            'lag': round(self.lag, 3),
+            'level': self.level,
+            'skipped_polls': self.skipped,
+            'merged_sends': self.merged,
+        }
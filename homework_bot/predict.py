@@ -0,0 +1,352 @@
+"""Предсказательное расписание опросов по наблюдённому времени проверки."""
+import bisect
+import heapq
+import json
+import math
+import os
+import tempfile
+import time
+
+from homework_bot.analytics import LogSketch
+
+MIN_SAMPLES = 20
+MIN_INTERVAL = 60
+MAX_FACTOR = 4
+BUDGET = 1.0
+HOURS = 24
+CREDIT_SECONDS = 60 * 60
+ALL = '*'
+
+
+class Survival:
+    """Доля длительностей больше `t` по снимку скетча `LogSketch`.
+
+    Внутри корзины скетча значения считаются распределёнными равномерно:
+    корзина шириной в доли процента от длительности — это десятки минут
+    на сутках, и без интерполяции вероятность смены за интервал опроса
+    внутри одной корзины была бы нулевой.
+    """
+
+    def __init__(self, sketch):
+        """Кривая выживания по скетчу длительностей `sketch`."""
+        self.count = sketch.count
+        self.gamma = sketch.gamma
+        indices = sorted(sketch.buckets)
+        self.bounds = [sketch.gamma ** index for index in indices]
+        self.sizes = [sketch.buckets[index] for index in indices]
+        self.cumulative = []
+        seen = sketch.zeros
+        for size in self.sizes:
+            seen += size
+            self.cumulative.append(seen)
+        self.zeros = sketch.zeros
+
+    def __call__(self, elapsed):
+        """Доля проверок, длившихся дольше `elapsed` секунд."""
+        position = bisect.bisect_left(self.bounds, elapsed)
+        shorter = self.cumulative[position - 1] if position else self.zeros
+        if position < len(self.bounds):
+            upper = self.bounds[position]
+            lower = upper / self.gamma
+            if elapsed > lower:
+                shorter += self.sizes[position] * (elapsed - lower) / (
+                    upper - lower
+                )
+        return 1.0 - shorter / self.count
+
+
+def hour_weights(hours):
+    """Вес каждого часа суток: 1 — в среднем, со сглаживанием Лапласа."""
+    total = sum(hours)
+    return [HOURS * (count + 1) / (total + HOURS) for count in hours]
+
+
+class TurnaroundModel:
+    """Вероятность смены статуса подписки по наблюдённым переходам.
+
+    Учится на том, что видит опрос: сколько последняя работа подписки
+    пробыла в статусе, прежде чем сменилась она сама или пришла новая
+    работа, и в какой час суток (UTC) это случилось. Когорта — статус:
+    у одного студента слишком мало проверок, чтобы учить распределение
+    на нём, а по статусу их тысячи. Пока в когорте меньше `min_samples`
+    переходов, берётся общее распределение, а без него смена считается
+    равновероятной во времени.
+    """
+
+    def __init__(self, min_samples=MIN_SAMPLES):
+        """Пустая модель; когорта нужна из `min_samples` замеров."""
+        self.min_samples = min_samples
+        self.durations = {}
+        self.hours = {}
+        self.current = {}
+        self.dirty = False
+        self._survival = {}
+        self._weights = {}
+
+    def observe(self, name, status, since):
+        """Последняя работа подписки в `status` с момента `since`."""
+        previous = self.current.get(name)
+        if previous is not None and previous[0] == status and (
+            previous[1] == since
+        ):
+            return
+        self.current[name] = (status, since)
+        self.dirty = True
+        if previous is None or since <= previous[1]:
+            return
+        hour = time.gmtime(since).tm_hour
+        for cohort in (previous[0], ALL):
+            sketch = self.durations.get(cohort)
+            if sketch is None:
+                sketch = self.durations[cohort] = LogSketch()
+            sketch.add(since - previous[1])
+            hours = self.hours.get(cohort)
+            if hours is None:
+                hours = self.hours[cohort] = [0] * HOURS
+            hours[hour] += 1
+
+    def forget(self, name):
+        """Забывает удалённую подписку."""
+        if self.current.pop(name, None) is not None:
+            self.dirty = True
+
+    def cohort(self, status):
+        """Когорта с достаточными данными: статус, все статусы или None."""
+        for cohort in (status, ALL):
+            sketch = self.durations.get(cohort)
+            if sketch is not None and sketch.count >= self.min_samples:
+                return cohort
+        return None
+
+    def survival(self, cohort):
+        """Функция выживания когорты по текущему скетчу."""
+        sketch = self.durations[cohort]
+        survival = self._survival.get(cohort)
+        if survival is None or survival.count != sketch.count:
+            survival = self._survival[cohort] = Survival(sketch)
+        return survival
+
+    def hour_weight(self, cohort, moment):
+        """Во сколько раз час `moment` чаще среднего приносит смену."""
+        hours = self.hours.get(cohort)
+        if hours is None:
+            return 1.0
+        total = sum(hours)
+        cached = self._weights.get(cohort)
+        if cached is None or cached[0] != total:
+            cached = self._weights[cohort] = (total, hour_weights(hours))
+        return cached[1][time.gmtime(moment).tm_hour]
+
+    def change_probability(self, name, last, now, interval):
+        """Вероятность, что статус сменился между опросами `last` и `now`.
+
+        Время — по часам `time.time`, как `date_updated` работ. Если
+        работа в статусе дольше всех наблюдённых, хвост считается
+        экспоненциальным со средним когорты.
+        """
+        current = self.current.get(name)
+        cohort = None if current is None else self.cohort(current[0])
+        if cohort is None:
+            return 1.0 - math.exp(-(now - last) / interval)
+        since = current[1]
+        survival = self.survival(cohort)
+        before = survival(last - since)
+        if before > 0:
+            changed = 1.0 - survival(now - since) / before
+        else:
+            sketch = self.durations[cohort]
+            changed = 1.0 - math.exp(
+                -(now - last) * sketch.count / sketch.total
+            )
+        return min(1.0, changed * self.hour_weight(cohort, now))
+
+    def to_dict(self):
+        """Сериализация модели."""
+        return {
+            'durations': {
+                cohort: sketch.to_dict()
+                for cohort, sketch in self.durations.items()
+            },
+            'hours': self.hours,
+            'current': self.current,
+        }
+
+    @classmethod
+    def from_dict(cls, data, min_samples=MIN_SAMPLES):
+        """Восстановление модели."""
+        model = cls(min_samples)
+        model.durations = {
+            cohort: LogSketch.from_dict(sketch)
+            for cohort, sketch in data['durations'].items()
+        }
+        model.hours = data['hours']
+        model.current = {
+            name: tuple(value) for name, value in data['current'].items()
+        }
+        return model
+
+    def save(self, path):
+        """Атомарно сохраняет модель в JSON."""
+        data = self.to_dict()
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            'w', dir=directory, delete=False, suffix='.tmp'
+        ) as file:
+            json.dump(data, file)
+        os.replace(file.name, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path, min_samples=MIN_SAMPLES):
+        """Загружает модель; пустую, если файла нет."""
+        if not os.path.exists(path):
+            return cls(min_samples)
+        with open(path) as file:
+            return cls.from_dict(json.load(file), min_samples)
+
+
+class PredictiveSchedule:
+    """Расписание, тратящее общий бюджет опросов там, где смена вероятнее.
+
+    Бюджет — столько же опросов, сколько сделал бы фиксированный
+    `interval` каждой подписки (умноженное на `budget`). Он копится
+    равномерно как кредит, больше часа бюджета не копится. На каждом
+    тике кредит уходит на подписки с наибольшей ожидаемой задержкой ещё
+    не замеченной смены статуса; часы суток, когда ревьюеры работают,
+    учитываются в вероятности смены, а не в бюджете.
+    Новые подписки опрашиваются сразу и вне бюджета, как и при
+    фиксированном интервале; каждая — не чаще `min_interval` и
+    не реже `max_factor` своих интервалов, даже если модель против.
+
+    Интерфейс как у `PollSchedule`: `sync`, `due`, `wait` и `lag`; `now` — по
+    `time.monotonic`, модель получает время по `time.time`. Выбор —
+    O(n) на тик: политика рассчитана на тысячи подписок, а не на
+    миллионы, для них остаётся колесо таймеров.
+    """
+
+    def __init__(self, subscriptions=(), model=None, start=0.0, wall=None,
+                 min_interval=MIN_INTERVAL, max_factor=MAX_FACTOR,
+                 budget=BUDGET):
+        """Расписание подписок `subscriptions` по модели `model`."""
+        self.model = model
+        self.offset = (time.time() if wall is None else wall) - start
+        self.min_interval = min_interval
+        self.max_factor = max_factor
+        self.budget = budget
+        self.subscriptions = {}
+        self.last = {}
+        self.rate = 0.0
+        self.credit = 0.0
+        self.updated = start
+        self.lag = 0.0
+        self.polls = 0
+        self.sync(subscriptions, start)
+
+    def __len__(self):
+        """Число подписок в расписании."""
+        return len(self.subscriptions)
+
+    def sync(self, subscriptions, now):
+        """Приводит расписание к новому набору подписок."""
+        fresh = {sub.name: sub for sub in subscriptions}
+        for name in self.subscriptions.keys() - fresh.keys():
+            self.last.pop(name, None)
+        self.subscriptions = fresh
+        self.rate = self.budget * sum(
+            1 / sub.interval for sub in fresh.values() if sub.interval > 0
+        )
+
+    def due(self, now):
+        """Подписки, которые стоит опросить сейчас."""
+        wall = now + self.offset
+        self.credit = min(
+            self.credit + self.rate * (now - self.updated),
+            max(1.0, self.rate * CREDIT_SECONDS)
+        )
+        self.updated = now
+        fresh, forced, candidates = [], [], []
+        self.lag = 0.0
+        for name, sub in self.subscriptions.items():
+            last = self.last.get(name)
+            if last is None:
+                fresh.append(sub)
+                continue
+            interval = max(sub.interval, self.min_interval)
+            elapsed = now - last
+            overdue = elapsed - interval * self.max_factor
+            if overdue >= 0:
+                self.lag = max(self.lag, overdue)
+                forced.append(sub)
+            elif elapsed >= self.min_interval:
+                candidates.append(sub)
+        chosen = forced
+        spare = int(self.credit) - len(forced)
+        if spare > 0 and candidates:
+            chosen = chosen + heapq.nlargest(
+                spare, candidates,
+                key=lambda sub: self._score(sub, now, wall)
+            )
+        self.credit -= len(chosen)
+        chosen = fresh + chosen
+        for sub in chosen:
+            self.last[sub.name] = now
+        self.polls += len(chosen)
+        return chosen
+
+    def wait(self, now):
+        """Секунды до момента, когда `due` сможет кого-то выбрать.
+
+        Это ближайший из двух сроков. Первый — срок опроса, обязательного
+        по `max_factor`. Второй — когда накопится кредит на опрос и хотя бы
+        одна подписка выйдет из `min_interval`. None, если подписок нет.
+        """
+        if not self.subscriptions:
+            return None
+        forced = eligible = math.inf
+        for name, sub in self.subscriptions.items():
+            last = self.last.get(name)
+            if last is None:
+                return 0.0
+            interval = max(sub.interval, self.min_interval)
+            forced = min(forced, last + interval * self.max_factor)
+            eligible = min(eligible, last + self.min_interval)
+        credit = self.credit + self.rate * (now - self.updated)
+        funded = now
+        if credit < 1:
+            funded = now + (1 - credit) / self.rate if self.rate else math.inf
+        return max(0.0, min(forced, max(funded, eligible)) - now)
+
+    def _score(self, sub, now, wall):
+        """Ожидаемая задержка ещё не замеченной смены статуса.
+
+        Вероятность смены с прошлого опроса, умноженная на время с него:
+        так интервалы выходят обратно пропорциональны корню из частоты
+        смен, а не самой частоте, и редко меняющиеся подписки не
+        голодают.
+        """
+        last = self.last[sub.name] + self.offset
+        interval = max(sub.interval, self.min_interval)
+        if self.model is None:
+            changed = 1.0 - math.exp(-(wall - last) / interval)
+        else:
+            changed = self.model.change_probability(sub.name, last, wall,
+                                                    interval)
+        return changed * (wall - last)
+
+    def stats(self):
+        """Бюджет, опросы и объём данных модели для эндпоинта здоровья."""
+        samples = {}
+        if self.model is not None:
+            samples = {
+                cohort: sketch.count
+                for cohort, sketch in self.model.durations.items()
+            }
+        return {
+            'policy': 'predictive',
+            'subscriptions': len(self.subscriptions),
+            'polls_per_hour': round(self.rate * 60 * 60, 1),
+            'credit': round(self.credit, 1),
+            'polls': self.polls,
+            'lag': round(self.lag, 3),
+            'samples': samples,
+        }
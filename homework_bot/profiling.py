@@ -0,0 +1,130 @@
+"""Замеры времени стадий цикла опроса."""
+import cProfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+RING_SIZE = 4096
+
+
+def percentile(values, share):
+    """Перцентиль по отсортированному списку значений."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(share * (len(values) - 1))))
+    return values[index]
+
+
+class StageProfiler:
+    """Кольцевой буфер длительностей стадий конвейера."""
+
+    def __init__(self, size=RING_SIZE):
+        """Профилировщик с кольцевым буфером на `size` замеров."""
+        self.records = deque(maxlen=size)
+        self.enabled = True
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name):
+        """Замеряет длительность стадии, вложенные стадии через `;`."""
+        if not self.enabled:
+            yield
+            return
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(name)
+        path = ';'.join(stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((path, time.perf_counter() - started))
+            stack.pop()
+
+    def clear(self):
+        """Очищает буфер."""
+        self.records.clear()
+
+    def summary(self):
+        """Сводка по стадиям: количество, сумма, среднее, p50, p95, max."""
+        grouped = {}
+        for path, duration in list(self.records):
+            grouped.setdefault(path, []).append(duration)
+        result = {}
+        for path, durations in grouped.items():
+            durations.sort()
+            total = sum(durations)
+            result[path] = {
+                'count': len(durations),
+                'total': total,
+                'mean': total / len(durations),
+                'p50': percentile(durations, 0.5),
+                'p95': percentile(durations, 0.95),
+                'max': durations[-1],
+            }
+        return result
+
+    def report(self):
+        """Текстовая таблица по стадиям, длительности в миллисекундах."""
+        lines = [
+            f'{"стадия":<40} {"N":>6} {"сумма":>10} {"сред.":>9} '
+            f'{"p50":>9} {"p95":>9} {"max":>9}'
+        ]
+        for path, row in sorted(self.summary().items()):
+            lines.append(
+                f'{path:<40} {row["count"]:>6} '
+                f'{row["total"] * 1000:>10.2f} {row["mean"] * 1000:>9.3f} '
+                f'{row["p50"] * 1000:>9.3f} {row["p95"] * 1000:>9.3f} '
+                f'{row["max"] * 1000:>9.3f}'
+            )
+        return '\n'.join(lines)
+
+    def collapsed(self):
+        """Собственное время стадий в формате collapsed stacks (мкс).
+
+        Формат принимают flamegraph.pl, speedscope и inferno.
+        """
+        totals = {}
+        for path, duration in list(self.records):
+            totals[path] = totals.get(path, 0.0) + duration
+        own = dict(totals)
+        for path, total in totals.items():
+            parent = path.rpartition(';')[0]
+            if parent in own:
+                own[parent] -= total
+        return '\n'.join(
+            f'{path} {max(0, int(duration * 1_000_000))}'
+            for path, duration in sorted(own.items())
+        )
+
+
+PROFILER = StageProfiler()
+
+
+def run_profile(cycle, cycles, profiler=PROFILER, cprofile_path=None,
+                collapsed_path=None, interval=0):
+    """Прогоняет `cycles` циклов и возвращает текстовую сводку."""
+    profiler.clear()
+    python_profiler = cProfile.Profile() if cprofile_path else None
+    errors = 0
+    if python_profiler:
+        python_profiler.enable()
+    try:
+        for _ in range(cycles):
+            try:
+                cycle()
+            except Exception:
+                errors += 1
+            if interval:
+                time.sleep(interval)
+    finally:
+        if python_profiler:
+            python_profiler.disable()
+            python_profiler.dump_stats(cprofile_path)
+    if collapsed_path:
+        with open(collapsed_path, 'w') as file:
+            file.write(profiler.collapsed() + '\n')
+    return (f'Циклов: {cycles}, с ошибкой: {errors}.\n'
+            + profiler.report())
@@ -0,0 +1,195 @@
+"""Ограничение частоты запросов к API: общее и по каждому токену."""
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
+from homework_bot.transport import token_key
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RETRY_AFTER = 60
+
+
+class RateLimited(Exception):
+    """Исключение, если запрос отложен ограничителем частоты."""
+
+
+class TokenBucket:
+    """Ведро токенов: `rate` запросов в секунду, всплеск до `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """Ведро на `rate` токенов в секунду, полное до `capacity`."""
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def wait_time(self, amount=1):
+        """Сколько секунд ждать, пока наберётся `amount` токенов."""
+        self._refill()
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def try_acquire(self, amount=1):
+        """Забирает токены, если они есть."""
+        self._refill()
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+
+def parse_retry_after(value, now=None):
+    """Секунды из заголовка Retry-After: число или HTTP-дата."""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    return max(0.0, moment.timestamp() - (now or time.time()))
+
+
+class RateLimiter:
+    """Общий потолок запросов в секунду и отдельное ведро на токен.
+
+    Ожидание общего ведра ограничено `max_wait`: лучше отложить опрос до
+    следующего цикла, чем надолго задержать остальные подписки. Токен,
+    получивший 429, ставится на паузу, остальные продолжают работать.
+    """
+
+    def __init__(self, global_rate=None, token_rate=None, burst=None,
+                 max_wait=5.0, clock=time.monotonic, sleep=time.sleep):
+        """Общий лимит `global_rate` и лимит токена `token_rate`."""
+        self.global_bucket = (
+            TokenBucket(global_rate, burst, clock) if global_rate else None
+        )
+        self.token_rate = token_rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.token_buckets = {}
+        self.paused_until = {}
+        self.allowed = 0
+        self.deferred = 0
+        self._lock = threading.Lock()
+
+    def pause(self, key, seconds):
+        """Приостанавливает запросы токена на `seconds` секунд."""
+        with self._lock:
+            self.paused_until[key] = self.clock() + seconds
+
+    def _token_bucket(self, key):
+        bucket = self.token_buckets.get(key)
+        if bucket is None and self.token_rate:
+            bucket = self.token_buckets[key] = TokenBucket(
+                self.token_rate, 1, self.clock
+            )
+        return bucket
+
+    def _reserve(self, key):
+        """Возвращает время ожидания общего ведра или бросает RateLimited."""
+        with self._lock:
+            until = self.paused_until.get(key)
+            if until is not None:
+                if until > self.clock():
+                    raise RateLimited(
+                        f'Токен на паузе ещё {until - self.clock():.0f} с.'
+                    )
+                del self.paused_until[key]
+            bucket = self._token_bucket(key)
+            if bucket is not None and not bucket.try_acquire():
+                raise RateLimited('Превышена частота запросов по токену.')
+            if self.global_bucket is None or (
+                self.global_bucket.try_acquire()
+            ):
+                return 0.0
+            wait = self.global_bucket.wait_time()
+            if wait > self.max_wait:
+                if bucket is not None:
+                    bucket.tokens += 1
+                raise RateLimited('Превышен общий лимит запросов.')
+            self.global_bucket.tokens -= 1
+            return wait
+
+    def acquire(self, key):
+        """Ждёт разрешения на запрос или бросает RateLimited."""
+        try:
+            wait = self._reserve(key)
+        except RateLimited:
+            self.deferred += 1
+            raise
+        if wait:
+            self.sleep(wait)
+        self.allowed += 1
+
+    def try_acquire(self, key):
+        """Разрешение на запрос без ожидания; False, если лимит исчерпан."""
+        with self._lock:
+            until = self.paused_until.get(key)
+            if until is not None and until > self.clock():
+                return False
+            bucket = self._token_bucket(key)
+            if bucket is not None and not bucket.try_acquire():
+                return False
+            if self.global_bucket is not None and not (
+                self.global_bucket.try_acquire()
+            ):
+                if bucket is not None:
+                    bucket.tokens += 1
+                return False
+            self.allowed += 1
+            return True
+
+    def stats(self):
+        """Счётчики для эндпоинта здоровья."""
+        now = self.clock()
+        return {
+            'allowed': self.allowed,
+            'deferred': self.deferred,
+            'paused_tokens': sum(
+                1 for until in self.paused_until.values() if until > now
+            ),
+        }
+
+
+class RateLimitedTransport:
+    """Транспорт, пропускающий запросы через ограничитель частоты."""
+
+    def __init__(self, inner, limiter):
+        """Транспорт `inner` под ограничителем `limiter`."""
+        self.inner = inner
+        self.limiter = limiter
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """Запрос с учётом лимитов; ответ 429 ставит токен на паузу."""
+        key = token_key(headers)
+        self.limiter.acquire(key)
+        response = self.inner.get(url, headers=headers, params=params,
+                                  timeout=timeout)
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            retry_after = parse_retry_after(
+                getattr(response, 'headers', {}).get('Retry-After')
+            )
+            self.limiter.pause(key, retry_after)
+            LOGGER.warning(
+                f'API ответил 429, токен на паузе {retry_after:.0f} с.'
+            )
+            raise RateLimited(f'API просит подождать {retry_after:.0f} с.')
+        return response
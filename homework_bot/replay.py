@@ -0,0 +1,140 @@
+"""Запись и воспроизведение трафика к API Практикума."""
+import gzip
+import json
+import threading
+import time
+from http import HTTPStatus
+
+from homework_bot.transport import token_key
+
+
+def redact(text, headers):
+    """Вырезает токен из текста, если он туда попал."""
+    authorization = (headers or {}).get('Authorization', '')
+    token = authorization.partition(' ')[2]
+    if token:
+        text = text.replace(token, '***')
+    return text
+
+
+def open_log(path, mode):
+    """Открывает журнал трафика, `.gz` сжимается на лету."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class RecordingTransport:
+    """Пишет ответы внутреннего транспорта в JSONL (лучше `.jsonl.gz`).
+
+    Сохраняются смещение от начала записи, задержка, код ответа, тело и
+    обезличенный ключ токена; сами токены и заголовки не сохраняются.
+    """
+
+    def __init__(self, inner, path):
+        """Транспорт `inner`, пишущий обмен в файл `path`."""
+        self.inner = inner
+        self.path = path
+        self.started = time.monotonic()
+        self._file = open_log(path, 'a')
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """Запрос через внутренний транспорт с записью ответа."""
+        sent = time.monotonic()
+        response = self.inner.get(url, headers=headers, params=params,
+                                  timeout=timeout)
+        record = {
+            't': round(sent - self.started, 6),
+            'latency': round(time.monotonic() - sent, 6),
+            'url': redact(url, headers),
+            'key': token_key(headers),
+            'status': int(response.status_code),
+            'body': redact(response.text, headers),
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+        return response
+
+    def close(self):
+        """Закрывает файл записи."""
+        self._file.close()
+
+
+class ReplayResponse:
+    """Ответ из записи с интерфейсом ответа `requests`."""
+
+    def __init__(self, status_code, text):
+        """Записанный ответ с кодом `status_code` и телом `text`."""
+        self.status_code = status_code
+        self.text = text
+        self.reason = HTTPStatus(status_code).phrase if (
+            status_code in HTTPStatus._value2member_map_
+        ) else ''
+
+    @property
+    def content(self):
+        """Тело ответа в байтах."""
+        return self.text.encode()
+
+    def json(self):
+        """Разбор тела как JSON."""
+        return json.loads(self.text)
+
+
+class ReplayTransport:
+    """Отдаёт записанные ответы вместо обращения к сети.
+
+    Ответы выдаются по очереди для каждого ключа токена, а для незнакомых
+    токенов — из общей очереди. `speed` ускоряет задержки: 1 — как в
+    записи, 10 — в десять раз быстрее, 0 — без задержек. При `pace`
+    соблюдаются и исходные интервалы между запросами. По концу записи
+    воспроизведение начинается сначала, если задан `loop`.
+    """
+
+    def __init__(self, path, speed=1.0, pace=False, loop=True):
+        """Воспроизведение записи `path` со скоростью `speed`."""
+        self.speed = speed
+        self.pace = pace
+        self.loop = loop
+        with open_log(path, 'r') as file:
+            self.records = [json.loads(line) for line in file if line.strip()]
+        if not self.records:
+            raise ValueError(f'Запись {path} пуста.')
+        self.by_key = {}
+        for index, record in enumerate(self.records):
+            self.by_key.setdefault(record.get('key'), []).append(index)
+        self._positions = {}
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def _next_record(self, key):
+        indexes = self.by_key.get(key)
+        if indexes is None:
+            key, indexes = None, range(len(self.records))
+        with self._lock:
+            position = self._positions.get(key, 0)
+            if position >= len(indexes):
+                if not self.loop:
+                    raise ConnectionError('Запись трафика закончилась.')
+                position = 0
+            self._positions[key] = position + 1
+        return self.records[indexes[position]]
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """Очередной записанный ответ для токена из заголовков."""
+        record = self._next_record(token_key(headers))
+        if self.speed:
+            if self.pace:
+                wait = (self.started + record['t'] / self.speed
+                        - time.monotonic())
+                if wait > 0:
+                    time.sleep(wait)
+            latency = record['latency'] / self.speed
+            if timeout is not None and latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError('Таймаут ответа из записи.')
+            time.sleep(latency)
+        return ReplayResponse(record['status'], record['body'])
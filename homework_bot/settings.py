@@ -0,0 +1,270 @@
+"""Типизированные настройки бота и файл подписок."""
+import json
+import os
+import sys
+from collections.abc import Mapping
+from typing import NamedTuple, Tuple
+from urllib.parse import urlparse
+
+from homework_bot.lazy import lazy_import
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+try:
+    yaml = lazy_import('yaml')
+except ImportError:
+    yaml = None
+
+DEFAULT_ENDPOINT = (
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
+DEFAULT_INTERVAL = 60 * 10
+DEFAULT_NAME = 'default'
+
+
+class SettingsError(Exception):
+    """Исключение, если настройки не прошли проверку."""
+
+
+class AuthHeaders(Mapping):
+    """Заголовки запроса подписки, собираемые из токена по требованию.
+
+    Хранит только ссылку на токен: на сотнях тысяч подписок отдельный
+    словарь со строкой `OAuth ...` у каждой заметно раздувает память.
+    """
+
+    __slots__ = ('token',)
+
+    def __init__(self, token):
+        """Заголовки для токена `token`."""
+        self.token = token
+
+    def __getitem__(self, key):
+        """Значение заголовка `key`."""
+        if key != 'Authorization':
+            raise KeyError(key)
+        return f'OAuth {self.token}'
+
+    def __iter__(self):
+        """Имена заголовков."""
+        yield 'Authorization'
+
+    def __len__(self):
+        """Число заголовков."""
+        return 1
+
+    def __repr__(self):
+        """Представление без токена."""
+        return "{'Authorization': 'OAuth ***'}"
+
+
+class Subscription(NamedTuple):
+    """Неизменяемая подписка: токен Практикума и чат для уведомлений."""
+
+    name: str
+    practicum_token: str
+    chat_id: str
+    endpoint: str
+    interval: int
+    headers: Mapping
+
+    @classmethod
+    def create(cls, name, practicum_token, chat_id,
+               endpoint=DEFAULT_ENDPOINT, interval=DEFAULT_INTERVAL):
+        """Проверяет поля; общие для подписок строки интернируются."""
+        if not name or not isinstance(name, str):
+            raise SettingsError(f'Некорректное имя подписки: {name!r}.')
+        if not practicum_token or not isinstance(practicum_token, str):
+            raise SettingsError(f'Подписка {name}: не задан токен.')
+        if chat_id is None or not str(chat_id).lstrip('-').isdigit():
+            raise SettingsError(
+                f'Подписка {name}: некорректный chat_id {chat_id!r}.'
+            )
+        url = urlparse(endpoint or '')
+        if url.scheme not in ('http', 'https') or not url.netloc:
+            raise SettingsError(
+                f'Подписка {name}: некорректный эндпоинт {endpoint!r}.'
+            )
+        if isinstance(interval, bool) or not isinstance(interval, int) or (
+            interval <= 0
+        ):
+            raise SettingsError(
+                f'Подписка {name}: некорректный интервал {interval!r}.'
+            )
+        return cls(name, practicum_token, str(chat_id), sys.intern(endpoint),
+                   interval, AuthHeaders(practicum_token))
+
+
+class Settings(NamedTuple):
+    """Проверенные настройки процесса."""
+
+    telegram_token: str
+    subscriptions: Tuple[Subscription, ...]
+    subscriptions_file: str = None
+
+
+def _load_jsonl(raw):
+    return [json.loads(line) for line in raw.splitlines() if line.strip()]
+
+
+def _load_toml(raw):
+    if tomllib is None:
+        raise SettingsError('Для TOML нужен Python 3.11+.')
+    return tomllib.loads(raw.decode())
+
+
+def _load_yaml(raw):
+    if yaml is None:
+        raise SettingsError('Для YAML установите пакет PyYAML.')
+    try:
+        return yaml.safe_load(raw)
+    except yaml.YAMLError as error:
+        raise ValueError(error)
+
+
+LOADERS = {
+    '.json': json.loads,
+    '.jsonl': _load_jsonl,
+    '.toml': _load_toml,
+    '.yaml': _load_yaml,
+    '.yml': _load_yaml,
+}
+
+
+STORE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def read_subscriptions_file(path):
+    """Читает файл подписок JSON, JSONL, TOML, YAML или базу SQLite."""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in STORE_SUFFIXES:
+        from homework_bot.store import read_store
+        return read_store(path)
+    loader = LOADERS.get(suffix)
+    if loader is None:
+        raise SettingsError(f'Неизвестный формат файла: {path}.')
+    try:
+        with open(path, 'rb') as file:
+            data = loader(file.read())
+    except (OSError, ValueError) as error:
+        raise SettingsError(f'Не удалось прочитать {path}: {error}.')
+    if isinstance(data, list):
+        data = {'subscriptions': data}
+    if not isinstance(data, dict):
+        raise SettingsError(f'Некорректная структура файла {path}.')
+    return data
+
+
+def parse_subscriptions(data, reuse=None):
+    """Строит подписки из словаря файла.
+
+    Неизменившиеся подписки берутся из `reuse`, чтобы повторная загрузка
+    большого файла не пересобирала все объекты.
+    """
+    reuse = reuse or {}
+    defaults = data.get('defaults') or {}
+    items = data.get('subscriptions')
+    if not isinstance(items, list):
+        raise SettingsError('Ключ subscriptions должен быть списком.')
+    result = {}
+    for item in items:
+        if not isinstance(item, dict):
+            raise SettingsError(f'Некорректная подписка: {item!r}.')
+        fields = (
+            item.get('name'),
+            item.get('practicum_token'),
+            item.get('chat_id'),
+            item.get('endpoint', defaults.get('endpoint', DEFAULT_ENDPOINT)),
+            item.get('interval', defaults.get('interval', DEFAULT_INTERVAL)),
+        )
+        if fields[0] in result:
+            raise SettingsError(f'Повторяется подписка {fields[0]}.')
+        known = reuse.get(fields[0])
+        if known is not None and known[:2] == fields[:2] and (
+            known[2:5] == (str(fields[2]),) + fields[3:]
+        ):
+            result[fields[0]] = known
+        else:
+            result[fields[0]] = Subscription.create(*fields)
+    return result
+
+
+def build_settings(telegram_token, practicum_token=None, chat_id=None,
+                   endpoint=DEFAULT_ENDPOINT, interval=DEFAULT_INTERVAL,
+                   subscriptions_file=None):
+    """Собирает и проверяет настройки из переменных окружения и файла."""
+    if not telegram_token:
+        raise SettingsError('Не задан TELEGRAM_TOKEN.')
+    subscriptions = {}
+    if practicum_token or chat_id:
+        subscriptions[DEFAULT_NAME] = Subscription.create(
+            DEFAULT_NAME, practicum_token, chat_id, endpoint, interval
+        )
+    if subscriptions_file:
+        for name, sub in parse_subscriptions(
+            read_subscriptions_file(subscriptions_file)
+        ).items():
+            if name in subscriptions:
+                raise SettingsError(f'Повторяется подписка {name}.')
+            subscriptions[name] = sub
+    if not subscriptions:
+        raise SettingsError('Не задано ни одной подписки.')
+    return Settings(telegram_token, tuple(subscriptions.values()),
+                    subscriptions_file)
+
+
+class SubscriptionWatcher:
+    """Подхватывает изменения файла подписок без перезапуска."""
+
+    def __init__(self, settings):
+        """Наблюдение за файлом подписок из `settings`."""
+        self.settings = settings
+        self._stamp = self._file_stamp()
+        self._fixed = {
+            sub.name: sub for sub in settings.subscriptions
+            if sub.name == DEFAULT_NAME
+        }
+
+    def _file_stamp(self):
+        path = self.settings.subscriptions_file
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """Перечитывает файл, если он изменился.
+
+        Возвращает кортеж (добавленные, удалённые, изменённые) имён.
+        При ошибке в новом файле бросает SettingsError, прежние подписки
+        остаются в силе.
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return (), (), ()
+        self._stamp = stamp
+        old = {sub.name: sub for sub in self.settings.subscriptions}
+        new = parse_subscriptions(
+            read_subscriptions_file(self.settings.subscriptions_file),
+            reuse=old
+        )
+        for name, sub in self._fixed.items():
+            if name in new:
+                raise SettingsError(f'Повторяется подписка {name}.')
+            new[name] = sub
+        self.settings = self.settings._replace(
+            subscriptions=tuple(new.values())
+        )
+        added = tuple(name for name in new if name not in old)
+        removed = tuple(name for name in old if name not in new)
+        changed = tuple(
+            name for name in new
+            if name in old and new[name] is not old[name]
+        )
+        return added, removed, changed
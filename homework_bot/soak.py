@@ -0,0 +1,319 @@
+"""Долгий прогон цикла бота в сжатом времени: утечки и дрейф задержки."""
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import NamedTuple
+
+from homework_bot import stubs
+from homework_bot.profiling import percentile
+
+DAY = 24 * 60 * 60
+MIN_DAYS = 2
+WINDOWS = 20
+WARMUP = 0.2
+SUBSCRIPTIONS = 20
+INTERVAL = 60 * 10
+CHANGE_EVERY = 7
+TOLERANCE = 0.5
+MEMORY_SLACK = 64 * 1024
+RSS_SLACK = 512 * 1024
+RESTORED = (
+    'PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID', 'ENDPOINT',
+    'SUBSCRIPTIONS_FILE', 'TELEGRAM_CLIENT', 'TELEGRAM_API_URL',
+    'HEALTH_PORT', 'WATCHDOG_TIMEOUT', 'TELEGRAM_MAX_RPS', 'OUTBOX_PATH',
+    'time',
+    'poll_subscriptions',
+    'TelegramClient', 'TRANSPORT', 'OUTBOX', 'OUTBOX_PURGED', 'DELIVERY',
+    'ANALYTICS', 'ARCHIVE', 'TURNAROUND', 'HOMEWORK_STATUSES',
+)
+
+
+class SoakFinished(BaseException):
+    """Модельное время прогона вышло.
+
+    Наследник `BaseException`: цикл `main()` ловит `Exception` и не
+    должен его поглотить.
+    """
+
+
+class SimulatedClock:
+    """Замена модуля `time` для цикла бота: `sleep` не ждёт.
+
+    `sleep` сдвигает модельное время, `time` и `monotonic` отсчитываются
+    от него, остальные функции модуля `time` — настоящие. Когда модельное
+    время доходит до `duration`, `sleep` бросает `SoakFinished`.
+    """
+
+    def __init__(self, duration, on_tick=None, start=None):
+        """Часы на `duration` модельных секунд."""
+        self.duration = duration
+        self.on_tick = on_tick
+        self.start = time.time() if start is None else start
+        self.elapsed = 0.0
+
+    def __getattr__(self, name):
+        """Остальные функции — из настоящего модуля `time`."""
+        return getattr(time, name)
+
+    def time(self):
+        """Модельное время по часам `time.time`."""
+        return self.start + self.elapsed
+
+    def monotonic(self):
+        """Модельное время с начала прогона."""
+        return self.elapsed
+
+    def sleep(self, seconds):
+        """Сдвигает модельное время без ожидания."""
+        self.elapsed += max(0.0, seconds)
+        if self.on_tick is not None:
+            self.on_tick(self.elapsed)
+        if self.elapsed >= self.duration:
+            raise SoakFinished
+
+
+class Sample(NamedTuple):
+    """Замер в конце окна модельного времени."""
+
+    elapsed: float
+    traced: int
+    rss: int
+    fds: int
+    latencies: list
+
+
+def rss_bytes():
+    """Резидентная память процесса; None, если её не узнать."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def open_fds():
+    """Число открытых дескрипторов; None, если их не узнать."""
+    for path in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+class SoakMonitor:
+    """Память, дескрипторы и длительность циклов по окнам прогона.
+
+    Модельное время делится на `windows` окон; в конце каждого после
+    сборки мусора замеряются память `tracemalloc`, RSS и дескрипторы.
+    Окна разгона (доля `warmup`) отбрасываются. Рост памяти считается
+    по второй половине оставшихся окон, когда аллокатор уже устоялся, и
+    делится на модельные сутки, чтобы прогоны разной длины сравнивались
+    с одной базой; утечка растёт и там.
+    """
+
+    def __init__(self, duration, windows=WINDOWS, warmup=WARMUP):
+        """Монитор прогона длиной `duration` модельных секунд."""
+        self.duration = duration
+        self.window = duration / windows
+        self.warmup = warmup
+        self.samples = []
+        self.latencies = []
+        self.cycles = 0
+
+    def due(self, elapsed):
+        """Пора ли закрыть окно."""
+        return elapsed >= self.window * len(self.samples)
+
+    def cycle(self, seconds):
+        """Длительность одного цикла опроса."""
+        self.latencies.append(seconds)
+        self.cycles += 1
+
+    def sample(self, elapsed):
+        """Замер в конце окна."""
+        gc.collect()
+        traced = tracemalloc.get_traced_memory()[0] if (
+            tracemalloc.is_tracing()
+        ) else None
+        self.samples.append(Sample(elapsed, traced, rss_bytes(), open_fds(),
+                                   sorted(self.latencies)))
+        self.latencies = []
+
+    def result(self):
+        """Рост памяти и дескрипторов, задержка циклов и её дрейф."""
+        steady = self.samples[int(len(self.samples) * self.warmup):]
+        if len(steady) < 2:
+            raise ValueError('Слишком короткий прогон: меньше двух окон '
+                             'после разгона.')
+        first, last = steady[0], steady[-1]
+        half = len(steady) // 2
+        middle = steady[half]
+        early = sorted(value for item in steady[1:half + 1]
+                       for value in item.latencies)
+        late = sorted(value for item in steady[half + 1:]
+                      for value in item.latencies)
+        latencies = sorted(early + late)
+        early_p95 = percentile(early, 0.95)
+        days = (last.elapsed - middle.elapsed) / DAY
+        return {
+            'simulated_days': round(self.duration / DAY, 2),
+            'cycles': self.cycles,
+            'traced_per_day': _growth(middle.traced, last.traced, days),
+            'rss_per_day': _growth(middle.rss, last.rss, days),
+            'fd_growth': _growth(first.fds, last.fds),
+            'latency_p50': round(percentile(latencies, 0.5), 6),
+            'latency_p95': round(percentile(latencies, 0.95), 6),
+            'latency_drift': round(
+                percentile(late, 0.95) / early_p95 if early_p95 else 1.0, 3
+            ),
+        }
+
+
+def _growth(first, last, days=1.0):
+    if first is None or last is None:
+        return None
+    return round((last - first) / days)
+
+
+def compare(result, baseline, tolerance=TOLERANCE):
+    """Регрессии прогона относительно базовой линии; пусто, если их нет.
+
+    Сравниваются только относительные метрики: рост памяти за сутки и
+    дрейф задержки могут превышать базу на долю `tolerance` (память — и
+    на постоянный запас против шума), дескрипторов не должно
+    прибавляться больше, чем в базе. Абсолютная задержка зависит от
+    машины и только выводится. Метрики, которых нет в базе или не
+    удалось замерить, не сравниваются.
+    """
+    limits = {
+        'traced_per_day': lambda base: max(base, 0) * (1 + tolerance) + (
+            MEMORY_SLACK
+        ),
+        'rss_per_day': lambda base: max(base, 0) * (1 + tolerance) + (
+            RSS_SLACK
+        ),
+        'fd_growth': lambda base: max(base, 0),
+        'latency_drift': lambda base: max(base, 1.0) * (1 + tolerance),
+    }
+    regressions = []
+    for key, limit in limits.items():
+        value, base = result.get(key), baseline.get(key)
+        if value is None or base is None:
+            continue
+        allowed = limit(base)
+        if value > allowed:
+            regressions.append(f'{key}: {value} больше допустимого '
+                               f'{allowed:g} (база {base}).')
+    return regressions
+
+
+def load_baseline(path):
+    """Базовая линия из JSON; None, если файла нет."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(result, path):
+    """Сохраняет результат прогона как базовую линию."""
+    with open(path, 'w') as file:
+        json.dump(result, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def run_soak(target, duration, subscriptions=SUBSCRIPTIONS,
+             interval=INTERVAL, change_every=CHANGE_EVERY, windows=WINDOWS):
+    """Прогон `target.main()` против заглушек API и Telegram.
+
+    `target` — модуль бота (`homework`): на время прогона в нём
+    подменяются часы, токены, файл подписок и клиент Telegram, а после
+    восстанавливаются вместе с объектами, которые пересоздаёт `main()`.
+    Заглушка API меняет статус каждые `change_every` запросов, так что
+    по пути работают outbox, доставка, аналитика и поток событий.
+    Заглушка Telegram забывает отправленное в конце каждого окна, чтобы
+    её собственный список не выглядел утечкой. Лимит отправки в Telegram
+    снят: он считает настоящие секунды, и в сжатом времени очередь
+    копилась бы из-за него, а не из-за бота. Возвращает
+    `SoakMonitor.result()` и число доставленных сообщений.
+    """
+    monitor = SoakMonitor(duration, windows)
+    saved = {name: getattr(target, name) for name in RESTORED}
+    tracing = tracemalloc.is_tracing()
+    clients = []
+    delivered = 0
+    with stubs.FakePracticumServer(change_every) as api, \
+            stubs.FakeTelegramServer() as telegram, \
+            tempfile.TemporaryDirectory() as directory:
+
+        def tick(elapsed):
+            nonlocal delivered
+            if monitor.due(elapsed):
+                delivered += len(telegram.sent)
+                telegram.sent.clear()
+                monitor.sample(elapsed)
+
+        def client(*args, **kwargs):
+            clients.append(saved['TelegramClient'](*args, **kwargs))
+            return clients[-1]
+
+        poll = saved['poll_subscriptions']
+
+        def timed_poll(bot, due, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return poll(bot, due, *args, **kwargs)
+            finally:
+                if due:
+                    monitor.cycle(time.perf_counter() - started)
+
+        overrides = {
+            'PRACTICUM_TOKEN': 'soak', 'TELEGRAM_TOKEN': '1:soak',
+            'TELEGRAM_CHAT_ID': '1', 'ENDPOINT': api.url,
+            'SUBSCRIPTIONS_FILE': write_subscriptions(
+                directory, subscriptions, api.url, interval
+            ),
+            'TELEGRAM_CLIENT': 'lean', 'TelegramClient': client,
+            'TELEGRAM_API_URL': telegram.base_url, 'HEALTH_PORT': None,
+            'WATCHDOG_TIMEOUT': 0, 'OUTBOX_PATH': ':memory:',
+            'OUTBOX_PURGED': 0.0,
+            'TELEGRAM_MAX_RPS': 0,
+            'time': SimulatedClock(duration, tick),
+            'poll_subscriptions': timed_poll,
+        }
+        for name, value in overrides.items():
+            setattr(target, name, value)
+        if not tracing:
+            tracemalloc.start()
+        monitor.sample(0.0)
+        try:
+            target.main()
+        except SoakFinished:
+            pass
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+            for name, value in saved.items():
+                setattr(target, name, value)
+            for bot in clients:
+                bot.close()
+    result = monitor.result()
+    result['delivered'] = delivered
+    return result
+
+
+def write_subscriptions(directory, count, endpoint, interval):
+    """Файл подписок прогона; возвращает путь."""
+    path = os.path.join(directory, 'subscriptions.json')
+    with open(path, 'w') as file:
+        json.dump({'subscriptions': [
+            {'name': f'soak{index}', 'practicum_token': f'token{index}',
+             'chat_id': index + 1, 'endpoint': endpoint,
+             'interval': interval}
+            for index in range(count)
+        ]}, file)
+    return path
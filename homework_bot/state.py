@@ -0,0 +1,265 @@
+"""Компактное состояние опроса для большого числа подписок."""
+import json
+import os
+import tempfile
+from array import array
+from collections.abc import MutableMapping
+
+NO_STATUS = ''
+HOMEWORKS_PER_SUBSCRIPTION = 100
+
+
+class StatusCodes:
+    """Таблица статусов: строка статуса ↔ небольшое целое.
+
+    Известные статусы получают номера заранее, новые — при первой
+    встрече; код 0 означает «статус ещё не видели».
+    """
+
+    __slots__ = ('codes', 'names')
+
+    def __init__(self, known=()):
+        """Коды статусов; известные `known` нумеруются первыми."""
+        self.names = [NO_STATUS]
+        self.codes = {NO_STATUS: 0}
+        for status in known:
+            self.code(status)
+
+    def code(self, status):
+        """Номер статуса; неизвестный статус добавляется в таблицу."""
+        code = self.codes.get(status)
+        if code is None:
+            code = self.codes[status] = len(self.names)
+            self.names.append(status)
+        return code
+
+    def name(self, code):
+        """Строка статуса по номеру."""
+        return self.names[code]
+
+
+class HomeworkStatuses:
+    """Последний статус каждой работы подписок.
+
+    На подписку хранится не больше `limit` работ, дольше всех не
+    обновлявшиеся вытесняются. Запись старше уже виденной для той же
+    работы её статус не меняет.
+    """
+
+    __slots__ = ('limit', 'homeworks')
+
+    def __init__(self, limit=HOMEWORKS_PER_SUBSCRIPTION):
+        """Пустое хранилище до `limit` работ на подписку."""
+        self.limit = limit
+        self.homeworks = {}
+
+    def update(self, subscription, homework, updated):
+        """Учитывает статус работы на момент `updated`.
+
+        Возвращает прежний статус работы или None, если она не
+        встречалась; для устаревшей записи — её же статус.
+        """
+        key = str(homework.get('id', homework.get('homework_name')))
+        status = homework['status']
+        homeworks = self.homeworks.setdefault(subscription, {})
+        previous = homeworks.pop(key, None)
+        if previous is not None and updated < previous[1]:
+            homeworks[key] = previous
+            return status
+        homeworks[key] = (status, updated)
+        if len(homeworks) > self.limit:
+            del homeworks[next(iter(homeworks))]
+        return None if previous is None else previous[0]
+
+    def latest(self, subscription):
+        """Статус и время самой свежей работы подписки или None."""
+        homeworks = self.homeworks.get(subscription)
+        if not homeworks:
+            return None
+        return max(reversed(homeworks.values()), key=lambda item: item[1])
+
+    def status(self, subscription, default=NO_STATUS):
+        """Статус самой свежей работы подписки или `default`."""
+        latest = self.latest(subscription)
+        return default if latest is None else latest[0]
+
+    def forget(self, subscription):
+        """Забывает работы удалённой подписки."""
+        self.homeworks.pop(subscription, None)
+
+    def to_dict(self, subscription):
+        """Работы подписки для сохранения."""
+        return self.homeworks.get(subscription, {})
+
+    def restore(self, subscription, homeworks):
+        """Восстанавливает сохранённые работы подписки."""
+        if homeworks:
+            self.homeworks[subscription] = {
+                key: tuple(value) for key, value in homeworks.items()
+            }
+
+
+class PollState:
+    """Состояние опроса подписок в колонках `array`.
+
+    Вместо словаря на подписку каждая получает номер ячейки, а срок
+    следующего опроса, курсор `from_date` и код последнего статуса лежат
+    в плотных массивах: 8 + 8 + 2 байта на подписку плюс запись в
+    индексе имён. Освободившиеся ячейки переиспользуются.
+
+    `statuses`, `deadlines` и `cursors` — представления-словари поверх
+    колонок, их можно передавать туда, где раньше были обычные словари.
+    Удаление подписки из любого представления освобождает её ячейку.
+    Статусы отдельных работ лежат в `homeworks` и сохраняются вместе со
+    статусами подписок.
+    """
+
+    def __init__(self, known_statuses=()):
+        """Пустое состояние с кодами для `known_statuses`."""
+        self.status_codes = StatusCodes(known_statuses)
+        self.index = {}
+        self.free = []
+        self.deadline_column = array('d')
+        self.cursor_column = array('d')
+        self.status_column = array('H')
+        self.statuses = _ColumnView(self, self.status, self.set_status)
+        self.deadlines = _ColumnView(self, self.deadline, self.set_deadline)
+        self.cursors = _ColumnView(self, self.cursor, self.set_cursor)
+        self.homeworks = HomeworkStatuses()
+
+    def __len__(self):
+        """Число подписок в состоянии."""
+        return len(self.index)
+
+    def __contains__(self, name):
+        """Есть ли подписка `name` в состоянии."""
+        return name in self.index
+
+    def slot(self, name):
+        """Номер ячейки подписки; новая подписка получает ячейку."""
+        slot = self.index.get(name)
+        if slot is not None:
+            return slot
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.status_column)
+            self.deadline_column.append(0.0)
+            self.cursor_column.append(0.0)
+            self.status_column.append(0)
+        self.index[name] = slot
+        return slot
+
+    def remove(self, name):
+        """Освобождает ячейку подписки; True, если подписка была."""
+        slot = self.index.pop(name, None)
+        if slot is None:
+            return False
+        self.deadline_column[slot] = 0.0
+        self.cursor_column[slot] = 0.0
+        self.status_column[slot] = 0
+        self.homeworks.forget(name)
+        self.free.append(slot)
+        return True
+
+    def status(self, name):
+        """Последний статус подписки или пустая строка."""
+        slot = self.index.get(name)
+        if slot is None:
+            return NO_STATUS
+        return self.status_codes.name(self.status_column[slot])
+
+    def set_status(self, name, status):
+        """Запоминает статус подписки."""
+        self.status_column[self.slot(name)] = self.status_codes.code(status)
+
+    def deadline(self, name):
+        """Срок следующего опроса (по часам `time.monotonic`)."""
+        slot = self.index.get(name)
+        return 0.0 if slot is None else self.deadline_column[slot]
+
+    def set_deadline(self, name, deadline):
+        """Назначает срок следующего опроса."""
+        self.deadline_column[self.slot(name)] = deadline
+
+    def cursor(self, name):
+        """Время последнего успешного опроса для `from_date`."""
+        slot = self.index.get(name)
+        return 0.0 if slot is None else self.cursor_column[slot]
+
+    def set_cursor(self, name, timestamp):
+        """Сдвигает курсор `from_date` подписки."""
+        self.cursor_column[self.slot(name)] = timestamp
+
+    def to_dict(self):
+        """Статусы, курсоры и работы подписок; сроки не переживают запуск."""
+        return {
+            name: [self.status(name), self.cursor(name),
+                   self.homeworks.to_dict(name)]
+            for name in self.index
+        }
+
+    @classmethod
+    def from_dict(cls, data, known_statuses=()):
+        """Восстановление статусов, курсоров и работ подписок."""
+        state = cls(known_statuses)
+        for name, (status, cursor, *homeworks) in data.items():
+            state.set_status(name, status)
+            state.set_cursor(name, cursor)
+            state.homeworks.restore(name, homeworks[0] if homeworks else {})
+        return state
+
+    def save(self, path):
+        """Атомарно сохраняет состояние в JSON."""
+        data = self.to_dict()
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            'w', dir=directory, delete=False, suffix='.tmp'
+        ) as file:
+            json.dump(data, file)
+        os.replace(file.name, path)
+
+    @classmethod
+    def load(cls, path, known_statuses=()):
+        """Загружает состояние; пустое, если файла нет."""
+        if not os.path.exists(path):
+            return cls(known_statuses)
+        with open(path) as file:
+            return cls.from_dict(json.load(file), known_statuses)
+
+    def nbytes(self):
+        """Объём колонок в байтах, без индекса имён."""
+        return sum(
+            column.itemsize * len(column) for column in (
+                self.deadline_column, self.cursor_column, self.status_column
+            )
+        )
+
+
+class _ColumnView(MutableMapping):
+    """Словарь `имя → значение` поверх одной колонки `PollState`."""
+
+    __slots__ = ('state', 'getter', 'setter')
+
+    def __init__(self, state, getter, setter):
+        self.state = state
+        self.getter = getter
+        self.setter = setter
+
+    def __getitem__(self, name):
+        if name not in self.state:
+            raise KeyError(name)
+        return self.getter(name)
+
+    def __setitem__(self, name, value):
+        self.setter(name, value)
+
+    def __delitem__(self, name):
+        if not self.state.remove(name):
+            raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self.state.index)
+
+    def __len__(self):
+        return len(self.state)
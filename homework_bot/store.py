@@ -0,0 +1,245 @@
+"""Хранилище подписок в SQLite и потоковый импорт."""
+import csv
+import itertools
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import NamedTuple
+
+from homework_bot.settings import (
+    DEFAULT_ENDPOINT, DEFAULT_INTERVAL, SettingsError, Subscription
+)
+
+BATCH_SIZE = 1000
+VALIDATE_WORKERS = 8
+VALIDATE_TIMEOUT = 10
+FIELDS = ('name', 'practicum_token', 'chat_id', 'endpoint', 'interval')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS subscriptions (
+    name TEXT PRIMARY KEY,
+    practicum_token TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    interval INTEGER NOT NULL
+);
+'''
+
+
+class ImportStats(NamedTuple):
+    """Итог импорта."""
+
+    imported: int
+    rejected: int
+    invalid_tokens: int
+
+
+class SubscriptionStore:
+    """Подписки в SQLite.
+
+    Журнал откатов (не WAL): каждая запись меняет сам файл базы, и
+    `SubscriptionWatcher` работающего бота замечает её по времени
+    изменения, как правку файла подписок.
+    """
+
+    def __init__(self, path):
+        """Открывает базу подписок `path`."""
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.executescript(SCHEMA)
+
+    def __len__(self):
+        """Число подписок в базе."""
+        return self._db.execute(
+            'SELECT COUNT(*) FROM subscriptions'
+        ).fetchone()[0]
+
+    def __iter__(self):
+        """Подписки в порядке имён, потоком из базы."""
+        for row in self._db.execute(
+            f'SELECT {", ".join(FIELDS)} FROM subscriptions ORDER BY name'
+        ):
+            yield Subscription.create(*row)
+
+    def upsert(self, subscriptions):
+        """Добавляет или заменяет подписки одной транзакцией."""
+        rows = [
+            (sub.name, sub.practicum_token, sub.chat_id, sub.endpoint,
+             sub.interval)
+            for sub in subscriptions
+        ]
+        with self._transaction():
+            self._db.executemany(
+                'INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def remove(self, names):
+        """Удаляет подписки; возвращает число удалённых."""
+        with self._transaction():
+            cursor = self._db.executemany(
+                'DELETE FROM subscriptions WHERE name = ?',
+                ((name,) for name in names)
+            )
+        return cursor.rowcount
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+
+    def close(self):
+        """Закрывает базу."""
+        self._db.close()
+
+
+def read_store(path):
+    """Данные файла подписок из базы SQLite, только для чтения."""
+    try:
+        db = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            rows = db.execute(
+                f'SELECT {", ".join(FIELDS)} FROM subscriptions'
+            ).fetchall()
+        finally:
+            db.close()
+    except sqlite3.Error as error:
+        raise SettingsError(f'Не удалось прочитать {path}: {error}.')
+    return {'subscriptions': [dict(zip(FIELDS, row)) for row in rows]}
+
+
+def read_rows(file, fmt):
+    """Строки импорта `(номер, словарь)` из CSV или JSONL, потоком."""
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(file), start=2):
+            yield number, row
+    elif fmt == 'jsonl':
+        for number, line in enumerate(file, start=1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except ValueError as error:
+                    yield number, error
+    else:
+        raise ValueError(f'Неизвестный формат импорта: {fmt}.')
+
+
+def subscription_from_row(row, endpoint=DEFAULT_ENDPOINT,
+                          interval=DEFAULT_INTERVAL):
+    """Подписка из строки импорта; SettingsError, если строка неверна."""
+    if not isinstance(row, dict):
+        raise SettingsError(f'Некорректная строка: {row}.')
+    value = row.get('interval') or interval
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise SettingsError(f'Некорректный интервал {value!r}.')
+    return Subscription.create(
+        row.get('name'), row.get('practicum_token'), row.get('chat_id'),
+        row.get('endpoint') or endpoint, value
+    )
+
+
+def check_token(transport, subscription):
+    """Проверка токена запросом к API: True, False или None при сбое."""
+    try:
+        response = transport.get(
+            subscription.endpoint, headers=subscription.headers,
+            params={'from_date': 0}, timeout=VALIDATE_TIMEOUT
+        )
+    except Exception:
+        return None
+    if response.status_code == HTTPStatus.OK:
+        return True
+    if response.status_code in (HTTPStatus.UNAUTHORIZED,
+                                HTTPStatus.FORBIDDEN):
+        return False
+    return None
+
+
+def validate_batch(batch, transport, executor, on_error=None):
+    """Пачка `(номер, подписка)` без подписок с отвергнутым токеном."""
+    verdicts = executor.map(
+        lambda item: check_token(transport, item[1]), batch
+    )
+    accepted = []
+    for (number, sub), verdict in zip(batch, verdicts):
+        if verdict is not False:
+            accepted.append((number, sub))
+        elif on_error:
+            on_error(number, f'токен {sub.name} отклонён API')
+    return accepted
+
+
+def batched(items, size):
+    """Списки по `size` элементов из итератора."""
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_rows(store, rows, batch_size=BATCH_SIZE, transport=None,
+                workers=VALIDATE_WORKERS, on_error=None, **defaults):
+    """Потоковый импорт пачками по `batch_size` в одной транзакции.
+
+    С `transport` токены пачки проверяются параллельно, не больше
+    `workers` запросов сразу; подписки с отвергнутым токеном не
+    импортируются, а при сбое проверки остаются. `on_error(номер,
+    ошибка)` получает отклонённые строки.
+    """
+    rejected = []
+
+    def parsed():
+        for number, row in rows:
+            try:
+                yield number, subscription_from_row(row, **defaults)
+            except SettingsError as error:
+                rejected.append(number)
+                if on_error:
+                    on_error(number, error)
+
+    imported = invalid = 0
+    executor = ThreadPoolExecutor(workers) if transport else None
+    try:
+        for batch in batched(parsed(), batch_size):
+            accepted = batch
+            if executor is not None:
+                accepted = validate_batch(batch, transport, executor,
+                                          on_error)
+            imported += store.upsert(sub for _, sub in accepted)
+            invalid += len(batch) - len(accepted)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return ImportStats(imported, len(rejected), invalid)
+
+
+def export_rows(subscriptions, output, fmt):
+    """Выгрузка подписок в CSV или JSONL; возвращает число строк."""
+    written = 0
+    if fmt == 'csv':
+        writer = csv.writer(output)
+        writer.writerow(FIELDS)
+    elif fmt != 'jsonl':
+        raise ValueError(f'Неизвестный формат выгрузки: {fmt}.')
+    for sub in subscriptions:
+        values = (sub.name, sub.practicum_token, sub.chat_id, sub.endpoint,
+                  sub.interval)
+        if fmt == 'csv':
+            writer.writerow(values)
+        else:
+            output.write(json.dumps(dict(zip(FIELDS, values)),
+                                    ensure_ascii=False) + '\n')
+        written += 1
+    return written
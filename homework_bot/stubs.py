@@ -0,0 +1,236 @@
+"""Локальные заглушки внешних сервисов для замеров и прогонов."""
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from homework_bot.bandwidth import brotli
+
+STUB_STATUSES = ('reviewing', 'rejected', 'reviewing', 'approved')
+
+
+class _Server(ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalServer:
+    """Основа заглушек: HTTP/1.1-сервер на localhost в фоновом потоке.
+
+    Очередь приёма длиннее стандартных 5, иначе всплеск новых
+    соединений упирается в повтор SYN через секунду и искажает хвост
+    задержек в замерах. С `compress` тело сжимается brotli или gzip, если
+    клиент их принимает.
+    """
+
+    compress = False
+
+    def __init__(self):
+        """Сервер на свободном порту localhost; запускается в `start`."""
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Адрес сервера без пути."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        """Запускает сервер."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер."""
+        self.stop()
+
+    def handle(self, handler):
+        """Ответ на запрос: `(код, тело)`; без переопределения — 404."""
+        return 404, {'error': f'Нет обработчика для {handler.path}.'}
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                self._reply(*stub.handle(self))
+
+            def do_POST(self):
+                self._reply(*stub.handle(self))
+
+            def _reply(self, code, data):
+                body = json.dumps(data).encode()
+                accepted = self.headers.get('Accept-Encoding', '')
+                encoding = None
+                if stub.compress and brotli is not None and (
+                    'br' in accepted
+                ):
+                    body, encoding = brotli.compress(body), 'br'
+                elif stub.compress and 'gzip' in accepted:
+                    body, encoding = gzip.compress(body), 'gzip'
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                if encoding:
+                    self.send_header('Content-Encoding', encoding)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakePracticumServer(LocalServer):
+    """HTTP-заглушка API Практикума на localhost.
+
+    Каждый `change_every`-й запрос меняет статус работы, чтобы в прогоне
+    срабатывали разбор и отправка сообщения. Если задан `tokens`,
+    остальные токены получают 401. Доля `slow` ответов задерживается ещё
+    на `slow_delay` секунд — медленный хвост настоящего API.
+    """
+
+    def __init__(self, change_every=1, delay=0.0, homeworks=1, tokens=None,
+                 compress=False, slow=0.0, slow_delay=1.0):
+        """Заглушка API; параметры описаны в докстроке класса."""
+        super().__init__()
+        self.change_every = change_every
+        self.delay = delay
+        self.slow = slow
+        self.slow_delay = slow_delay
+        self.homeworks = homeworks
+        self.tokens = tokens
+        self.compress = compress
+
+    @property
+    def url(self):
+        """Адрес эндпоинта заглушки."""
+        return f'{self.base_url}/api/user_api/homework_statuses/'
+
+    def handle(self, handler):
+        """Ответ API: 401 без заголовка авторизации или с чужим токеном."""
+        if self.delay:
+            time.sleep(self.delay)
+        if self.slow and random.random() < self.slow:
+            time.sleep(self.slow_delay)
+        authorization = handler.headers.get('Authorization')
+        if not authorization or self.tokens is not None and (
+            authorization.partition(' ')[2] not in self.tokens
+        ):
+            return 401, {'code': 'not_authenticated'}
+        return 200, self.payload()
+
+    def payload(self):
+        """Тело очередного ответа."""
+        with self._lock:
+            self.requests += 1
+            number = self.requests
+        version = number // self.change_every
+        status = STUB_STATUSES[version % len(STUB_STATUSES)]
+        updated = time.strftime(
+            '%Y-%m-%dT%H:%M:%SZ', time.gmtime(1581604857 + version)
+        )
+        return {
+            'homeworks': [
+                {
+                    'id': index,
+                    'homework_name': f'stub_hw_{index}',
+                    'status': status,
+                    'date_updated': updated,
+                }
+                for index in range(self.homeworks)
+            ],
+            'current_date': int(time.time()),
+        }
+
+
+class FakeTelegramServer(LocalServer):
+    """Заглушка Telegram Bot API: принимает `sendMessage`.
+
+    Каждый `retry_after_every`-й запрос получает ответ 429 с
+    `retry_after`, как при превышении лимитов Telegram.
+    """
+
+    def __init__(self, delay=0.0, retry_after_every=0, retry_after=1):
+        """Заглушка Telegram с задержкой ответа `delay`."""
+        super().__init__()
+        self.delay = delay
+        self.retry_after_every = retry_after_every
+        self.retry_after = retry_after
+        self.sent = []
+
+    @property
+    def url(self):
+        """Адрес API для `telegram.Bot(base_url=...)`."""
+        return f'{self.base_url}/bot'
+
+    def handle(self, handler):
+        """Ответ Bot API на `sendMessage`."""
+        if self.delay:
+            time.sleep(self.delay)
+        length = int(handler.headers.get('Content-Length') or 0)
+        data = json.loads(handler.rfile.read(length) or b'{}')
+        with self._lock:
+            self.requests += 1
+            number = self.requests
+        method = handler.path.rpartition('/')[2]
+        if not handler.path.startswith('/bot') or method != 'sendMessage':
+            return 404, {'ok': False, 'error_code': 404,
+                         'description': 'Not Found'}
+        if self.retry_after_every and number % self.retry_after_every == 0:
+            return 429, {
+                'ok': False, 'error_code': 429,
+                'description': 'Too Many Requests: retry after '
+                               f'{self.retry_after}',
+                'parameters': {'retry_after': self.retry_after},
+            }
+        with self._lock:
+            self.sent.append((data.get('chat_id'), data.get('text')))
+        return 200, {'ok': True, 'result': {
+            'message_id': number, 'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id') or 0), 'type': 'private'},
+            'text': data.get('text'),
+        }}
+
+
+class FakeBot:
+    """Бот-заглушка, запоминающий отправленные сообщения."""
+
+    def __init__(self, delay=0.0):
+        """Бот, отвечающий с задержкой `delay`."""
+        self.delay = delay
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Имитирует отправку сообщения."""
+        if self.delay:
+            time.sleep(self.delay)
+        self.sent.append((chat_id, text))
@@ -0,0 +1,299 @@
+"""Лёгкий клиент Telegram Bot API для отправки сообщений."""
+import asyncio
+import collections
+import json
+import ssl
+import threading
+from urllib.parse import urlsplit
+
+API_URL = 'https://api.telegram.org'
+CONNECTIONS = 4
+PIPELINE_DEPTH = 8
+MAX_RETRY_WAIT = 30
+RETRIES = 3
+TIMEOUT = 10
+
+
+class TelegramApiError(Exception):
+    """Ошибка Bot API или сети при отправке сообщения."""
+
+    def __init__(self, description, error_code=None):
+        """Ошибка с текстом `description` и кодом `error_code`."""
+        super().__init__(description)
+        self.error_code = error_code
+
+
+class RetryAfter(TelegramApiError):
+    """Telegram просит подождать дольше, чем клиент готов ждать."""
+
+    def __init__(self, description, retry_after):
+        """Ограничение частоты: повтор через `retry_after` секунд."""
+        super().__init__(description, 429)
+        self.retry_after = retry_after
+
+
+class _Connection:
+    """Keep-alive соединение HTTP/1.1 с конвейером запросов.
+
+    Запросы пишутся в сокет сразу, не дожидаясь ответов на предыдущие;
+    ответы приходят в том же порядке и раздаются ожидающим по очереди.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = collections.deque()
+        self.closed = False
+        self._task = asyncio.ensure_future(self._read_responses())
+
+    async def request(self, data):
+        """Пишет запрос и ждёт ответа на него.
+
+        После записи буфер сокета сливается: при медленной сети пачка
+        запросов ждёт здесь, а не копится в транспорте без предела.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.writer.write(data)
+        try:
+            await self.writer.drain()
+        except OSError as error:
+            self.close(error)
+        return await future
+
+    async def _read_responses(self):
+        try:
+            while True:
+                status, body, keep_alive = await self._read_response()
+                self.pending.popleft().set_result((status, body))
+                if not keep_alive:
+                    break
+        except (OSError, EOFError, ValueError, IndexError,
+                asyncio.IncompleteReadError) as error:
+            self.close(error)
+        else:
+            self.close(ConnectionError('Соединение закрыто сервером.'))
+
+    async def _read_response(self):
+        line = await self.reader.readline()
+        if not line:
+            raise EOFError('Соединение закрыто сервером.')
+        status = int(line.split(None, 2)[1])
+        length = None
+        chunked = False
+        keep_alive = True
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.partition(b':')
+            name = name.strip().lower()
+            if name == b'content-length':
+                length = int(value)
+            elif name == b'transfer-encoding':
+                chunked = b'chunked' in value.lower()
+            elif name == b'connection':
+                keep_alive = b'close' not in value.lower()
+        if chunked:
+            return status, await self._read_chunks(), keep_alive
+        return status, await self.reader.readexactly(length or 0), keep_alive
+
+    async def _read_chunks(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if not size:
+                await self.reader.readline()
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    def close(self, error=None):
+        if self.closed:
+            return
+        self.closed = True
+        self.writer.close()
+        if not isinstance(error, OSError):
+            error = ConnectionError(f'Соединение прервано: {error!r}')
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
+class TelegramClient:
+    """Клиент `sendMessage` на asyncio без сторонних зависимостей.
+
+    Совместим с `telegram.Bot.send_message`, но не строит объектов
+    `Message` и не разбирает тело успешного ответа; заголовки запроса
+    собраны заранее. Event loop живёт в фоновом потоке, поэтому
+    синхронный код бота вызывает клиент как обычно, а `send_many`
+    раскладывает сообщения по `connections` keep-alive соединениям, на
+    каждом держа до `depth` запросов в конвейере HTTP/1.1.
+
+    Ответ 429 приостанавливает все отправки на `retry_after` секунд и
+    повторяет запрос; если ждать дольше `max_retry_wait`, поднимается
+    `RetryAfter`. Запрос, оборванный разрывом соединения, мог уже
+    дойти до Telegram, поэтому его повтор может продублировать
+    сообщение — как и повтор из outbox.
+    """
+
+    def __init__(self, token, api_url=API_URL, connections=CONNECTIONS,
+                 depth=PIPELINE_DEPTH, max_retry_wait=MAX_RETRY_WAIT,
+                 retries=RETRIES, timeout=TIMEOUT):
+        """Клиент бота `token` с `connections` соединениями."""
+        url = urlsplit(api_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = (
+            ssl.create_default_context() if url.scheme == 'https' else None
+        )
+        self.connections = connections
+        self.depth = depth
+        self.max_retry_wait = max_retry_wait
+        self.retries = retries
+        self.timeout = timeout
+        self._prefix = (
+            f'POST {url.path.rstrip("/")}/bot{token}/sendMessage HTTP/1.1'
+            f'\r\nHost: {url.netloc}\r\nContent-Type: application/json'
+            '\r\nContent-Length: '
+        ).encode()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._pool = []
+        self._paused_until = 0.0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, daemon=True
+        )
+        self._thread.start()
+        self._call(self._open())
+
+    async def _open(self):
+        self._slots = asyncio.Semaphore(self.connections * self.depth)
+        self._connecting = asyncio.Lock()
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(
+            coroutine, self._loop
+        ).result()
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Отправляет сообщение; при ошибке поднимает `TelegramApiError`."""
+        self._call(self._send(chat_id, text, kwargs))
+        return True
+
+    def send_many(self, messages):
+        """Отправляет пары `(chat_id, text)` конвейером.
+
+        Возвращает список той же длины: True или исключение для каждого
+        сообщения.
+        """
+        return self._call(self._send_all(messages))
+
+    async def _send_all(self, messages):
+        return await asyncio.gather(
+            *(self._send(chat_id, text) for chat_id, text in messages),
+            return_exceptions=True
+        )
+
+    async def _send(self, chat_id, text, extra=None):
+        payload = {'chat_id': chat_id, 'text': text}
+        if extra:
+            payload.update(extra)
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        data = b''.join((self._prefix, str(len(body)).encode(), b'\r\n\r\n',
+                         body))
+        for attempt in range(self.retries + 1):
+            await self._wait_pause()
+            try:
+                status, answer = await self._post(data)
+            except (OSError, asyncio.TimeoutError) as error:
+                if attempt == self.retries:
+                    self.failed += 1
+                    raise TelegramApiError(
+                        f'Сбой соединения: {error!r}'
+                    ) from error
+                self.retried += 1
+                continue
+            if status == 200:
+                self.sent += 1
+                return True
+            error = self._error(status, answer)
+            if (not isinstance(error, RetryAfter) or attempt == self.retries
+                    or error.retry_after > self.max_retry_wait):
+                self.failed += 1
+                raise error
+            self.retried += 1
+            self._pause(error.retry_after)
+
+    async def _post(self, data):
+        async with self._slots:
+            connection = await self._connection()
+            try:
+                return await asyncio.wait_for(connection.request(data),
+                                              self.timeout)
+            except asyncio.TimeoutError:
+                connection.close()
+                raise
+
+    async def _connection(self):
+        """Наименее загруженное живое соединение.
+
+        Новое открывается, только если все заняты и в пуле есть место.
+        """
+        self._pool = [item for item in self._pool if not item.closed]
+        if self._pool:
+            connection = min(self._pool, key=lambda item: len(item.pending))
+            if not connection.pending or len(self._pool) >= self.connections:
+                return connection
+        async with self._connecting:
+            if len(self._pool) >= self.connections:
+                return min(self._pool, key=lambda item: len(item.pending))
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl),
+                self.timeout
+            )
+            connection = _Connection(reader, writer)
+            self._pool.append(connection)
+            return connection
+
+    def _pause(self, seconds):
+        resume = self._loop.time() + seconds
+        self._paused_until = max(self._paused_until, resume)
+
+    async def _wait_pause(self):
+        delay = self._paused_until - self._loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _error(status, answer):
+        try:
+            data = json.loads(answer)
+        except ValueError:
+            data = {}
+        description = data.get('description') or f'HTTP {status}'
+        retry_after = (data.get('parameters') or {}).get('retry_after')
+        if status == 429 and retry_after is not None:
+            return RetryAfter(description, retry_after)
+        return TelegramApiError(description, data.get('error_code', status))
+
+    def stats(self):
+        """Отправлено, повторено и не доставлено."""
+        return {'sent': self.sent, 'retried': self.retried,
+                'failed': self.failed, 'connections': len(self._pool)}
+
+    async def _close_pool(self):
+        for connection in self._pool:
+            connection.close()
+
+    def close(self):
+        """Закрывает соединения и останавливает event loop."""
+        self._call(self._close_pool())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,19 @@
+"""HTTP-транспорт запросов к API Практикума."""
+import hashlib
+
+import requests
+
+
+def token_key(headers):
+    """Обезличенный ключ токена: начало sha256 от заголовка Authorization."""
+    authorization = (headers or {}).get('Authorization', '')
+    return hashlib.sha256(authorization.encode()).hexdigest()[:12]
+
+
+class RequestsTransport:
+    """Транспорт по умолчанию: синхронный `requests.get`."""
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос, возвращает ответ `requests`."""
+        return requests.get(url=url, headers=headers, params=params,
+                            timeout=timeout)
@@ -0,0 +1,151 @@
+"""Реестр вердиктов по статусам и карантин неразобранных работ."""
+import os
+import time
+from collections import Counter, deque
+
+from homework_bot.settings import LOADERS, SettingsError
+
+QUARANTINE_SIZE = 1000
+UNKNOWN_STATUS = 'unknown_status'
+
+
+class VerdictRegistry(dict):
+    """Вердикты по статусам работ, пополняемые без перезапуска.
+
+    Обычный словарь «статус → текст вердикта»: сравнивается и читается
+    как прежний `HOMEWORK_VERDICTS`. Новые статусы API добавляются через
+    `register` или из файла вердиктов (`VerdictsWatcher`); встроенные
+    вердикты файл не перекрывает.
+    """
+
+    def __init__(self, verdicts=()):
+        """Реестр со встроенными вердиктами `verdicts`."""
+        super().__init__(verdicts)
+        self.builtin = frozenset(self)
+
+    def register(self, status, verdict):
+        """Добавляет или меняет вердикт; True, если статус новый."""
+        if not status or not isinstance(status, str):
+            raise ValueError(f'Некорректный статус: {status!r}.')
+        if not verdict or not isinstance(verdict, str):
+            raise ValueError(f'Некорректный вердикт статуса {status}.')
+        added = status not in self
+        self[status] = verdict
+        return added
+
+    def extend(self, verdicts):
+        """Добавляет вердикты, кроме встроенных; возвращает новые статусы."""
+        added = []
+        for status, verdict in verdicts.items():
+            if status in self.builtin:
+                continue
+            if self.register(status, verdict):
+                added.append(status)
+        return added
+
+
+def read_verdicts_file(path):
+    """Читает словарь «статус → вердикт» из JSON, TOML или YAML."""
+    loader = LOADERS.get(os.path.splitext(path)[1].lower())
+    if loader is None:
+        raise SettingsError(f'Неизвестный формат файла: {path}.')
+    try:
+        with open(path, 'rb') as file:
+            data = loader(file.read())
+    except (OSError, ValueError) as error:
+        raise SettingsError(f'Не удалось прочитать {path}: {error}.')
+    if not isinstance(data, dict) or not all(
+        isinstance(verdict, str) for verdict in data.values()
+    ):
+        raise SettingsError(f'Некорректная структура файла {path}.')
+    return data
+
+
+class VerdictsWatcher:
+    """Подхватывает изменения файла вердиктов без перезапуска."""
+
+    def __init__(self, registry, path):
+        """Наблюдение за файлом `path` для реестра `registry`."""
+        self.registry = registry
+        self.path = path
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """Перечитывает файл, если он изменился; возвращает новые статусы.
+
+        При ошибке в файле бросает SettingsError, уже добавленные
+        вердикты остаются в силе.
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return []
+        self._stamp = stamp
+        return self.registry.extend(read_verdicts_file(self.path))
+
+
+class Quarantine:
+    """Работы из ответа API, которые не удалось разобрать.
+
+    Запись хранится с именем подписки и причиной; очередь не длиннее
+    `size`, старые записи вытесняются и считаются в `dropped`. Когда
+    неизвестный статус записи появляется в реестре вердиктов, `release`
+    отдаёт её на повторную обработку; записи с другими причинами только
+    хранятся для разбора.
+    """
+
+    def __init__(self, size=QUARANTINE_SIZE, clock=time.time):
+        """Пустой карантин не больше `size` записей."""
+        self.clock = clock
+        self.items = deque(maxlen=size)
+        self.reasons = Counter()
+        self.statuses = Counter()
+        self.quarantined = 0
+        self.released = 0
+        self.dropped = 0
+
+    def add(self, subscription, homework, reason):
+        """Помещает работу подписки `subscription` в карантин."""
+        if len(self.items) == self.items.maxlen:
+            self.dropped += 1
+        self.items.append((subscription, homework, reason, self.clock()))
+        self.quarantined += 1
+        self.reasons[reason] += 1
+        status = homework.get('status') if isinstance(homework, dict) else (
+            None
+        )
+        if status:
+            self.statuses[status] += 1
+
+    def release(self, known):
+        """Забирает записи с неизвестным статусом, который теперь в `known`.
+
+        Возвращает пары (подписка, работа) в порядке поступления.
+        """
+        released, kept = [], deque(maxlen=self.items.maxlen)
+        for item in self.items:
+            subscription, homework, reason, _ = item
+            if reason == UNKNOWN_STATUS and homework.get('status') in known:
+                released.append((subscription, homework))
+            else:
+                kept.append(item)
+        self.items = kept
+        self.released += len(released)
+        return released
+
+    def stats(self):
+        """Счётчики карантина по причинам и статусам."""
+        return {
+            'held': len(self.items),
+            'quarantined': self.quarantined,
+            'released': self.released,
+            'dropped': self.dropped,
+            'reasons': dict(self.reasons),
+            'statuses': dict(self.statuses.most_common(20)),
+        }
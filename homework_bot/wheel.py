@@ -0,0 +1,214 @@
+"""Иерархическое колесо таймеров для расписания опросов."""
+import math
+
+TICK = 1.0
+SLOTS = 64
+LEVELS = 4
+
+
+class TimingWheel:
+    """Иерархическое колесо таймеров (Varghese, Lauck).
+
+    Время делится на тики по `tick` секунд. Уровень 0 — `slots` корзин по
+    одному тику, каждый следующий уровень в `slots` раз грубее. Ключ
+    кладётся в корзину того уровня, куда помещается его срок, а когда
+    уровень ниже проходит полный оборот, корзина верхнего уровня
+    рассыпается вниз. Вставка, отмена и перенос — O(1); за тик
+    обрабатывается одна корзина нулевого уровня, а не все ключи.
+    Ключи со сроком дальше охвата колеса лежат на верхнем уровне и
+    рассыпаются туда же, пока срок не приблизится.
+
+    Сроки ключей хранятся в `deadlines` — можно передать колонку
+    `PollState.deadlines`.
+    """
+
+    def __init__(self, tick=TICK, slots=SLOTS, levels=LEVELS, start=0.0,
+                 deadlines=None):
+        """Пустое колесо с шагом `tick` секунд."""
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.origin = start
+        self.current = 0
+        self.wheels = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+        self.spans = [slots ** level for level in range(levels + 1)]
+        self.expired = set()
+        self.where = {}
+        self.deadlines = {} if deadlines is None else deadlines
+
+    def __len__(self):
+        """Число запланированных ключей."""
+        return len(self.where)
+
+    def __contains__(self, key):
+        """Запланирован ли ключ `key`."""
+        return key in self.where
+
+    def _tick_of(self, deadline):
+        return math.ceil((deadline - self.origin) / self.tick)
+
+    def _place(self, key, target):
+        if target <= self.current:
+            bucket = self.expired
+        else:
+            level = 0
+            span = self.spans[level]
+            while level < self.levels - 1 and (
+                target // span - self.current // span >= self.slots
+            ):
+                level += 1
+                span = self.spans[level]
+            slot = (target // span) % self.slots
+            bucket = self.wheels[level][slot]
+        bucket.add(key)
+        self.where[key] = bucket
+
+    def schedule(self, key, deadline):
+        """Назначает или переносит срок ключа."""
+        bucket = self.where.pop(key, None)
+        if bucket is not None:
+            bucket.discard(key)
+        self.deadlines[key] = deadline
+        self._place(key, self._tick_of(deadline))
+
+    def cancel(self, key):
+        """Снимает ключ с расписания; True, если он там был."""
+        bucket = self.where.pop(key, None)
+        if bucket is None:
+            return False
+        bucket.discard(key)
+        self.deadlines.pop(key, None)
+        return True
+
+    def deadline(self, key):
+        """Срок ключа или None."""
+        if key not in self.where:
+            return None
+        return self.deadlines[key]
+
+    def next_deadline(self):
+        """Ближайший срок среди ключей или None, если колесо пусто.
+
+        Смотрит корзины, а не все ключи. Внутри уровня корзины идут по
+        порядку тиков, поэтому точный срок ищется только в первой непустой
+        корзине каждого уровня. Между уровнями порядка нет: ключ лежит на
+        верхнем уровне, пока его корзина не рассыплется. На верхнем уровне
+        в корзине могут лежать и ключи следующих оборотов, поэтому поиск
+        идёт до корзины с ключом текущего оборота.
+        """
+        if self.expired:
+            return min(self.deadlines[key] for key in self.expired)
+        nearest = None
+        top = self.levels - 1
+        for level in range(self.levels):
+            span = self.spans[level]
+            base = self.current // span
+            for step in range(self.slots):
+                bucket = self.wheels[level][(base + step) % self.slots]
+                if not bucket:
+                    continue
+                deadlines = [self.deadlines[key] for key in bucket]
+                deadline = min(deadlines)
+                if nearest is None or deadline < nearest:
+                    nearest = deadline
+                if level < top or any(
+                    self._tick_of(value) // span == base + step
+                    for value in deadlines
+                ):
+                    break
+        return nearest
+
+    def advance(self, now):
+        """Продвигает колесо до `now`; возвращает ключи, чей срок настал.
+
+        Сработавшие ключи снимаются с расписания, их последний срок
+        остаётся в `deadlines`.
+        """
+        due = []
+        target = math.floor((now - self.origin) / self.tick)
+        while self.current < target:
+            self.current += 1
+            self._cascade()
+            bucket = self.wheels[0][self.current % self.slots]
+            if bucket:
+                due.extend(bucket)
+                bucket.clear()
+        due.extend(self.expired)
+        self.expired.clear()
+        for key in due:
+            del self.where[key]
+        return due
+
+    def _cascade(self):
+        """Рассыпает корзины верхних уровней, чей оборот начался.
+
+        Сверху вниз: ключи с верхнего уровня могут попасть в корзину
+        уровня ниже, которую тоже пора рассыпать.
+        """
+        top = 0
+        while top + 1 < self.levels and not (
+            self.current % self.spans[top + 1]
+        ):
+            top += 1
+        for level in range(top, 0, -1):
+            slot = (self.current // self.spans[level]) % self.slots
+            bucket = self.wheels[level][slot]
+            if not bucket:
+                continue
+            keys = list(bucket)
+            bucket.clear()
+            for key in keys:
+                self._place(key, self._tick_of(self.deadlines[key]))
+
+
+class PollSchedule:
+    """Какие подписки опросить на этом тике, по колесу таймеров.
+
+    Новые подписки опрашиваются сразу, затем каждая переносится на свой
+    `interval`. Цикл бота трогает только сработавшие подписки, а не
+    перебирает все. `lag` — насколько позже срока сработала самая
+    запоздавшая подписка последнего вызова `due`.
+    """
+
+    def __init__(self, subscriptions=(), tick=TICK, start=0.0,
+                 deadlines=None):
+        """Расписание подписок `subscriptions` с шагом `tick`."""
+        self.wheel = TimingWheel(tick, start=start, deadlines=deadlines)
+        self.subscriptions = {}
+        self.lag = 0.0
+        self.sync(subscriptions, start)
+
+    def __len__(self):
+        """Число подписок в расписании."""
+        return len(self.subscriptions)
+
+    def sync(self, subscriptions, now):
+        """Приводит расписание к новому набору подписок."""
+        fresh = {sub.name: sub for sub in subscriptions}
+        for name in self.subscriptions.keys() - fresh.keys():
+            self.wheel.cancel(name)
+        for name in fresh.keys() - self.subscriptions.keys():
+            self.wheel.schedule(name, now)
+        self.subscriptions = fresh
+
+    def due(self, now):
+        """Подписки, чей срок настал; их следующий срок назначается сразу."""
+        result = []
+        self.lag = 0.0
+        for name in self.wheel.advance(now):
+            subscription = self.subscriptions.get(name)
+            if subscription is None:
+                continue
+            self.lag = max(self.lag, now - self.wheel.deadlines[name])
+            self.wheel.schedule(name, now + subscription.interval)
+            result.append(subscription)
+        return result
+
+    def wait(self, now):
+        """Секунды до ближайшего срока; None, если подписок нет."""
+        deadline = self.wheel.next_deadline()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - now)
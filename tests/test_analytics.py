@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from homework_bot.__main__ import run
+from homework_bot.analytics import LogSketch, ReviewAnalytics
+
+
+class TestAnalytics:
+
+    def test_sketch_quantiles_are_within_accuracy(self):
+        values = [random.uniform(60, 60 * 60 * 48) for _ in range(5000)]
+        sketch = LogSketch()
+        for value in values:
+            sketch.add(value)
+        values.sort()
+        for share in (0.5, 0.9, 0.99):
+            exact = values[int(share * (len(values) - 1))]
+            assert sketch.quantile(share) == pytest.approx(exact, rel=0.02)
+
+    def test_sketches_merge(self):
+        left, right, both = LogSketch(), LogSketch(), LogSketch()
+        for value in range(1, 101):
+            (left if value % 2 else right).add(value)
+            both.add(value)
+        left.merge(right)
+        assert left.count == 100
+        assert left.quantile(0.5) == both.quantile(0.5)
+
+    def test_transitions_update_aggregates(self):
+        analytics = ReviewAnalytics()
+        analytics.observe('hw1', 'reviewing', 0)
+        analytics.observe('hw1', 'reviewing', 100)
+        analytics.observe('hw1', 'rejected', 3600)
+        analytics.observe('hw1', 'reviewing', 7200)
+        analytics.observe('hw1', 'approved', 9000)
+        assert analytics.time_in_status['hw1'] == {
+            'reviewing': 3600 + 1800, 'rejected': 3600
+        }
+        assert analytics.transitions == {
+            'reviewing->rejected': 1,
+            'rejected->reviewing': 1,
+            'reviewing->approved': 1,
+        }
+        assert analytics.rejection_rate() == 0.5
+
+    def test_report_reads_saved_aggregates(self, tmp_path, capsys):
+        path = tmp_path / 'analytics.json'
+        analytics = ReviewAnalytics()
+        analytics.observe('hw1', 'reviewing', 0)
+        analytics.observe('hw1', 'approved', 5400)
+        analytics.save(str(path))
+        assert not analytics.dirty
+        assert run(['analytics', 'report', '--path', str(path)]) == 0
+        output = capsys.readouterr().out
+        assert 'В статусе reviewing: 1 раз, p50=1ч30м' in output
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+
+from homework_bot.__main__ import run
+from homework_bot.archive import RECORD, EventArchive
+
+
+class TestArchive:
+
+    def fill(self, directory, count=1000):
+        archive = EventArchive(str(directory))
+        for number in range(count):
+            archive.append('student', number % 10,
+                           ('reviewing', 'approved')[number % 2],
+                           updated=number, observed=1000 + number)
+        archive.flush()
+        return archive
+
+    def test_range_scan_uses_observed_time(self, tmp_path):
+        archive = self.fill(tmp_path)
+        events = list(archive.scan(1100, 1110))
+        assert [event.observed for event in events] == [
+            float(number) for number in range(1100, 1110)
+        ]
+        assert events[0].homework == '0'
+        assert events[0].status == 'reviewing'
+
+    def test_observed_time_never_goes_back(self, tmp_path):
+        archive = EventArchive(str(tmp_path))
+        archive.append('s', 1, 'reviewing', observed=200)
+        archive.append('s', 1, 'approved', observed=100)
+        assert [event.observed for event in archive.scan()] == [200, 200]
+
+    def test_reopen_keeps_strings_and_drops_torn_tail(self, tmp_path):
+        self.fill(tmp_path, count=10).close()
+        with open(tmp_path / 'events.bin', 'ab') as file:
+            file.write(b'\0' * (RECORD.size // 2))
+        archive = EventArchive(str(tmp_path))
+        assert len(archive) == 10
+        archive.append('other', 'x', 'rejected', observed=5000)
+        events = list(archive.scan(4000))
+        assert events[0][2:] == ('other', 'x', 'rejected')
+        assert os.path.getsize(tmp_path / 'events.bin') == 11 * RECORD.size
+
+    def test_readonly_leaves_torn_tail_to_writer(self, tmp_path):
+        writer = self.fill(tmp_path, count=10)
+        writer.flush()
+        with open(tmp_path / 'events.bin', 'ab') as file:
+            file.write(b'\0' * (RECORD.size // 2))
+        with open(tmp_path / 'strings.jsonl', 'ab') as file:
+            file.write(b'"unfinis')
+        reader = EventArchive(str(tmp_path), readonly=True)
+        assert len(reader) == 10
+        assert len(list(reader.scan())) == 10
+        assert os.path.getsize(tmp_path / 'events.bin') % RECORD.size
+        with pytest.raises(ValueError):
+            reader.append('sub', 'hw', 'approved')
+        assert len(EventArchive(str(tmp_path / 'missing'),
+                                readonly=True)) == 0
+        assert not (tmp_path / 'missing').exists()
+        writer.close()
+
+    def test_export_formats(self, tmp_path):
+        archive = self.fill(tmp_path, count=5)
+        output = io.StringIO()
+        assert archive.export(output, 'csv') == 5
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        assert rows[0][0] == 'observed' and len(rows) == 6
+        output = io.StringIO()
+        archive.export(output, 'jsonl', start=1003)
+        lines = output.getvalue().splitlines()
+        assert [json.loads(line)['observed'] for line in lines] == [
+            1003.0, 1004.0
+        ]
+
+    def test_cli_export(self, tmp_path):
+        self.fill(tmp_path / 'archive', count=3).close()
+        output = tmp_path / 'events.csv'
+        assert run(['archive', 'export', '--dir', str(tmp_path / 'archive'),
+                    '--format', 'csv', '--output', str(output)]) == 0
+        assert len(output.read_text().splitlines()) == 4
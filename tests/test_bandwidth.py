@@ -0,0 +1,108 @@
+import json
+
+from homework_bot import stubs
+from homework_bot.bandwidth import (
+    BandwidthMeter, CompressedTransport, sent_bytes
+)
+from homework_bot.settings import Subscription
+from homework_bot.transport import RequestsTransport, token_key
+
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+class FakeResponse:
+
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode()
+        self.headers = {'Content-Type': 'application/json'}
+        self.reason = 'OK'
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class QueueTransport:
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.headers.append(headers)
+        return self.responses.pop(0)
+
+
+class TestCompressedTransport:
+
+    def test_negotiates_gzip_and_counts_wire_bytes(self):
+        meters = {}
+        with stubs.FakePracticumServer(homeworks=30, compress=True) as api:
+            for encoding in ('identity', 'gzip'):
+                meter = meters[encoding] = BandwidthMeter()
+                transport = CompressedTransport(
+                    RequestsTransport(), meter, encoding=encoding
+                )
+                response = transport.get(api.url, headers=HEADERS)
+                assert len(response.json()['homeworks']) == 30
+        assert meters['gzip'].stats()['encodings'] == {'gzip': 1}
+        plain, = meters['identity'].stats()['endpoints'].values()
+        packed, = meters['gzip'].stats()['endpoints'].values()
+        assert packed['bytes_in'] < plain['bytes_in'] / 2
+        assert packed['bytes_out'] > 0
+
+    def test_unchanged_body_is_not_decoded_again(self):
+        homework = {'id': 1, 'status': 'reviewing'}
+        inner = QueueTransport(
+            FakeResponse({'homeworks': [homework], 'current_date': 1}),
+            FakeResponse({'homeworks': [homework], 'current_date': 2}),
+            FakeResponse({'homeworks': [], 'current_date': 3}),
+        )
+        meter = BandwidthMeter()
+        transport = CompressedTransport(inner, meter)
+        first = transport.get('https://host/', headers=HEADERS).json()
+        second = transport.get('https://host/', headers=HEADERS).json()
+        assert second == {'homeworks': [homework], 'current_date': 2}
+        assert first['current_date'] == 1, (
+            'Свежий current_date не должен менять прошлый результат.'
+        )
+        third = transport.get('https://host/', headers=HEADERS).json()
+        assert third == {'homeworks': [], 'current_date': 3}
+        stats = meter.stats()
+        assert (stats['bodies_decoded'], stats['bodies_unchanged']) == (2, 1)
+        assert inner.headers[0]['Accept-Encoding']
+        assert inner.headers[0]['Authorization'] == 'OAuth token'
+
+    def test_error_response_is_passed_through(self):
+        inner = QueueTransport(FakeResponse({'code': 'err'}, 500))
+        transport = CompressedTransport(inner, BandwidthMeter())
+        response = transport.get('https://host/', headers=HEADERS)
+        assert response.status_code == 500
+        assert response.json() == {'code': 'err'}
+        assert response.reason == 'OK'
+
+
+class TestBandwidthMeter:
+
+    def test_top_subscriptions_by_bytes_in(self):
+        meter = BandwidthMeter(top=1)
+        subs = [
+            Subscription.create(name, name, 1, 'https://host/')
+            for name in ('small', 'big')
+        ]
+        meter.label(subs)
+        for sub, received in zip(subs, (100, 1000)):
+            meter.record(sub.endpoint, token_key(sub.headers), 50,
+                         received, 'gzip')
+        stats = meter.stats()
+        assert list(stats['top_subscriptions']) == ['big']
+        assert stats['endpoints']['https://host/'] == {
+            'requests': 2, 'bytes_out': 100, 'bytes_in': 1100,
+            'bytes_in_per_request': 550,
+        }
+
+    def test_sent_bytes_without_request(self):
+        size = sent_bytes(object(), 'https://host/path', {'A': 'b'},
+                          {'from_date': 0})
+        assert size == len('GET /path?from_date=0 HTTP/1.1\r\n'
+                           'Host: host\r\nA: b\r\n\r\n')
@@ -0,0 +1,83 @@
+import pytest
+
+from homework_bot import stubs
+from homework_bot.chaos import (
+    ChaosBot, ChaosTransport, Fault, FaultInjector, parse_chaos
+)
+from homework_bot.settings import Subscription
+from homework_bot.telegram_api import TelegramApiError
+from homework_bot.transport import RequestsTransport
+
+
+def always(kind, seconds=0.0):
+    return FaultInjector({kind: Fault(1.0, seconds)}, sleep=lambda _: None)
+
+
+class TestParseChaos:
+
+    def test_parse(self):
+        faults = parse_chaos('api.error=0.05, telegram.latency=0.1:2')
+        assert faults['api'] == {'error': Fault(0.05, 0.0)}
+        assert faults['telegram'] == {'latency': Fault(0.1, 2.0)}
+
+    @pytest.mark.parametrize('spec', [
+        'api.unknown=0.1', 'telegram.corrupt=0.1', 'api.error=2',
+        'api.error=x',
+    ])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_chaos(spec)
+
+
+class TestChaosTransport:
+
+    @pytest.fixture
+    def api(self):
+        with stubs.FakePracticumServer() as server:
+            yield server
+
+    @pytest.mark.parametrize('kind, error_name', [
+        ('error', 'ResponseStatusNot200'),
+        ('timeout', 'ApiAnswerError'),
+        ('corrupt', 'ApiAnswerError'),
+        ('no_homeworks', 'ResponseNoHomeworksKey'),
+    ])
+    def test_faults_reach_bot_error_paths(self, api, monkeypatch, kind,
+                                          error_name):
+        import homework
+        monkeypatch.setattr(homework, 'TRANSPORT', ChaosTransport(
+            RequestsTransport(), always(kind)
+        ))
+        subscription = Subscription.create('a', 'token', 1, api.url)
+        with pytest.raises(getattr(homework, error_name)):
+            homework.check_response(
+                homework.request_statuses(subscription, 0)
+            )
+
+    def test_zero_probability_passes_through(self, api):
+        transport = ChaosTransport(
+            RequestsTransport(), FaultInjector({'error': Fault(0.0)})
+        )
+        response = transport.get(api.url, headers={'Authorization': 'a'})
+        assert response.status_code == 200
+
+
+class TestChaosBot:
+
+    def test_send_many_keeps_order(self):
+        fake = stubs.FakeBot()
+        bot = ChaosBot(fake, always('error'))
+        results = bot.send_many([(1, 'a'), (2, 'b')])
+        assert all(isinstance(item, TelegramApiError) for item in results)
+        assert fake.sent == []
+        with pytest.raises(TelegramApiError):
+            bot.send_message(1, 'a')
+
+    def test_latency_without_errors(self):
+        slept = []
+        fake = stubs.FakeBot()
+        bot = ChaosBot(fake, FaultInjector({'latency': Fault(1.0, 0.5)},
+                                           sleep=slept.append))
+        assert bot.send_many([(1, 'a')]) == [True]
+        assert slept == [0.5]
+        assert fake.sent == [(1, 'a')]
@@ -0,0 +1,97 @@
+from homework_bot.delivery import (
+    PRIORITY_ERROR, PRIORITY_REVIEW, PRIORITY_VERDICT, DeliveryScheduler,
+    status_priority
+)
+from homework_bot.outbox import Outbox
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestDelivery:
+
+    def fill(self, outbox, clock):
+        outbox.put(1, 'error', 'e', PRIORITY_ERROR)
+        clock.now += 1
+        outbox.put(1, 'reviewing', 'r', PRIORITY_REVIEW)
+        clock.now += 1
+        outbox.put(1, 'approved', 'a', PRIORITY_VERDICT)
+
+    def test_status_priority(self):
+        assert status_priority('approved') == PRIORITY_VERDICT
+        assert status_priority('rejected') == PRIORITY_VERDICT
+        assert status_priority('reviewing') == PRIORITY_REVIEW
+
+    def test_verdicts_go_first(self):
+        clock = FakeClock()
+        outbox = Outbox(clock=clock)
+        self.fill(outbox, clock)
+        sent = []
+        DeliveryScheduler(outbox).run(lambda item: sent.append(item.key)
+                                      or True)
+        assert sent == ['a', 'r', 'e'], (
+            'Вердикт должен уходить раньше ошибок и взятия в работу.'
+        )
+
+    def test_aging_prevents_starvation(self):
+        clock = FakeClock()
+        outbox = Outbox(clock=clock)
+        outbox.put(1, 'error', 'old-error', PRIORITY_ERROR)
+        clock.now += 60 * 11
+        outbox.put(1, 'approved', 'fresh', PRIORITY_VERDICT)
+        keys = [item.key for item in outbox.due()]
+        assert keys == ['old-error', 'fresh']
+
+    def test_rate_limit_keeps_rest_queued(self):
+        clock = FakeClock()
+        outbox = Outbox(clock=clock)
+        self.fill(outbox, clock)
+        scheduler = DeliveryScheduler(outbox, rate=1, max_wait=0)
+        sent = []
+        assert scheduler.run(lambda item: sent.append(item.key) or True) == 1
+        assert sent == ['a']
+        assert outbox.stats()['pending'] == 2
+
+    def test_rate_limit_waits_for_refill(self):
+        clock = FakeClock()
+        outbox = Outbox(clock=clock)
+        self.fill(outbox, clock)
+        started = clock.now
+        scheduler = DeliveryScheduler(outbox, rate=1, max_wait=1.5,
+                                      clock=clock, sleep=clock.sleep)
+        assert scheduler.run(lambda item: True) == 2
+        assert outbox.stats()['pending'] == 1
+        assert scheduler.run(lambda item: True) == 1
+        assert clock.now - started == 2
+
+    def test_failed_send_is_retried_later(self):
+        outbox = Outbox()
+        outbox.put(1, 'approved', 'a', PRIORITY_VERDICT)
+        scheduler = DeliveryScheduler(outbox)
+        assert scheduler.run(lambda item: False) == 0
+        assert scheduler.stats()['failed'] == 1
+        assert outbox.stats()['pending'] == 1
+
+    def test_run_many_sends_whole_batch(self):
+        clock = FakeClock()
+        outbox = Outbox(clock=clock)
+        self.fill(outbox, clock)
+        batches = []
+
+        def send_many(items):
+            batches.append([item.key for item in items])
+            return [item.key != 'e' for item in items]
+
+        scheduler = DeliveryScheduler(outbox)
+        assert scheduler.run_many(send_many) == 2
+        assert batches == [['a', 'r', 'e']]
+        assert outbox.stats()['pending'] == 1
@@ -0,0 +1,71 @@
+import json
+import socket
+import time
+
+from homework_bot.events import EventStream, JsonlSink, UnixSocketServer
+
+
+class TestEventStream:
+
+    def test_slow_subscriber_drops_oldest(self):
+        stream = EventStream(queue_size=3)
+        subscriber = stream.subscribe()
+        for number in range(5):
+            stream.publish({'n': number})
+        assert subscriber.get_batch(10) == [{'n': 2}, {'n': 3}, {'n': 4}]
+        assert subscriber.dropped == 2
+        assert stream.stats() == {'published': 5, 'subscribers': 1,
+                                  'dropped': 2}
+
+    def test_publish_without_reader_does_not_block(self):
+        stream = EventStream(queue_size=100)
+        stream.subscribe()
+        started = time.monotonic()
+        for number in range(50000):
+            stream.publish({'n': number})
+        assert time.monotonic() - started < 1
+
+    def test_batches_and_unsubscribe(self):
+        stream = EventStream()
+        subscriber = stream.subscribe()
+        for number in range(5):
+            stream.publish(number)
+        assert subscriber.get_batch(2) == [0, 1]
+        assert subscriber.get_batch(10) == [2, 3, 4]
+        assert subscriber.get_batch(10, timeout=0.01) == []
+        subscriber.close()
+        stream.publish(5)
+        assert stream.stats()['subscribers'] == 0
+
+
+class TestSinks:
+
+    def test_jsonl_sink(self, tmp_path):
+        stream = EventStream()
+        path = tmp_path / 'events.jsonl'
+        sink = JsonlSink(stream, str(path)).start()
+        stream.publish({'status': 'approved'})
+        deadline = time.monotonic() + 1
+        while sink.written < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sink.close()
+        assert json.loads(path.read_text()) == {'status': 'approved'}
+
+    def test_unix_socket(self, tmp_path):
+        stream = EventStream()
+        path = str(tmp_path / 'events.sock')
+        server = UnixSocketServer(stream, path).start()
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            deadline = time.monotonic() + 1
+            while not stream.stats()['subscribers']:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            stream.publish({'status': 'rejected'})
+            client.settimeout(1)
+            line = client.makefile().readline()
+            client.close()
+        finally:
+            server.stop()
+        assert json.loads(line) == {'status': 'rejected'}
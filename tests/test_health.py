@@ -0,0 +1,52 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+from homework_bot.health import HealthServer, HealthState, Watchdog
+
+
+def fetch(server, path):
+    url = f'http://127.0.0.1:{server.port}{path}'
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+class TestHealth:
+
+    def test_ready_after_successful_poll(self):
+        state = HealthState(interval=600)
+        state.register('queue', lambda: {'pending': 3})
+        server = HealthServer(state, 0, host='127.0.0.1').start()
+        try:
+            code, data = fetch(server, '/ready')
+            assert code == 503, 'До первого опроса бот не готов.'
+            state.poll_ok()
+            code, data = fetch(server, '/ready')
+            assert code == 200
+            assert data['queue'] == {'pending': 3}
+        finally:
+            server.stop()
+
+    def test_watchdog_flags_stuck_cycle(self):
+        state = HealthState(interval=600)
+        watchdog = Watchdog(state, stall_after=0.05)
+        state.cycle_started()
+        assert not watchdog.check()
+        time.sleep(0.06)
+        assert watchdog.check(), 'Зависший цикл должен помечаться.'
+        assert not state.is_live()
+        state.cycle_finished()
+        assert state.is_live()
+        assert not watchdog.check()
+
+    def test_lag_counts_from_last_cycle(self):
+        state = HealthState(interval=10)
+        state.cycle_started()
+        state.cycle_finished()
+        finished = state.cycle_finished_at
+        assert state.lag(now=finished + 5) == 0
+        assert state.lag(now=finished + 15) == 5
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from homework_bot.hedge import HedgedTransport
+from homework_bot.ratelimit import RateLimiter
+
+
+class SlowTransport:
+    """Отвечает мгновенно, кроме вызовов с номерами из `slow`."""
+
+    def __init__(self, slow=(), delay=0.3, fail=()):
+        self.slow = set(slow)
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call in self.slow:
+            time.sleep(self.delay)
+        if call in self.fail:
+            raise ConnectionError(f'сбой {call}')
+        return call
+
+
+def warm(transport, count=50):
+    for _ in range(count):
+        transport.get('url')
+    # Замер последнего ответа записывается колбэком в потоке пула.
+    time.sleep(0.01)
+
+
+class TestHedgedTransport:
+
+    def test_no_hedging_before_min_samples(self):
+        inner = SlowTransport(slow={5}, delay=0.05)
+        transport = HedgedTransport(inner, min_samples=10)
+        warm(transport, 10)
+        stats = transport.stats()
+        assert stats['threshold'] is None
+        assert stats['hedged'] == 0
+        assert inner.calls == 10
+
+    def test_slow_response_is_hedged(self):
+        inner = SlowTransport(slow={21}, delay=0.5)
+        transport = HedgedTransport(inner, min_samples=20)
+        warm(transport, 20)
+        started = time.monotonic()
+        assert transport.get('url') == 22
+        assert time.monotonic() - started < 0.25
+        stats = transport.stats()
+        assert stats['hedged'] == 1
+        assert stats['hedge_won'] == 1
+        assert stats['served_latency']['p99'] < 0.25
+        transport.close()
+
+    def test_budget_limits_hedges(self):
+        inner = SlowTransport(slow=range(21, 30), delay=0.05)
+        transport = HedgedTransport(inner, budget=0.0, burst=2,
+                                    min_samples=20)
+        warm(transport, 20)
+        for _ in range(4):
+            transport.get('url')
+        stats = transport.stats()
+        assert stats['hedged'] == 2
+        assert stats['hedge_denied'] == 2
+        transport.close()
+
+    def test_failed_primary_falls_back_to_hedge(self):
+        inner = SlowTransport(slow={21}, delay=0.1, fail={21})
+        transport = HedgedTransport(inner, min_samples=20)
+        warm(transport, 20)
+        assert transport.get('url') == 22
+        transport.close()
+
+    def test_both_failed_raises_primary_error(self):
+        inner = SlowTransport(slow={21}, delay=0.1, fail={21, 22})
+        transport = HedgedTransport(inner, min_samples=20)
+        warm(transport, 20)
+        with pytest.raises(ConnectionError, match='сбой 21'):
+            transport.get('url')
+        transport.close()
+
+    def test_hedge_respects_rate_limit(self):
+        inner = SlowTransport(slow={21, 23}, delay=0.05)
+        limiter = RateLimiter(token_rate=0.001)
+        transport = HedgedTransport(inner, min_samples=20, limiter=limiter)
+        warm(transport, 20)
+        headers = {'Authorization': 'OAuth token'}
+        transport.get('url', headers=headers)
+        transport.get('url', headers=headers)
+        assert inner.calls == 23
+        stats = transport.stats()
+        assert stats['hedged'] == 1
+        assert stats['hedge_denied'] == 1
+        assert limiter.stats()['allowed'] == 1
+        transport.close()
@@ -0,0 +1,101 @@
+import socket
+
+import pytest
+
+from homework_bot import stubs
+from homework_bot.http2 import DnsCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDnsCache:
+
+    def test_cached_until_ttl(self):
+        calls = []
+
+        def resolver(host, port):
+            calls.append(host)
+            return [('addr', host)]
+
+        clock = FakeClock()
+        cache = DnsCache(ttl=10, resolver=resolver, clock=clock)
+        cache.getaddrinfo('host', 443)
+        cache.getaddrinfo('host', 443)
+        assert calls == ['host']
+        clock.now = 11
+        cache.getaddrinfo('host', 443)
+        assert calls == ['host', 'host']
+        assert cache.stats()['hits'] == 1
+
+    def test_stale_entry_on_resolver_error(self):
+        answers = [[('addr', 'old')]]
+
+        def resolver(host, port):
+            if not answers:
+                raise socket.gaierror('no dns')
+            return answers.pop()
+
+        clock = FakeClock()
+        cache = DnsCache(ttl=1, resolver=resolver, clock=clock)
+        cache.getaddrinfo('host', 443)
+        clock.now = 5
+        assert cache.getaddrinfo('host', 443) == [('addr', 'old')]
+
+    def test_install_and_uninstall(self):
+        original = socket.getaddrinfo
+        cache = DnsCache().install()
+        try:
+            assert socket.getaddrinfo == cache.getaddrinfo
+        finally:
+            cache.uninstall()
+        assert socket.getaddrinfo is original
+
+
+class TestHttp2Transport:
+
+    def test_reuses_connections(self):
+        pytest.importorskip('httpx')
+        from homework_bot.http2 import Http2Transport
+        with stubs.FakePracticumServer() as server:
+            transport = Http2Transport()
+            for _ in range(5):
+                response = transport.get(
+                    server.url, headers={'Authorization': 'OAuth t'},
+                    params={'from_date': 0}, timeout=1
+                )
+                assert response.status_code == 200
+                assert 'homeworks' in response.json()
+            transport.close()
+            assert server.connections == 1
+
+    def test_missing_h2_is_reported(self, monkeypatch):
+        httpx = pytest.importorskip('httpx')
+        from homework_bot.http2 import Http2Transport
+
+        def client(**kwargs):
+            raise ImportError('h2 is not installed')
+
+        monkeypatch.setattr(httpx, 'Client', client)
+        with pytest.raises(RuntimeError, match='httpx\\[http2\\]'):
+            Http2Transport()
+
+    def test_main_exits_without_h2(self, monkeypatch, caplog):
+        import homework
+
+        def transport():
+            raise RuntimeError('Для HTTP/2 установите пакет httpx[http2].')
+
+        monkeypatch.setattr(homework, 'API_TRANSPORT', 'http2')
+        monkeypatch.setattr(homework, 'SUBSCRIPTIONS_FILE', None)
+        monkeypatch.setattr(homework.http2, 'Http2Transport', transport)
+        with pytest.raises(SystemExit):
+            homework.main()
+        assert any(record.levelname == 'CRITICAL' and 'httpx[http2]' in
+                   record.message for record in caplog.records)
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from homework_bot import stubs
+from homework_bot.pipeline import LoadShedder
+from homework_bot.soak import RESTORED, SimulatedClock, SoakFinished
+
+
+@pytest.fixture
+def run_main(monkeypatch, tmp_path):
+    """Прогон `main()` в модельном времени; возвращает опросы по времени."""
+    import homework
+    for name in RESTORED + ('POLL_POLICY', 'WHEEL_TICK'):
+        monkeypatch.setattr(homework, name, getattr(homework, name))
+    bot = stubs.FakeBot()
+    monkeypatch.setattr(homework.telegram, 'Bot', lambda token: bot)
+    monkeypatch.setattr(homework, 'TELEGRAM_CLIENT', 'ptb')
+    monkeypatch.setattr(homework, 'SHEDDER', LoadShedder())
+    monkeypatch.setattr(homework, 'HEALTH_PORT', None)
+    monkeypatch.setattr(homework, 'WATCHDOG_TIMEOUT', 0)
+    monkeypatch.setattr(homework.LOGGER, 'disabled', True)
+
+    def run(intervals, duration, **overrides):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({'subscriptions': [
+            {'name': name, 'practicum_token': name, 'chat_id': 1,
+             'interval': interval}
+            for name, interval in intervals.items()
+        ]}))
+        clock = SimulatedClock(duration)
+        polls = []
+
+        def poll(bot, due, *args, **kwargs):
+            polls.extend((clock.monotonic(), sub.name) for sub in due)
+
+        overrides.update(SUBSCRIPTIONS_FILE=str(path), time=clock,
+                         poll_subscriptions=poll)
+        for name, value in overrides.items():
+            monkeypatch.setattr(homework, name, value)
+        with pytest.raises(SoakFinished):
+            homework.main()
+        return homework, polls
+
+    return run
+
+
+def test_mixed_intervals_are_polled_on_time(run_main):
+    intervals = {'fast': 60, 'odd': 90, 'slow': 600}
+    homework, polls = run_main(intervals, 1200)
+    for name, interval in intervals.items():
+        times = [when for when, polled in polls if polled == name]
+        assert times[0] == 0
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        assert max(gaps) <= interval + homework.WHEEL_TICK, (
+            f'Подписка {name} опрошена позже своего интервала.'
+        )
+    assert homework.SHEDDER.lag <= homework.WHEEL_TICK, (
+        'Отставание должно мерить перегрузку, а не сон основного цикла.'
+    )
+
+
+def test_predictive_policy_polls_before_fixed_interval(run_main):
+    homework, polls = run_main({'a': 600, 'b': 600}, 900,
+                               POLL_POLICY='predictive',
+                               PREDICT_MIN_INTERVAL=60)
+    early = [when for when, _ in polls if 0 < when < 600]
+    assert early, (
+        'Прогноз должен тратить бюджет раньше фиксированного интервала.'
+    )
+    started = [name for when, name in polls if when == 0]
+    later = [name for when, name in polls if when > 0]
+    assert len(later) <= len(started) * 900 / 600 + 1, (
+        'Прогноз не должен опрашивать чаще фиксированного бюджета.'
+    )
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from homework_bot import stubs
+
+RESTORED = ('TRANSPORT', 'OUTBOX', 'DELIVERY', 'PIPELINE', 'ANALYTICS',
+            'ARCHIVE')
+
+
+@pytest.fixture
+def once(monkeypatch, tmp_path):
+    import homework
+    for name in RESTORED:
+        monkeypatch.setattr(homework, name, getattr(homework, name))
+    bot = stubs.FakeBot()
+    monkeypatch.setattr(homework.telegram, 'Bot', lambda token: bot)
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abc')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '1')
+    monkeypatch.setattr(homework, 'TELEGRAM_CLIENT', 'ptb')
+    monkeypatch.setattr(homework, 'SUBSCRIPTIONS_FILE', None)
+    monkeypatch.setattr(homework, 'OUTBOX_PATH', str(tmp_path / 'outbox'))
+    monkeypatch.setattr(homework, 'STATE_PATH', str(tmp_path / 'state'))
+    with stubs.FakePracticumServer(change_every=10 ** 9) as server:
+        monkeypatch.setattr(homework, 'ENDPOINT', server.url)
+        yield homework, bot, tmp_path / 'state'
+
+
+def test_once_notifies_and_saves_state(once):
+    homework, bot, state_path = once
+    assert homework.run_once() == 0
+    assert len(bot.sent) == 1
+    with open(state_path) as file:
+        state = json.load(file)
+    (status, cursor, homeworks), = state.values()
+    assert status == 'reviewing'
+    assert cursor > 0
+    assert list(homeworks) == ['0']
+
+
+def test_second_run_does_not_repeat(once, monkeypatch):
+    homework, bot, _ = once
+    monkeypatch.setattr(homework, 'OUTBOX_PATH', ':memory:')
+    homework.run_once()
+    homework.run_once()
+    assert len(bot.sent) == 1, (
+        'Статус, сохранённый прошлым запуском, не должен отправляться снова.'
+    )
+
+
+def test_older_homework_is_not_repeated(once, monkeypatch):
+    homework, bot, _ = once
+    monkeypatch.setattr(homework, 'OUTBOX_PATH', ':memory:')
+    monkeypatch.setattr(homework, 'request_statuses', lambda *args: {
+        'homeworks': [
+            {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing',
+             'date_updated': '2026-10-02T10:00:00Z'},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': '2026-10-01T10:00:00Z'},
+        ],
+        'current_date': 0,
+    })
+    for _ in range(3):
+        homework.run_once()
+    assert len(bot.sent) == 2, (
+        'Статусы работ, сохранённые прошлым запуском, не должны '
+        'отправляться снова.'
+    )
+
+
+def test_next_run_asks_since_cursor(once, monkeypatch):
+    homework, bot, state_path = once
+    asked = []
+    request = homework.request_statuses
+
+    def recording(subscription, timestamp):
+        asked.append(timestamp)
+        return request(subscription, timestamp)
+
+    monkeypatch.setattr(homework, 'request_statuses', recording)
+    homework.run_once()
+    with open(state_path) as file:
+        (_, cursor, _), = json.load(file).values()
+    homework.run_once()
+    assert asked[1] == int(cursor - homework.CURSOR_OVERLAP)
+
+
+def test_missing_tokens(once, monkeypatch):
+    homework, bot, state_path = once
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', None)
+    assert homework.run_once() == 1
+    assert not state_path.exists()
@@ -0,0 +1,76 @@
+from homework_bot.outbox import Outbox, transition_key
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOutbox:
+    HOMEWORK = {'id': 7, 'status': 'approved',
+                'date_updated': '2020-02-13T14:40:57Z'}
+
+    def test_same_transition_is_queued_once(self):
+        outbox = Outbox()
+        key = transition_key(1, self.HOMEWORK)
+        assert outbox.put(1, 'text', key)
+        assert not outbox.put(1, 'text', key), (
+            'Повторная запись того же перехода должна игнорироваться.'
+        )
+        outbox.ack(key)
+        assert not outbox.put(1, 'text', key)
+        assert outbox.due() == []
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        clock = FakeClock()
+        outbox = Outbox(clock=clock)
+        outbox.put(1, 'text', 'k')
+        assert outbox.fail('k', 'timeout')
+        assert outbox.due() == []
+        clock.now += 5
+        assert [item.key for item in outbox.due()] == ['k']
+        assert outbox.due()[0].attempts == 1
+
+    def test_gives_up_after_max_attempts(self):
+        clock = FakeClock()
+        outbox = Outbox(max_attempts=2, clock=clock)
+        outbox.put(1, 'text', 'k')
+        assert outbox.fail('k')
+        assert not outbox.fail('k')
+        assert outbox.stats() == {'pending': 0, 'done': 0, 'dead': 1}
+
+    def test_pending_survive_restart(self, tmp_path):
+        path = str(tmp_path / 'outbox.db')
+        outbox = Outbox(path)
+        outbox.put(1, 'first', 'a')
+        outbox.put(1, 'second', 'b')
+        outbox.ack('a')
+        outbox.close()
+        reopened = Outbox(path)
+        assert [item.text for item in reopened.due()] == ['second']
+
+    def test_merge_joins_pending_per_chat(self):
+        outbox = Outbox()
+        outbox.put(1, 'first', 'a', priority=1)
+        outbox.put(1, 'second', 'b', priority=0)
+        outbox.put(2, 'other', 'c')
+        assert outbox.merge() == 1
+        texts = sorted(item.text for item in outbox.due())
+        assert texts == ['first\n\nsecond', 'other']
+        merged = [item for item in outbox.due() if item.chat_id == '1'][0]
+        assert merged.priority == 0
+        assert not outbox.put(1, 'first', 'a'), (
+            'Склеенные записи должны защищать свои ключи от повторов.'
+        )
+        assert outbox.stats()['merged'] == 2
+
+    def test_merge_respects_max_length(self):
+        outbox = Outbox()
+        for key in 'abc':
+            outbox.put(1, 'x' * 10, key)
+        assert outbox.merge(max_length=25) == 1
+        assert sorted(len(item.text) for item in outbox.due()) == [10, 22]
@@ -0,0 +1,107 @@
+import threading
+
+from homework_bot.pipeline import LoadShedder, PollPipeline
+from homework_bot.settings import Subscription
+
+
+def subscription(name):
+    return Subscription.create(name, 't', 1, 'https://host/', 10)
+
+
+class TestPollPipeline:
+
+    def test_failures_do_not_stop_other_items(self):
+        processed, failed = [], []
+
+        def fetch(item):
+            if item == 2:
+                raise ValueError('fetch')
+            return item * 10
+
+        def process(item, value):
+            if item == 3:
+                raise KeyError('process')
+            processed.append(value)
+
+        pipeline = PollPipeline(workers=3)
+        pipeline.run(range(5), fetch, process,
+                     lambda item, error: failed.append((item, type(error))))
+        assert sorted(processed) == [0, 10, 40]
+        assert sorted(failed) == [(2, ValueError), (3, KeyError)]
+        assert pipeline.stats()['processed'] == 5
+
+    def test_bounded_queue_blocks_fetchers(self):
+        release = threading.Event()
+        fetched = []
+
+        def fetch(item):
+            fetched.append(item)
+            return item
+
+        def process(item, value):
+            release.wait(5)
+
+        pipeline = PollPipeline(workers=2, queue_size=1)
+        worker = threading.Thread(
+            target=pipeline.run,
+            args=(range(10), fetch, process, lambda item, error: None)
+        )
+        worker.start()
+        threading.Event().wait(0.2)
+        assert len(fetched) <= 4, (
+            'Загрузчики должны ждать места в очереди, а не забегать вперёд.'
+        )
+        release.set()
+        worker.join(5)
+        assert len(fetched) == 10
+        assert pipeline.stats()['blocked'] > 0
+
+
+class TestLoadShedder:
+
+    def test_levels_follow_lag_with_cooldown(self):
+        shedder = LoadShedder(max_lag=1, max_skips=2, cooldown=10,
+                              smoothing=1)
+        assert not shedder.observe(0.5, 0)
+        assert shedder.observe(3, 1)
+        shedder.observe(3, 2)
+        assert shedder.level == 2
+        shedder.observe(3, 3)
+        assert shedder.level == 2
+        shedder.observe(0, 5)
+        assert shedder.level == 2
+        shedder.observe(0, 13)
+        assert shedder.level == 1
+
+    def test_disabled_only_measures(self):
+        shedder = LoadShedder()
+        assert not shedder.observe(100, 0)
+        assert shedder.stats()['lag'] > 0
+
+    def test_skips_idle_and_puts_hot_first(self):
+        shedder = LoadShedder(max_lag=1, idle_after=60, max_skips=3,
+                              smoothing=1)
+        subs = [subscription(f'idle{index}') for index in range(8)]
+        subs.append(subscription('hot'))
+        shedder.admit(subs, 0)
+        shedder.touch('hot', 100)
+        shedder.observe(5, 100)
+        shedder.observe(5, 100)
+        assert shedder.level == 2
+        polls = dict.fromkeys((sub.name for sub in subs), 0)
+        for cycle in range(6):
+            admitted = shedder.admit(subs, 100 + cycle)
+            assert admitted[0].name == 'hot'
+            for sub in admitted:
+                polls[sub.name] += 1
+        assert polls.pop('hot') == 6
+        assert set(polls.values()) == {2}, (
+            'На уровне 2 простаивающая подписка опрашивается раз в 3 срока.'
+        )
+
+    def test_merge_only_while_shedding(self):
+        shedder = LoadShedder(max_lag=1, merge_pending=10, smoothing=1)
+        assert not shedder.should_merge(100)
+        shedder.observe(5, 0)
+        assert shedder.should_merge(100)
+        assert not shedder.should_merge(5)
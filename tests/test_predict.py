@@ -0,0 +1,147 @@
+import math
+
+import pytest
+
+from homework_bot.analytics import LogSketch
+from homework_bot.predict import (
+    PredictiveSchedule, Survival, TurnaroundModel, hour_weights
+)
+from homework_bot.settings import Subscription
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+START = 1700000000 - 1700000000 % DAY
+
+
+def subscription(name, interval=600):
+    return Subscription.create(name, 't', 1, 'https://host/', interval)
+
+
+def trained_model(reviewing=4 * HOUR, rejected=20 * HOUR, students=30):
+    """Модель, видевшая `students` циклов проверка → возврат → пересдача."""
+    model = TurnaroundModel()
+    for index in range(students):
+        name = f's{index}'
+        moment = START + index * 60
+        model.observe(name, 'reviewing', moment)
+        model.observe(name, 'rejected', moment + reviewing)
+        model.observe(name, 'reviewing', moment + reviewing + rejected)
+    return model
+
+
+class TestSurvival:
+
+    def test_interpolates_inside_buckets(self):
+        sketch = LogSketch()
+        for _ in range(10):
+            sketch.add(DAY)
+        survival = Survival(sketch)
+        assert survival(1) == 1.0
+        assert survival(2 * DAY) == 0.0
+        lower = survival(DAY * 0.995)
+        upper = survival(DAY * 0.999)
+        assert 0.0 < upper < lower < 1.0, (
+            'Внутри корзины выживание должно убывать, а не стоять ступенькой.'
+        )
+
+
+class TestTurnaroundModel:
+
+    def test_learns_durations_per_status(self):
+        model = trained_model()
+        assert model.durations['reviewing'].count == 30
+        assert model.durations['rejected'].count == 30
+        assert model.durations['*'].count == 60
+        assert model.current['s0'] == ('reviewing', START + 24 * HOUR)
+        assert model.cohort('reviewing') == 'reviewing'
+        assert model.cohort('approved') == '*'
+
+    def test_repeated_observation_is_ignored(self):
+        model = trained_model(students=1)
+        model.dirty = False
+        model.observe('s0', 'reviewing', START + 24 * HOUR)
+        assert not model.dirty
+        assert model.durations['reviewing'].count == 1
+
+    def test_change_is_likelier_near_typical_duration(self):
+        model = trained_model()
+        since = START + DAY
+        model.observe('new', 'rejected', since)
+        early = model.change_probability('new', since + HOUR,
+                                         since + HOUR + 600, 600)
+        typical = model.change_probability('new', since + 20 * HOUR - 600,
+                                           since + 20 * HOUR + 600, 600)
+        assert early < typical
+
+    def test_unknown_subscription_is_memoryless(self):
+        model = TurnaroundModel()
+        assert model.change_probability('x', 0, 600, 600) == pytest.approx(
+            1 - math.exp(-1)
+        )
+
+    def test_hour_weights_average_to_one(self):
+        weights = hour_weights([0] * 6 + [10] * 9 + [0] * 9)
+        assert sum(weights) == pytest.approx(24)
+        assert weights[8] > 1 > weights[20]
+
+    def test_save_and_load(self, tmp_path):
+        model = trained_model()
+        path = tmp_path / 'model.json'
+        model.save(path)
+        assert not model.dirty
+        loaded = TurnaroundModel.load(path)
+        assert loaded.to_dict() == model.to_dict()
+        assert TurnaroundModel.load(tmp_path / 'missing.json').current == {}
+
+
+class TestPredictiveSchedule:
+
+    def test_new_subscriptions_are_polled_at_once(self):
+        subs = [subscription('a'), subscription('b')]
+        schedule = PredictiveSchedule(subs, None, 0.0, START)
+        assert {sub.name for sub in schedule.due(0.0)} == {'a', 'b'}
+        assert schedule.due(1.0) == []
+
+    def test_spends_fixed_interval_budget(self):
+        subs = [subscription(f's{index}') for index in range(10)]
+        schedule = PredictiveSchedule(subs, None, 0.0, START)
+        for now in range(0, 6 * HOUR, 60):
+            schedule.due(float(now))
+        fixed = 10 * 6 * HOUR / 600
+        assert schedule.polls == pytest.approx(fixed, rel=0.05)
+
+    def test_overdue_subscription_is_forced(self):
+        subs = [subscription('a')]
+        schedule = PredictiveSchedule(subs, None, 0.0, START, budget=0.0,
+                                      max_factor=2)
+        schedule.due(0.0)
+        assert schedule.due(1100.0) == []
+        assert [sub.name for sub in schedule.due(1300.0)] == ['a']
+        assert schedule.lag == pytest.approx(100.0)
+
+    def test_prefers_likely_changes(self):
+        model = trained_model()
+        model.observe('waiting', 'reviewing', START)
+        model.observe('fresh', 'rejected', START + 3 * HOUR)
+        subs = [subscription('waiting'), subscription('fresh')]
+        start = 4 * HOUR
+        schedule = PredictiveSchedule(subs, model, start, START + start,
+                                      budget=0.5)
+        schedule.due(start)
+        polled = {'waiting': 0, 'fresh': 0}
+        for now in range(int(start) + 60, int(start) + HOUR, 60):
+            for sub in schedule.due(float(now)):
+                polled[sub.name] += 1
+        assert polled['waiting'] > polled['fresh'], (
+            'Работа на проверке около типичного срока должна опрашиваться '
+            'чаще только что возвращённой.'
+        )
+
+    def test_sync_drops_removed(self):
+        schedule = PredictiveSchedule([subscription('a'), subscription('b')],
+                                      None, 0.0, START)
+        schedule.due(0.0)
+        schedule.sync([subscription('a')], 1.0)
+        assert len(schedule) == 1
+        assert 'b' not in schedule.last
+        assert schedule.stats()['subscriptions'] == 1
@@ -0,0 +1,51 @@
+import time
+
+from homework_bot.profiling import StageProfiler, run_profile
+
+
+class TestStageProfiler:
+
+    def test_nested_stages(self):
+        profiler = StageProfiler()
+        with profiler.stage('cycle'):
+            with profiler.stage('http'):
+                time.sleep(0.01)
+        summary = profiler.summary()
+        assert set(summary) == {'cycle', 'cycle;http'}, (
+            'Вложенные стадии должны записываться через `;`.'
+        )
+        assert summary['cycle']['total'] >= summary['cycle;http']['total']
+
+    def test_ring_buffer_is_bounded(self):
+        profiler = StageProfiler(size=10)
+        for _ in range(100):
+            with profiler.stage('cycle'):
+                pass
+        assert len(profiler.records) == 10
+
+    def test_collapsed_uses_self_time(self):
+        profiler = StageProfiler()
+        profiler.records.extend([('cycle', 0.003), ('cycle;http', 0.002)])
+        lines = dict(
+            line.rsplit(' ', 1) for line in profiler.collapsed().splitlines()
+        )
+        assert lines == {'cycle': '1000', 'cycle;http': '2000'}
+
+    def test_run_profile_counts_errors(self, tmp_path):
+        profiler = StageProfiler()
+        calls = []
+
+        def cycle():
+            calls.append(1)
+            with profiler.stage('cycle'):
+                if len(calls) % 2:
+                    raise ValueError
+
+        report = run_profile(
+            cycle, 4, profiler=profiler,
+            cprofile_path=str(tmp_path / 'out.prof'),
+            collapsed_path=str(tmp_path / 'out.txt')
+        )
+        assert 'с ошибкой: 2' in report
+        assert (tmp_path / 'out.prof').exists()
+        assert (tmp_path / 'out.txt').read_text().startswith('cycle ')
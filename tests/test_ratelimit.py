@@ -0,0 +1,117 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+import pytest
+
+import utils
+from homework_bot.ratelimit import (
+    RateLimited, RateLimitedTransport, RateLimiter, TokenBucket,
+    parse_retry_after
+)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TooManyRequests(utils.MockResponseGET):
+
+    def __init__(self, retry_after):
+        super().__init__(http_status=HTTPStatus.TOO_MANY_REQUESTS)
+        self.headers = {'Retry-After': retry_after}
+
+
+class StubTransport:
+
+    def __init__(self, response=None):
+        self.response = response
+        self.calls = 0
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls += 1
+        return self.response or utils.MockResponseGET()
+
+
+class TestRateLimit:
+
+    def test_bucket_refills_with_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=2, clock=clock)
+        assert bucket.try_acquire() and bucket.try_acquire()
+        assert not bucket.try_acquire()
+        assert bucket.wait_time() == pytest.approx(0.5)
+        clock.sleep(0.5)
+        assert bucket.try_acquire()
+
+    def test_global_ceiling_waits_then_defers(self):
+        clock = FakeClock()
+        waits = []
+        limiter = RateLimiter(global_rate=1, burst=1, max_wait=1.5,
+                              clock=clock, sleep=waits.append)
+        limiter.acquire('a')
+        limiter.acquire('b')
+        assert waits == [pytest.approx(1.0)], (
+            'Общий лимит должен выдерживать не больше 1 запроса в секунду.'
+        )
+        with pytest.raises(RateLimited):
+            limiter.acquire('c')
+        assert limiter.stats()['deferred'] == 1
+        clock.sleep(2)
+        limiter.acquire('c')
+
+    def test_per_token_limit_does_not_block_others(self):
+        clock = FakeClock()
+        limiter = RateLimiter(token_rate=0.1, clock=clock, sleep=clock.sleep)
+        limiter.acquire('a')
+        with pytest.raises(RateLimited):
+            limiter.acquire('a')
+        limiter.acquire('b')
+        assert clock.now == 0
+
+    def test_try_acquire_never_waits(self):
+        clock = FakeClock()
+        limiter = RateLimiter(2, token_rate=1, clock=clock, sleep=clock.sleep)
+        assert limiter.try_acquire('a')
+        assert not limiter.try_acquire('a')
+        assert limiter.try_acquire('b')
+        assert not limiter.try_acquire('c')
+        assert limiter.token_buckets['c'].tokens == 1
+        limiter.pause('b', 10)
+        clock.now += 5
+        assert not limiter.try_acquire('b')
+        assert clock.now == 5
+
+    def test_429_pauses_only_affected_token(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        limited = RateLimitedTransport(
+            StubTransport(TooManyRequests('30')), limiter
+        )
+        headers = {'Authorization': 'OAuth a'}
+        with pytest.raises(RateLimited):
+            limited.get('https://host/', headers=headers)
+        with pytest.raises(RateLimited):
+            limited.get('https://host/', headers=headers)
+        assert limited.inner.calls == 1, (
+            'Токен на паузе не должен отправлять запросы.'
+        )
+        other = RateLimitedTransport(StubTransport(), limiter)
+        other.get('https://host/', headers={'Authorization': 'OAuth b'})
+        clock.sleep(31)
+        limited.inner.response = None
+        limited.get('https://host/', headers=headers)
+
+    def test_retry_after_http_date(self):
+        now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        value = format_datetime(now + timedelta(seconds=120), usegmt=True)
+        assert parse_retry_after(value, now=now.timestamp()) == 120
+        assert parse_retry_after('garbage') == 60
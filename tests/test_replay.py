@@ -0,0 +1,66 @@
+import gzip
+import time
+
+import pytest
+
+import utils
+from homework_bot.replay import RecordingTransport, ReplayTransport
+
+
+class SlowTransport:
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        time.sleep(self.delay)
+        response = utils.MockResponseGET(
+            data={'homeworks': [], 'current_date': 1}
+        )
+        response.text = '{"homeworks": [], "current_date": 1}'
+        return response
+
+
+class TestReplay:
+    HEADERS = {'Authorization': 'OAuth secret-token'}
+
+    def record(self, path, count=3):
+        transport = RecordingTransport(SlowTransport(), str(path))
+        for _ in range(count):
+            transport.get('https://host/api/', headers=self.HEADERS,
+                          params={'from_date': 0})
+        transport.close()
+
+    def test_recording_is_compressed_and_redacted(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl.gz'
+        self.record(path)
+        content = gzip.open(path, 'rt').read()
+        assert len(content.splitlines()) == 3
+        assert 'secret-token' not in content, (
+            'Токен не должен попадать в запись трафика.'
+        )
+
+    def test_replay_returns_recorded_responses(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl'
+        self.record(path)
+        transport = ReplayTransport(str(path), speed=0)
+        response = transport.get('https://host/api/', headers=self.HEADERS)
+        assert response.status_code == 200
+        assert response.json() == {'homeworks': [], 'current_date': 1}
+
+    def test_replay_speed_scales_latency(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl'
+        self.record(path, count=1)
+        transport = ReplayTransport(str(path), speed=4)
+        started = time.monotonic()
+        transport.get('https://host/api/', headers=self.HEADERS)
+        elapsed = time.monotonic() - started
+        assert 0.004 <= elapsed < 0.02
+
+    def test_replay_without_loop_ends(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl'
+        self.record(path, count=1)
+        transport = ReplayTransport(str(path), speed=0, loop=False)
+        transport.get('https://host/api/', headers=self.HEADERS)
+        with pytest.raises(ConnectionError):
+            transport.get('https://host/api/', headers=self.HEADERS)
@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from homework_bot.settings import (
+    SettingsError, Subscription, SubscriptionWatcher, build_settings
+)
+
+
+def write_subscriptions(path, subscriptions, mtime=None):
+    path.write_text(json.dumps({'subscriptions': subscriptions}))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+class TestSettings:
+
+    def test_headers_are_prebuilt_and_immutable(self):
+        sub = Subscription.create('student', 'token', '123')
+        assert sub.headers['Authorization'] == 'OAuth token'
+        with pytest.raises(TypeError):
+            sub.headers['Authorization'] = 'other'
+        with pytest.raises(AttributeError):
+            sub.interval = 1
+
+    @pytest.mark.parametrize('fields', [
+        ('s', '', '1'),
+        ('s', 'token', 'chat'),
+        ('s', 'token', '1', 'ftp://host/'),
+        ('s', 'token', '1', 'https://host/', 0),
+    ])
+    def test_invalid_subscription(self, fields):
+        with pytest.raises(SettingsError):
+            Subscription.create(*fields)
+
+    def test_env_and_file_are_merged(self, tmp_path):
+        path = tmp_path / 'subs.json'
+        write_subscriptions(path, [
+            {'name': 'a', 'practicum_token': 't1', 'chat_id': 1,
+             'interval': 60},
+        ])
+        settings = build_settings('tg', 'token', '5', subscriptions_file=(
+            str(path)
+        ))
+        assert [sub.name for sub in settings.subscriptions] == [
+            'default', 'a'
+        ]
+        assert settings.subscriptions[1].interval == 60
+
+    def test_missing_telegram_token(self):
+        with pytest.raises(SettingsError):
+            build_settings(None, 'token', '5')
+
+    def test_toml_and_yaml_files(self, tmp_path):
+        toml_path = tmp_path / 'subs.toml'
+        toml_path.write_text(
+            '[[subscriptions]]\n'
+            'name = "a"\npracticum_token = "t"\nchat_id = 1\n'
+        )
+        yaml_path = tmp_path / 'subs.yaml'
+        yaml_path.write_text(
+            'subscriptions:\n'
+            '  - {name: b, practicum_token: t, chat_id: 2}\n'
+        )
+        for path, name in ((toml_path, 'a'), (yaml_path, 'b')):
+            settings = build_settings('tg', subscriptions_file=str(path))
+            assert settings.subscriptions[0].name == name
+
+    def test_watcher_reports_incremental_changes(self, tmp_path):
+        path = tmp_path / 'subs.json'
+        first = {'name': 'a', 'practicum_token': 't1', 'chat_id': 1}
+        second = {'name': 'b', 'practicum_token': 't2', 'chat_id': 2}
+        write_subscriptions(path, [first, second], mtime=10 ** 9)
+        watcher = SubscriptionWatcher(
+            build_settings('tg', subscriptions_file=str(path))
+        )
+        unchanged = watcher.settings.subscriptions[0]
+        assert watcher.refresh() == ((), (), ())
+
+        third = {'name': 'c', 'practicum_token': 't3', 'chat_id': 3}
+        second['chat_id'] = 20
+        write_subscriptions(path, [first, second, third], mtime=2 * 10 ** 9)
+        assert watcher.refresh() == (('c',), (), ('b',))
+        assert watcher.settings.subscriptions[0] is unchanged, (
+            'Неизменившиеся подписки не должны пересоздаваться.'
+        )
+
+    def test_watcher_keeps_old_subscriptions_on_error(self, tmp_path):
+        path = tmp_path / 'subs.json'
+        write_subscriptions(path, [
+            {'name': 'a', 'practicum_token': 't', 'chat_id': 1}
+        ], mtime=10 ** 9)
+        watcher = SubscriptionWatcher(
+            build_settings('tg', subscriptions_file=str(path))
+        )
+        write_subscriptions(path, [{'name': 'a'}], mtime=2 * 10 ** 9)
+        with pytest.raises(SettingsError):
+            watcher.refresh()
+        assert watcher.settings.subscriptions[0].practicum_token == 't'
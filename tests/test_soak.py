@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from homework_bot.soak import (
+    DAY, MEMORY_SLACK, SimulatedClock, SoakFinished, SoakMonitor, compare,
+    load_baseline, run_soak
+)
+
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)), 'benchmarks', 'soak_baseline.json')
+
+
+class TestSimulatedClock:
+
+    def test_sleep_moves_time_without_waiting(self):
+        ticks = []
+        clock = SimulatedClock(100, ticks.append, start=1000.0)
+        clock.sleep(60)
+        assert clock.monotonic() == 60
+        assert clock.time() == 1060.0
+        assert ticks == [60]
+        assert clock.perf_counter() > 0
+        with pytest.raises(SoakFinished):
+            clock.sleep(60)
+
+    def test_finish_is_not_swallowed_by_main_loop(self):
+        assert not issubclass(SoakFinished, Exception)
+
+
+class TestSoakMonitor:
+
+    def test_growth_skips_settling(self):
+        monitor = SoakMonitor(10 * DAY, windows=10, warmup=0.2)
+        for window in range(11):
+            monitor.sample(window * DAY)
+        monitor.samples = [
+            sample._replace(traced=min(index, 5) * 1000, rss=None, fds=5)
+            for index, sample in enumerate(monitor.samples)
+        ]
+        assert monitor.result()['traced_per_day'] == 0
+
+    def test_growth_is_per_simulated_day(self):
+        monitor = SoakMonitor(10 * DAY, windows=10, warmup=0.2)
+        for window in range(11):
+            monitor.cycle(0.01 * (1 + window))
+            monitor.sample(window * DAY)
+        monitor.samples = [
+            sample._replace(traced=1000 * index, rss=None, fds=5)
+            for index, sample in enumerate(monitor.samples)
+        ]
+        result = monitor.result()
+        assert result['traced_per_day'] == 1000
+        assert result['rss_per_day'] is None
+        assert result['fd_growth'] == 0
+        assert result['cycles'] == 11
+        assert result['latency_drift'] > 1
+
+    def test_too_short(self):
+        monitor = SoakMonitor(DAY)
+        monitor.sample(0.0)
+        with pytest.raises(ValueError):
+            monitor.result()
+
+
+class TestCompare:
+
+    BASELINE = {'traced_per_day': 10000, 'fd_growth': 0,
+                'latency_p95': 0.1, 'latency_drift': 1.0}
+
+    def test_within_tolerance(self):
+        result = dict(self.BASELINE, traced_per_day=14000, rss_per_day=None,
+                      latency_p95=0.12)
+        assert compare(result, self.BASELINE) == []
+
+    def test_absolute_latency_is_not_compared(self):
+        result = dict(self.BASELINE, latency_p95=1.0)
+        assert compare(result, self.BASELINE) == []
+
+    @pytest.mark.parametrize('key, value', [
+        ('traced_per_day', 10000 * 1.5 + MEMORY_SLACK + 1),
+        ('fd_growth', 1),
+        ('latency_drift', 2.0),
+    ])
+    def test_regressions(self, key, value):
+        regressions = compare(dict(self.BASELINE, **{key: value}),
+                              self.BASELINE)
+        assert len(regressions) == 1
+        assert regressions[0].startswith(key)
+
+
+@pytest.mark.skipif(not os.getenv('SOAK'),
+                    reason='долгий прогон: включается переменной SOAK=1')
+@pytest.mark.timeout(3600)
+def test_soak_against_baseline(monkeypatch):
+    import homework
+    monkeypatch.setattr(homework.LOGGER, 'disabled', True)
+    baseline = load_baseline(BASELINE)
+    assert baseline is not None, (
+        'Нет базовой линии: python benchmarks/soak.py --update'
+    )
+    days = float(os.getenv('SOAK_DAYS', baseline['simulated_days']))
+    result = run_soak(homework, days * DAY)
+    assert result['delivered'] > 0
+    assert compare(result, baseline) == []
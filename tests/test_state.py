@@ -0,0 +1,110 @@
+from homework_bot.settings import AuthHeaders, Subscription
+from homework_bot.state import HomeworkStatuses, PollState, StatusCodes
+
+VERDICTS = ('approved', 'reviewing', 'rejected')
+
+
+class TestStatusCodes:
+
+    def test_known_statuses_are_numbered_first(self):
+        codes = StatusCodes(VERDICTS)
+        assert [codes.code(status) for status in VERDICTS] == [1, 2, 3]
+        assert codes.code('') == 0
+        assert codes.code('new') == 4
+        assert codes.name(4) == 'new'
+
+
+class TestPollState:
+
+    def test_views_behave_like_dicts(self):
+        state = PollState(VERDICTS)
+        state.statuses['a'] = 'approved'
+        state.deadlines['b'] = 10.5
+        assert state.statuses.get('a', '') == 'approved'
+        assert state.statuses.get('b', '') == ''
+        assert state.statuses.get('c', '') == ''
+        assert state.deadlines.get('b', 0) == 10.5
+        assert sorted(state.deadlines) == ['a', 'b']
+        assert state.deadlines.pop('a', None) == 0.0
+        assert state.statuses.pop('a', None) is None
+        assert 'a' not in state
+
+    def test_slots_are_reused(self):
+        state = PollState()
+        for name in ('a', 'b', 'c'):
+            state.set_deadline(name, 1.0)
+        state.remove('b')
+        state.set_status('d', 'unknown_status')
+        assert len(state.status_column) == 3
+        assert state.status('d') == 'unknown_status'
+        assert state.deadline('d') == 0.0
+        assert state.nbytes() == 3 * (8 + 8 + 2)
+
+    def test_save_and_load(self, tmp_path):
+        state = PollState(VERDICTS)
+        state.statuses['a'] = 'rejected'
+        state.cursors['a'] = 1700000000.0
+        state.deadlines['b'] = 5.0
+        path = tmp_path / 'state.json'
+        state.save(path)
+        loaded = PollState.load(path, VERDICTS)
+        assert loaded.status('a') == 'rejected'
+        assert loaded.cursor('a') == 1700000000.0
+        assert loaded.deadline('b') == 0.0
+        assert len(PollState.load(tmp_path / 'missing.json')) == 0
+
+
+class TestHomeworkStatuses:
+
+    def test_each_homework_keeps_own_status(self):
+        store = HomeworkStatuses(limit=2)
+        assert store.update('a', {'id': 1, 'status': 'reviewing'}, 10) is None
+        assert store.update('a', {'id': 2, 'status': 'approved'}, 20) is None
+        assert store.update('a', {'id': 1, 'status': 'reviewing'}, 30) == (
+            'reviewing'
+        )
+        assert store.status('a') == 'reviewing'
+        assert store.update('a', {'id': 2, 'status': 'rejected'}, 5) == (
+            'rejected'
+        )
+        assert store.latest('a') == ('reviewing', 30)
+        store.forget('a')
+        assert store.status('a', 'x') == 'x'
+
+    def test_limit_is_per_subscription(self):
+        store = HomeworkStatuses(limit=2)
+        for number in range(3):
+            store.update('a', {'id': number, 'status': 'approved'}, number)
+        store.update('b', {'id': 0, 'status': 'approved'}, 0)
+        assert list(store.to_dict('a')) == ['1', '2']
+        assert list(store.to_dict('b')) == ['0']
+
+    def test_saved_with_state(self, tmp_path):
+        state = PollState(VERDICTS)
+        state.statuses['a'] = 'reviewing'
+        state.homeworks.update('a', {'id': 1, 'status': 'approved'}, 10)
+        state.homeworks.update('a', {'id': 2, 'status': 'reviewing'}, 20)
+        path = tmp_path / 'state.json'
+        state.save(path)
+        loaded = PollState.load(path, VERDICTS)
+        assert loaded.homeworks.update(
+            'a', {'id': 1, 'status': 'approved'}, 10
+        ) == 'approved'
+        assert loaded.homeworks.status('a') == 'reviewing'
+        loaded.statuses.pop('a')
+        assert loaded.homeworks.latest('a') is None
+        path.write_text('{"old": ["approved", 1.0]}')
+        assert PollState.load(path).status('old') == 'approved'
+
+
+class TestAuthHeaders:
+
+    def test_headers_are_built_from_token(self):
+        headers = AuthHeaders('token')
+        assert dict(headers) == {'Authorization': 'OAuth token'}
+        assert 'token' not in repr(headers)
+
+    def test_endpoint_is_shared(self):
+        first = Subscription.create('a', 't1', 1, ''.join(('https://host/', 'api/')))
+        second = Subscription.create('b', 't2', 2, ''.join(('https://host/', 'api/')))
+        assert first.endpoint is second.endpoint
@@ -0,0 +1,72 @@
+import io
+
+from homework_bot import stubs
+from homework_bot.__main__ import run
+from homework_bot.settings import SubscriptionWatcher, build_settings
+from homework_bot.store import SubscriptionStore, import_rows, read_rows
+from homework_bot.transport import RequestsTransport
+
+CSV = (
+    'name,practicum_token,chat_id,interval\n'
+    'anna,token-a,1,\n'
+    'boris,token-b,2,300\n'
+    'broken,,3,\n'
+    'vera,token-v,not-a-number,\n'
+    'gleb,token-g,4,\n'
+)
+
+
+class TestSubscriptionStore:
+
+    def test_streaming_import_in_batches(self, tmp_path):
+        store = SubscriptionStore(str(tmp_path / 'subs.db'))
+        errors = []
+        stats = import_rows(store, read_rows(io.StringIO(CSV), 'csv'),
+                            batch_size=2,
+                            on_error=lambda number, error: errors.append(
+                                number))
+        assert stats == (3, 2, 0)
+        assert errors == [4, 5]
+        assert [sub.name for sub in store] == ['anna', 'boris', 'gleb']
+        assert {sub.name: sub.interval for sub in store}['boris'] == 300
+
+    def test_invalid_tokens_are_skipped(self, tmp_path):
+        store = SubscriptionStore(str(tmp_path / 'subs.db'))
+        with stubs.FakePracticumServer(tokens={'token-a', 'token-g'}) as api:
+            stats = import_rows(
+                store, read_rows(io.StringIO(CSV), 'csv'),
+                transport=RequestsTransport(), workers=2, endpoint=api.url
+            )
+        assert stats == (2, 2, 1)
+        assert [sub.name for sub in store] == ['anna', 'gleb']
+
+    def test_running_bot_picks_up_changes(self, tmp_path):
+        path = str(tmp_path / 'subs.db')
+        assert run(['subs', '--db', path, 'add', 'anna', 'token-a', '1']) == 0
+        watcher = SubscriptionWatcher(
+            build_settings('tg', subscriptions_file=path)
+        )
+        assert [sub.name for sub in watcher.settings.subscriptions] == [
+            'anna'
+        ]
+        assert run(['subs', '--db', path, 'add', 'boris', 'token-b', '2']) == 0
+        assert run(['subs', '--db', path, 'remove', 'anna']) == 0
+        added, removed, _ = watcher.refresh()
+        assert added == ('boris',)
+        assert removed == ('anna',)
+
+    def test_export_roundtrip(self, tmp_path, capsys):
+        source = tmp_path / 'subs.jsonl'
+        source.write_text(
+            '{"name": "anna", "practicum_token": "t", "chat_id": 1}\n'
+            'not json\n'
+        )
+        path = str(tmp_path / 'subs.db')
+        assert run(['subs', '--db', path, 'import', str(source)]) == 2
+        output = tmp_path / 'out.csv'
+        assert run(['subs', '--db', path, 'export', '--format', 'csv',
+                    '--output', str(output)]) == 0
+        assert output.read_text().splitlines()[1].startswith('anna,t,1,')
+        capsys.readouterr()
+        assert run(['subs', '--db', path, 'list']) == 0
+        assert 't' not in capsys.readouterr().out.split('\t')
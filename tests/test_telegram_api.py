@@ -0,0 +1,80 @@
+import pytest
+
+from homework_bot import stubs
+from homework_bot.telegram_api import (
+    RetryAfter, TelegramApiError, TelegramClient
+)
+
+
+@pytest.fixture
+def server():
+    with stubs.FakeTelegramServer() as server:
+        yield server
+
+
+class TestTelegramClient:
+
+    def test_send_message(self, server):
+        client = TelegramClient('1234:abc', server.base_url)
+        try:
+            assert client.send_message(42, 'Привет')
+        finally:
+            client.close()
+        assert server.sent == [(42, 'Привет')]
+
+    def test_send_many_retries_after_429(self, server):
+        server.retry_after_every = 3
+        server.retry_after = 0.01
+        client = TelegramClient('1234:abc', server.base_url,
+                                connections=2, depth=4)
+        try:
+            results = client.send_many([(1, f'm{i}') for i in range(10)])
+        finally:
+            client.close()
+        assert results == [True] * 10
+        assert sorted(text for _, text in server.sent) == sorted(
+            f'm{i}' for i in range(10)
+        )
+        assert client.stats()['retried'] > 0
+
+    def test_long_retry_after_raises(self, server):
+        server.retry_after_every = 1
+        server.retry_after = 60
+        client = TelegramClient('1234:abc', server.base_url,
+                                max_retry_wait=1)
+        try:
+            with pytest.raises(RetryAfter) as error:
+                client.send_message(1, 'text')
+        finally:
+            client.close()
+        assert error.value.retry_after == 60
+
+    def test_api_error(self, server):
+        client = TelegramClient('1234:abc', server.base_url + '/missing')
+        try:
+            result, = client.send_many([(1, 'text')])
+        finally:
+            client.close()
+        assert isinstance(result, TelegramApiError)
+        assert result.error_code == 404
+
+    def test_large_batch_is_drained(self, server):
+        client = TelegramClient('1234:abc', server.base_url,
+                                connections=1, depth=64)
+        text = 'x' * 4000
+        try:
+            results = client.send_many([(1, text)] * 200)
+        finally:
+            client.close()
+        assert results == [True] * 200
+        assert len(server.sent) == 200
+
+    def test_local_server_answers_404_by_default(self):
+        with stubs.LocalServer() as server:
+            client = TelegramClient('1234:abc', server.base_url)
+            try:
+                with pytest.raises(TelegramApiError) as error:
+                    client.send_message(1, 'text')
+            finally:
+                client.close()
+        assert error.value.error_code == 404
@@ -0,0 +1,168 @@
+import json
+
+import pytest
+
+from homework_bot.analytics import ReviewAnalytics
+from homework_bot.outbox import Outbox
+from homework_bot.predict import TurnaroundModel
+from homework_bot.settings import SettingsError, Subscription
+from homework_bot.state import HomeworkStatuses
+from homework_bot.verdicts import Quarantine, VerdictRegistry, VerdictsWatcher
+
+VERDICTS = {'approved': 'Принято.', 'rejected': 'Есть замечания.'}
+
+
+class TestVerdictRegistry:
+
+    def test_is_plain_dict(self):
+        registry = VerdictRegistry(VERDICTS)
+        assert registry == VERDICTS
+        assert registry['approved'] == 'Принято.'
+
+    def test_extend_keeps_builtin(self):
+        registry = VerdictRegistry(VERDICTS)
+        added = registry.extend({'approved': 'Другое.', 'on_hold': 'Пауза.'})
+        assert added == ['on_hold']
+        assert registry['approved'] == 'Принято.'
+        assert registry.extend({'on_hold': 'Пауза.'}) == []
+
+    @pytest.mark.parametrize('status, verdict', [
+        ('', 'Пусто.'), ('on_hold', ''), (1, 'Число.'),
+    ])
+    def test_register_rejects_bad_values(self, status, verdict):
+        with pytest.raises(ValueError):
+            VerdictRegistry().register(status, verdict)
+
+
+class TestVerdictsWatcher:
+
+    def test_reads_file_once_per_change(self, tmp_path):
+        path = tmp_path / 'verdicts.json'
+        registry = VerdictRegistry(VERDICTS)
+        watcher = VerdictsWatcher(registry, str(path))
+        assert watcher.refresh() == []
+        path.write_text(json.dumps({'on_hold': 'Пауза.'}))
+        assert watcher.refresh() == ['on_hold']
+        assert watcher.refresh() == []
+        path.write_text(json.dumps(['on_hold']))
+        with pytest.raises(SettingsError):
+            watcher.refresh()
+        assert registry['on_hold'] == 'Пауза.'
+
+
+class TestQuarantine:
+
+    def test_counts_and_release(self):
+        quarantine = Quarantine(size=2)
+        quarantine.add('a', {'status': 'on_hold'}, 'unknown_status')
+        quarantine.add('a', 'мусор', 'malformed')
+        quarantine.add('a', {'status': 'on_hold'}, 'missing_key')
+        quarantine.add('b', {'status': 'on_hold'}, 'unknown_status')
+        assert quarantine.release({'on_hold'}) == [
+            ('b', {'status': 'on_hold'})
+        ]
+        stats = quarantine.stats()
+        assert stats['held'] == 1
+        assert stats['quarantined'] == 4
+        assert stats['released'] == 1
+        assert stats['dropped'] == 2
+        assert stats['reasons'] == {
+            'unknown_status': 2, 'malformed': 1, 'missing_key': 1
+        }
+        assert stats['statuses'] == {'on_hold': 3}
+
+
+@pytest.fixture
+def bot_module(monkeypatch):
+    import homework
+    monkeypatch.setattr(homework, 'HOMEWORK_VERDICTS',
+                        VerdictRegistry(homework.HOMEWORK_VERDICTS))
+    monkeypatch.setattr(homework, 'QUARANTINE', Quarantine())
+    monkeypatch.setattr(homework, 'HOMEWORK_STATUSES', HomeworkStatuses())
+    monkeypatch.setattr(homework, 'OUTBOX', Outbox())
+    monkeypatch.setattr(homework, 'ANALYTICS', ReviewAnalytics())
+    monkeypatch.setattr(homework, 'TURNAROUND', TurnaroundModel())
+    monkeypatch.setattr(homework, 'ARCHIVE', None)
+    monkeypatch.setattr(homework, 'VERDICTS_WATCHER', None)
+    return homework
+
+
+def test_bad_record_does_not_drop_batch(bot_module):
+    subscription = Subscription.create('a', 'token', 1)
+    response = {'homeworks': [
+        {'id': 3, 'homework_name': 'hw3', 'status': 'on_hold'},
+        {'id': 2, 'status': 'approved'},
+        {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+    ], 'current_date': 0}
+    status = bot_module.process_statuses(subscription, response, '')
+    assert status == 'approved'
+    texts = [item.text for item in bot_module.OUTBOX.due()]
+    assert len(texts) == 1 and 'hw1' in texts[0]
+    assert bot_module.QUARANTINE.stats()['reasons'] == {
+        'unknown_status': 1, 'missing_key': 1
+    }
+
+    bot_module.HOMEWORK_VERDICTS.register('on_hold', 'Проверка отложена.')
+    statuses = {'a': status}
+    bot_module.refresh_verdicts((subscription,), statuses)
+    assert statuses['a'] == 'on_hold'
+    assert any('Проверка отложена.' in item.text
+               for item in bot_module.OUTBOX.due())
+    stats = bot_module.QUARANTINE.stats()
+    assert stats['held'] == 1
+    assert stats['quarantined'] == 2
+
+
+def test_two_homeworks_do_not_flip_status(bot_module):
+    subscription = Subscription.create('a', 'token', 1)
+    response = {'homeworks': [
+        {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing',
+         'date_updated': '2026-10-02T10:00:00Z'},
+        {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+         'date_updated': '2026-10-01T10:00:00Z'},
+    ], 'current_date': 0}
+    status = ''
+    for _ in range(3):
+        status = bot_module.process_statuses(subscription, response, status)
+    assert status == 'reviewing'
+    assert len(bot_module.OUTBOX.due()) == 2, (
+        'Повторный опрос тех же работ не должен давать уведомлений.'
+    )
+
+
+def test_stale_release_keeps_newer_status(bot_module):
+    subscription = Subscription.create('a', 'token', 1)
+    stale = {'id': 1, 'homework_name': 'hw1', 'status': 'on_hold',
+             'date_updated': '2026-10-01T10:00:00Z'}
+    fresh = {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': '2026-10-02T10:00:00Z'}
+    bot_module.process_statuses(
+        subscription, {'homeworks': [stale], 'current_date': 0}, ''
+    )
+    statuses = {'a': bot_module.process_statuses(
+        subscription, {'homeworks': [fresh], 'current_date': 0}, ''
+    )}
+    assert statuses['a'] == 'approved'
+    bot_module.HOMEWORK_VERDICTS.register('on_hold', 'Проверка отложена.')
+    bot_module.refresh_verdicts((subscription,), statuses)
+    assert statuses['a'] == 'approved', (
+        'Устаревшая работа из карантина не должна менять статус подписки.'
+    )
+    assert not any('Проверка отложена.' in item.text
+                   for item in bot_module.OUTBOX.due())
+
+
+def test_turnaround_learns_from_newest_homework(bot_module):
+    subscription = Subscription.create('a', 'token', 1)
+    response = {'homeworks': [
+        {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing',
+         'date_updated': '2026-10-02T10:00:00Z'},
+        {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+         'date_updated': '2026-10-01T10:00:00Z'},
+    ], 'current_date': 0}
+    for _ in range(5):
+        bot_module.process_statuses(subscription, response, '')
+    assert bot_module.TURNAROUND.durations == {}, (
+        'Неизменный ответ не должен давать замеров модели проверок.'
+    )
+    assert bot_module.TURNAROUND.current['a'][0] == 'reviewing'
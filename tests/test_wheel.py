@@ -0,0 +1,74 @@
+import math
+import random
+
+from homework_bot.settings import Subscription
+from homework_bot.wheel import PollSchedule, TimingWheel
+
+
+class TestTimingWheel:
+
+    def test_fires_on_deadline_tick(self):
+        wheel = TimingWheel(tick=1)
+        wheel.schedule('a', 3)
+        wheel.schedule('b', 2.5)
+        assert wheel.advance(2) == []
+        assert sorted(wheel.advance(3)) == ['a', 'b']
+        assert len(wheel) == 0
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimingWheel(tick=1)
+        wheel.schedule('a', 5)
+        wheel.schedule('b', 5)
+        assert wheel.cancel('a')
+        assert not wheel.cancel('a')
+        wheel.schedule('b', 10)
+        assert wheel.advance(9) == []
+        assert wheel.advance(10) == ['b']
+
+    def test_matches_naive_schedule_across_levels(self):
+        random.seed(7)
+        wheel = TimingWheel(tick=1, slots=4, levels=3)
+        deadlines = {}
+        now = 0
+        for _ in range(300):
+            for _ in range(random.randint(0, 4)):
+                key = random.randint(0, 100)
+                deadline = now + random.uniform(0, 300)
+                wheel.schedule(key, deadline)
+                deadlines[key] = deadline
+            now += random.choice((0.5, 1, 3, 20))
+            expected = {
+                key for key, deadline in deadlines.items()
+                if math.ceil(deadline) <= math.floor(now)
+            }
+            assert set(wheel.advance(now)) == expected
+            for key in expected:
+                del deadlines[key]
+            assert wheel.next_deadline() == min(
+                deadlines.values(), default=None
+            )
+
+
+class TestPollSchedule:
+
+    def test_due_and_sync(self):
+        first = Subscription.create('a', 't', 1, 'https://host/', 10)
+        second = Subscription.create('b', 't', 2, 'https://host/', 30)
+        deadlines = {}
+        schedule = PollSchedule((first, second), deadlines=deadlines)
+        assert {sub.name for sub in schedule.due(0)} == {'a', 'b'}
+        assert deadlines == {'a': 10, 'b': 30}
+        assert [sub.name for sub in schedule.due(10)] == ['a']
+        assert schedule.wait(12) == 8
+        schedule.sync((second,), 10)
+        assert schedule.due(25) == []
+        assert [sub.name for sub in schedule.due(30)] == ['b']
+        assert 'a' not in deadlines
+
+    def test_lag_of_late_due(self):
+        sub = Subscription.create('a', 't', 1, 'https://host/', 10)
+        schedule = PollSchedule((sub,))
+        schedule.due(0)
+        assert schedule.lag == 0
+        assert schedule.due(13) == [sub]
+        assert schedule.lag == 3